@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Event, StatsDaily
+from .models import Event, RollupWatermark, StatsDaily
 
 
 @admin.register(Event)
@@ -14,3 +14,8 @@ class EventAdmin(admin.ModelAdmin):
 class StatsDailyAdmin(admin.ModelAdmin):
     list_display = ("day", "rx_started", "rx_delivered", "pay_success")
     search_fields = ("day",)
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("name", "last_event_id", "updated_at")
@@ -0,0 +1,151 @@
+"""Time-bucketed counts and percentiles over analytics events."""
+from __future__ import annotations
+
+import hashlib
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils import timezone
+
+BUCKETS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+PERCENTILES = (0.5, 0.95, 0.99)
+CACHE_PREFIX = "analytics:agg"
+
+
+def floor_bucket(moment: datetime, bucket: str) -> datetime:
+    moment = moment.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if bucket == "day" else moment
+
+
+def bucket_starts(start: datetime, end: datetime, bucket: str) -> list[datetime]:
+    """Buckets covering [start, end); the range is widened to whole buckets."""
+    step = BUCKETS[bucket]
+    current = floor_bucket(start, bucket)
+    starts = []
+    while current < end:
+        starts.append(current)
+        current += step
+    return starts
+
+
+def _empty(start: datetime, with_values: bool) -> dict[str, Any]:
+    row: dict[str, Any] = {"start": start.isoformat(), "count": 0}
+    if with_values:
+        row.update({f"p{round(q * 100)}": None for q in PERCENTILES})
+    return row
+
+
+def _exact_quantile(ordered: list[float], q: float) -> float:
+    position = q * (len(ordered) - 1)
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _is_number(value: Any) -> bool:
+    """Only JSON numbers feed percentiles, matching `jsonb_typeof(...) = 'number'` on Postgres."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _aggregate_python(
+    qs: QuerySet, bucket: str, value_key: str | None
+) -> dict[datetime, dict[str, Any]]:
+    counts: dict[datetime, int] = defaultdict(int)
+    values: dict[datetime, list[float]] = defaultdict(list)
+    # Whole `props`: SQLite's JSON_EXTRACT unquotes strings, so a key transform would make
+    # "200" indistinguishable from 200.
+    fields = ["at", "props"] if value_key else ["at"]
+    for row in qs.values_list(*fields).iterator(chunk_size=settings.ANALYTICS_EXPORT_CHUNK_SIZE):
+        start = floor_bucket(row[0], bucket)
+        counts[start] += 1
+        if value_key and isinstance(row[1], dict) and _is_number(value := row[1].get(value_key)):
+            values[start].append(float(value))
+    results = {}
+    for start, count in counts.items():
+        row = _empty(start, bool(value_key))
+        row["count"] = count
+        if value_key and values[start]:
+            ordered = sorted(values[start])
+            row.update({f"p{round(q * 100)}": _exact_quantile(ordered, q) for q in PERCENTILES})
+        results[start] = row
+    return results
+
+
+def _aggregate_postgresql(
+    qs: QuerySet, bucket: str, value_key: str | None
+) -> dict[datetime, dict[str, Any]]:
+    inner, params = qs.order_by().values("at", "props").query.sql_with_params()
+    percentiles = ""
+    if value_key:
+        percentiles = (
+            ", percentile_cont(%s) WITHIN GROUP (ORDER BY (sub.props ->> %s)::float8)"
+            " FILTER (WHERE jsonb_typeof(sub.props -> %s) = 'number')"
+        )
+    sql = (
+        f"SELECT date_trunc(%s, sub.at) AS bucket, count(*){percentiles} "
+        f"FROM ({inner}) sub GROUP BY 1"
+    )
+    head: list[Any] = [bucket]
+    if value_key:
+        head += [list(PERCENTILES), value_key, value_key]
+    results = {}
+    with connections[qs.db].cursor() as cursor:
+        cursor.execute(sql, head + list(params))
+        for row in cursor.fetchall():
+            start = row[0].astimezone(UTC)
+            result = _empty(start, bool(value_key))
+            result["count"] = row[1]
+            if value_key and row[2]:
+                result.update(
+                    {f"p{round(q * 100)}": v for q, v in zip(PERCENTILES, row[2], strict=True)}
+                )
+            results[start] = result
+    return results
+
+
+def aggregate_events(
+    qs: QuerySet,
+    *,
+    scope: str,
+    bucket: str,
+    start: datetime,
+    end: datetime,
+    value_key: str | None = None,
+) -> list[dict[str, Any]]:
+    """Return one row per bucket, serving closed buckets from the cache.
+
+    `scope` must identify every filter already applied to `qs`; it is part of the cache key.
+    A bucket is closed once it ended more than `ANALYTICS_ROLLUP_SETTLE_SECONDS` ago, so only
+    the open bucket (and cache misses) hit the database.
+    """
+    starts = bucket_starts(start, end, bucket)
+    step = BUCKETS[bucket]
+    settled = timezone.now() - timedelta(seconds=settings.ANALYTICS_ROLLUP_SETTLE_SECONDS)
+    digest = hashlib.sha256(f"{scope}|{value_key}".encode()).hexdigest()[:32]
+    keys = {s: f"{CACHE_PREFIX}:{digest}:{bucket}:{s.isoformat()}" for s in starts}
+    closed = [s for s in starts if s + step <= settled]
+    found = cache.get_many([keys[s] for s in closed]) if closed else {}
+    cached = {s: found[keys[s]] for s in closed if keys[s] in found}
+    missing = [s for s in starts if s not in cached]
+
+    computed: dict[datetime, dict[str, Any]] = {}
+    if missing:
+        window = qs.filter(at__gte=missing[0], at__lt=missing[-1] + step)
+        if connections[qs.db].vendor == "postgresql":
+            computed = _aggregate_postgresql(window, bucket, value_key)
+        else:
+            computed = _aggregate_python(window, bucket, value_key)
+        to_cache = {
+            keys[s]: computed.get(s) or _empty(s, bool(value_key))
+            for s in missing
+            if s + step <= settled
+        }
+        if to_cache:
+            cache.set_many(to_cache, settings.ANALYTICS_AGG_CACHE_TTL)
+
+    return [cached.get(s) or computed.get(s) or _empty(s, bool(value_key)) for s in starts]
@@ -1,11 +1,86 @@
 from __future__ import annotations
 
-from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import TextField
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast
+from django.db.models.lookups import Exact
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import permissions, serializers, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from apps.common.mixins import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+)
 
+from .aggregation import BUCKETS, aggregate_events
+from .export import EXPORT_FIELDS, gzip_stream, iter_csv, iter_ndjson
 from .models import Event, StatsDaily
+from .pagination import EventKeysetPagination, KeysetModeMixin, StatsDailyKeysetPagination
+
+PROP_PARAM_PREFIX = "props."
+EXPORT_FORMATS = {
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+}
+
+
+def _parse_bound(raw: str, param: str, *, end: bool = False) -> tuple[datetime, bool]:
+    """
+    مقدار ISO یا تاریخ سادهٔ `from`/`to` را به زمان آگاه از منطقهٔ زمانی تبدیل می‌کند.
+
+    Returns:
+        tuple: زمان مرز و اینکه مرز شامل خودش هست یا نه؛ تاریخ سادهٔ `to` کل آن روز را
+        پوشش می‌دهد و به‌صورت مرز انحصاری روز بعد بازگردانده می‌شود.
+    """
+    try:
+        day = parse_date(raw)
+        parsed = None if day else parse_datetime(raw)
+    except ValueError:
+        day = parsed = None
+    if day is not None:
+        parsed = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    elif parsed is None:
+        raise ValidationError({param: "فرمت زمان باید ISO 8601 یا YYYY-MM-DD باشد."})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed, not (end and day is not None)
+
+
+def filter_event_range(qs, params):
+    if from_param := params.get("from"):
+        qs = qs.filter(at__gte=_parse_bound(from_param, "from")[0])
+    if to_param := params.get("to"):
+        bound, inclusive = _parse_bound(to_param, "to", end=True)
+        qs = qs.filter(at__lte=bound) if inclusive else qs.filter(at__lt=bound)
+    return qs
+
+
+def filter_event_props(qs, params):
+    """
+    فیلتر برابری روی کلیدهای مجاز `props` با پارامترهایی مانند `props.gateway=bitpay`.
+
+    مقدار کلید به‌صورت متن مقایسه می‌شود (`props ->> 'key'` در PostgreSQL) تا با ایندکس‌های
+    عبارتی هم‌خوان باشد؛ کلیدهای خارج از `ANALYTICS_EVENT_PROP_FILTERS` خطای اعتبارسنجی دارند.
+    """
+    allowed = settings.ANALYTICS_EVENT_PROP_FILTERS
+    for param, value in params.items():
+        if not param.startswith(PROP_PARAM_PREFIX):
+            continue
+        key = param.removeprefix(PROP_PARAM_PREFIX)
+        if key not in allowed:
+            raise ValidationError({param: f"کلیدهای مجاز: {', '.join(sorted(allowed))}"})
+        qs = qs.filter(Exact(Cast(KT(f"props__{key}"), TextField()), value))
+    return qs
 
 
 class DefaultLimitPagination(PageNumberPagination):
@@ -35,10 +110,19 @@ class EventSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "at", "props"]
 
 
-class DailyStatsViewSet(viewsets.ReadOnlyModelViewSet):
+class DailyStatsViewSet(
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+    KeysetModeMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     permission_classes = [permissions.IsAdminUser]
+    # Rows only change when the rollup runs; dashboards may reuse a page briefly.
+    cache_control = "private, max-age=30"
     serializer_class = StatsDailySerializer
     pagination_class = DefaultLimitPagination
+    keyset_pagination_class = StatsDailyKeysetPagination
     queryset = StatsDaily.objects.all().order_by("-day")
 
     def get_queryset(self):  # noqa: D401
@@ -79,10 +163,11 @@ class DailyStatsViewSet(viewsets.ReadOnlyModelViewSet):
         return qs
 
 
-class EventViewSet(viewsets.ReadOnlyModelViewSet):
+class EventViewSet(ReplicaReadMixin, KeysetModeMixin, viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAdminUser]
     serializer_class = EventSerializer
     pagination_class = DefaultLimitPagination
+    keyset_pagination_class = EventKeysetPagination
     queryset = Event.objects.all().order_by("-at", "-id")
 
     def get_queryset(self):  # noqa: D401
@@ -102,4 +187,78 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
         name = self.request.query_params.get("name")
         if name:
             qs = qs.filter(name=name)
-        return qs
+        qs = filter_event_props(qs, self.request.query_params)
+        return filter_event_range(qs, self.request.query_params)
+
+    @action(detail=False, methods=["get"], url_path="export", pagination_class=None)
+    def export(self, request):
+        """
+        رویدادها را بدون صفحه‌بندی و به‌صورت جریانی (NDJSON یا CSV) خروجی می‌دهد.
+
+        فیلترهای `name`، `from` و `to` مانند فهرست اعمال می‌شوند. پارامتر `fmt` قالب
+        خروجی (`ndjson` پیش‌فرض یا `csv`) و `gzip=1` فشرده‌سازی را تعیین می‌کند. ردیف‌ها با
+        `iterator(chunk_size=...)` خوانده می‌شوند تا مصرف حافظه مستقل از بازهٔ زمانی بماند.
+        """
+        fmt = request.query_params.get("fmt", "ndjson")
+        if fmt not in EXPORT_FORMATS:
+            raise ValidationError({"fmt": f"یکی از {sorted(EXPORT_FORMATS)} را انتخاب کنید."})
+        encoder, content_type = EXPORT_FORMATS[fmt]
+        rows = (
+            self.get_queryset()
+            .order_by("at", "id")
+            .values_list(*EXPORT_FIELDS)
+            .iterator(chunk_size=settings.ANALYTICS_EXPORT_CHUNK_SIZE)
+        )
+        content = encoder(rows)
+        filename = f"events.{fmt}"
+        if request.query_params.get("gzip", "").lower() in {"1", "true", "yes"}:
+            content = gzip_stream(content)
+            content_type = "application/gzip"
+            filename += ".gz"
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Cache-Control"] = "no-store"
+        return response
+
+    @action(detail=False, methods=["get"], url_path="agg", pagination_class=None)
+    def agg(self, request):
+        """
+        شمارش و صدک‌های رویدادهای یک `name` را در بازه‌های ساعتی یا روزانه برمی‌گرداند.
+
+        پارامترها: `name` (الزامی)، `bucket` (`hour` یا `day`)، `from`/`to` و `value` برای
+        محاسبهٔ صدک‌های یک کلید عددی از `props` (مثلاً `tat_ms`). فیلترهای `props.*` نیز اعمال
+        می‌شوند. نتایج بازه‌های بسته‌شده در کش نگه‌داری می‌شوند و فقط بازهٔ جاری دوباره محاسبه
+        می‌شود.
+        """
+        params = request.query_params
+        name = params.get("name")
+        if not name:
+            raise ValidationError({"name": "این پارامتر الزامی است."})
+        bucket = params.get("bucket", "hour")
+        if bucket not in BUCKETS:
+            raise ValidationError({"bucket": f"یکی از {sorted(BUCKETS)} را انتخاب کنید."})
+        value_key = params.get("value") or None
+        if value_key and value_key not in settings.ANALYTICS_AGG_VALUE_KEYS:
+            allowed = ", ".join(sorted(settings.ANALYTICS_AGG_VALUE_KEYS))
+            raise ValidationError({"value": f"کلیدهای مجاز: {allowed}"})
+
+        step = BUCKETS[bucket]
+        end = timezone.now()
+        if params.get("to"):
+            end = _parse_bound(params["to"], "to", end=True)[0]
+        start = end - step * 24
+        if params.get("from"):
+            start = _parse_bound(params["from"], "from")[0]
+        if (end - start) / step > settings.ANALYTICS_AGG_MAX_BUCKETS:
+            raise ValidationError({"from": "بازهٔ زمانی بیش از حد بزرگ است."})
+
+        qs = filter_event_props(Event.objects.using(self.read_db).filter(name=name), params)
+        scope = "&".join(
+            f"{key}={params[key]}"
+            for key in sorted(params)
+            if key == "name" or key.startswith(PROP_PARAM_PREFIX)
+        )
+        results = aggregate_events(
+            qs, scope=scope, bucket=bucket, start=start, end=end, value_key=value_key
+        )
+        return Response({"name": name, "bucket": bucket, "value": value_key, "results": results})
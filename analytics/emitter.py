@@ -0,0 +1,170 @@
+"""Buffered analytics event emitter shared by every app that records `Event` rows."""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+
+class EventBuffer:
+    """Bounded in-process queue of unsaved events flushed with `bulk_create`.
+
+    Producers never block on the database: once `capacity` events are waiting, new
+    events are dropped and counted. With `background=True` a daemon thread performs the
+    inserts whenever `flush_size` events are queued or the oldest one is older than
+    `flush_interval` seconds; otherwise the producer that crosses a threshold flushes.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        flush_size: int,
+        flush_interval: float,
+        background: bool = True,
+    ) -> None:
+        self.capacity = max(capacity, 1)
+        self.flush_size = max(min(flush_size, self.capacity), 1)
+        self.flush_interval = flush_interval
+        self.background = background
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+        self._events: deque[Event] = deque()
+        self._oldest: float | None = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def append(self, event: Event) -> bool:
+        with self._lock:
+            if len(self._events) >= self.capacity:
+                self.dropped += 1
+                return False
+            if not self._events:
+                self._oldest = time.monotonic()
+            self._events.append(event)
+            due = self._due()
+        if self.background:
+            self._ensure_thread()
+            if due:
+                self._wake.set()
+        elif due:
+            self.flush()
+        return True
+
+    def _due(self) -> bool:
+        if len(self._events) >= self.flush_size:
+            return True
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+
+    def _drain(self) -> list[Event]:
+        with self._lock:
+            batch = list(self._events)
+            self._events.clear()
+            self._oldest = None
+        return batch
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            batch = self._drain()
+            if not batch:
+                return 0
+            try:
+                Event.objects.bulk_create(batch, batch_size=self.flush_size)
+            except Exception:
+                self.failed += len(batch)
+                logger.exception("analytics_flush_failed", extra={"extra": {"size": len(batch)}})
+                return 0
+            self.flushed += len(batch)
+            return len(batch)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="analytics-event-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self._events:
+                continue
+            close_old_connections()
+            self.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "buffered": len(self._events),
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "failed": self.failed,
+        }
+
+
+_buffer: EventBuffer | None = None
+_buffer_pid: int | None = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> EventBuffer:
+    """Return this process's buffer, recreating it after a fork (e.g. gunicorn preload)."""
+    global _buffer, _buffer_pid
+    pid = os.getpid()
+    if _buffer is None or _buffer_pid != pid:
+        with _buffer_lock:
+            if _buffer is None or _buffer_pid != pid:
+                _buffer = EventBuffer(
+                    capacity=settings.ANALYTICS_BUFFER_CAPACITY,
+                    flush_size=settings.ANALYTICS_BUFFER_FLUSH_SIZE,
+                    flush_interval=settings.ANALYTICS_BUFFER_FLUSH_SECONDS,
+                )
+                _buffer_pid = pid
+    return _buffer
+
+
+def emit(name: str, *, user: Any = None, **props: Any) -> None:
+    event = Event(name=name, user=user, props=props)
+    if not settings.ANALYTICS_BUFFER_ENABLED:
+        try:
+            event.save()
+        except Exception:  # pragma: no cover
+            logger.exception("analytics_event_failed", extra={"extra": {"name": name}})
+        return
+    get_buffer().append(event)
+
+
+def flush() -> int:
+    if _buffer is None or _buffer_pid != os.getpid():
+        return 0
+    return _buffer.flush()
+
+
+def buffer_stats() -> dict[str, int]:
+    if _buffer is None or _buffer_pid != os.getpid():
+        return {"buffered": 0, "dropped": 0, "flushed": 0, "failed": 0}
+    return _buffer.stats()
+
+
+atexit.register(flush)
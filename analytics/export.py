@@ -0,0 +1,64 @@
+"""Chunked NDJSON/CSV encoders for streaming analytics exports."""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+EXPORT_FIELDS = ("id", "name", "at", "user_id", "props")
+ROWS_PER_CHUNK = 500
+
+Row = tuple[int, str, datetime, int | None, Any]
+
+
+def _batched(rows: Iterable[Row]) -> Iterator[list[Row]]:
+    batch: list[Row] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= ROWS_PER_CHUNK:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_ndjson(rows: Iterable[Row]) -> Iterator[bytes]:
+    for batch in _batched(rows):
+        lines = [
+            json.dumps(
+                dict(zip(EXPORT_FIELDS, (pk, name, at.isoformat(), user_id, props), strict=True)),
+                ensure_ascii=False,
+                default=str,
+            )
+            for pk, name, at, user_id, props in batch
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_csv(rows: Iterable[Row]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in _batched(rows):
+        for pk, name, at, user_id, props in batch:
+            writer.writerow(
+                (pk, name, at.isoformat(), user_id or "", json.dumps(props, ensure_ascii=False))
+            )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
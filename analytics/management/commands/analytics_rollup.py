@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from analytics.rollup import run_rollup
+
+
+class Command(BaseCommand):
+    help = "Fold new analytics events into StatsDaily, resuming from the stored watermark."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Override ANALYTICS_ROLLUP_BATCH_SIZE for this run.",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=0,
+            help="Stop after this many batches (0 means until caught up).",
+        )
+
+    def handle(self, *args, **options):
+        consumed = run_rollup(
+            batch_size=options["batch_size"], max_batches=options["max_batches"]
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {consumed} events."))
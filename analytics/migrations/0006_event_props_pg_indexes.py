@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# PostgreSQL only: SQLite binds JSON paths as parameters, so it can never use such indexes.
+EXPRESSION_KEYS = ("gateway", "currency", "service")
+GIN_INDEX = "analytics_event_props_gin_idx"
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("analytics", "Event")._meta.db_table
+    for key in EXPRESSION_KEYS:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS analytics_event_{key}_idx "
+            f"ON {table} ((props ->> '{key}'))"
+        )
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {GIN_INDEX} "
+        f"ON {table} USING gin (props jsonb_path_ops)"
+    )
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in (*(f"analytics_event_{key}_idx" for key in EXPRESSION_KEYS), GIN_INDEX):
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("analytics", "0005_event_props_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
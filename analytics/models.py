@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class Event(models.Model):
@@ -8,11 +9,18 @@ class Event(models.Model):
         settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL
     )
     props = models.JSONField(default=dict, blank=True)
-    at = models.DateTimeField(auto_now_add=True, db_index=True)
+    at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(name="analytics_event_at_idx", fields=["at"]),
+            models.Index(name="analytics_event_name_at_idx", fields=["name", "at"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name}@{self.at:%Y-%m-%d %H:%M:%S}"
 
+
 class StatsDaily(models.Model):
     day = models.DateField(db_index=True, unique=True)
     rx_started = models.PositiveIntegerField(default=0)
@@ -22,5 +30,25 @@ class StatsDaily(models.Model):
     pay_tat_p95_ms = models.PositiveIntegerField(default=0)
     apk_downloads = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        indexes = [models.Index(name="analytics_statsdaily_day_idx", fields=["day"])]
+
     def __str__(self) -> str:
         return f"StatsDaily({self.day})"
+
+
+class RollupWatermark(models.Model):
+    name = models.CharField(max_length=60, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"RollupWatermark({self.name}@{self.last_event_id})"
+
+
+class DailyTatSketch(models.Model):
+    day = models.DateField(unique=True)
+    sketch = models.JSONField(default=dict, blank=True)
+
+    def __str__(self) -> str:
+        return f"DailyTatSketch({self.day})"
@@ -0,0 +1,144 @@
+"""Keyset (cursor) pagination for the append-heavy analytics tables."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import date
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only keyset pagination over a descending composite ordering.
+
+    Pages are fetched with `WHERE (f1, f2) < (v1, v2) ... LIMIT n + 1`, so every page costs
+    the same regardless of depth and no `COUNT(*)` is issued. Cursors are opaque base64 tokens
+    carrying the ordering values of the last row served.
+    """
+
+    ordering: tuple[str, ...] = ("-id",)
+    page_size = 50
+    page_size_query_param = "limit"
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def _fields(self) -> list[str]:
+        return [field.lstrip("-") for field in self.ordering]
+
+    def get_page_size(self, request) -> int:
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw is None:
+            return self.page_size
+        try:
+            size = int(raw)
+        except ValueError:
+            size = 0
+        if size < 1:
+            raise ValidationError({self.page_size_query_param: "باید عدد صحیح مثبت باشد."})
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request) -> list[str] | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message) from None
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, values: list) -> str:
+        raw = json.dumps(
+            [value.isoformat() if isinstance(value, date) else value for value in values]
+        )
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def _after(self, values: list[str]) -> Q:
+        fields = self._fields()
+        condition = Q()
+        for idx, field in enumerate(fields):
+            step = Q(**{f"{field}__lt": values[idx]})
+            for prev, value in zip(fields[:idx], values[:idx], strict=True):
+                step &= Q(**{prev: value})
+            condition |= step
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._after(position))
+            except (TypeError, ValueError, DjangoValidationError) as exc:
+                raise NotFound(self.invalid_cursor_message) from exc
+        rows = list(queryset[: self.page_size + 1])
+        self.next_values = None
+        if len(rows) > self.page_size:
+            rows = rows[: self.page_size]
+            last = rows[-1]
+            self.next_values = [getattr(last, field) for field in self._fields()]
+        return rows
+
+    def get_next_link(self) -> str | None:
+        if self.next_values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.next_values)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class EventKeysetPagination(KeysetPagination):
+    ordering = ("-at", "-id")
+
+
+class StatsDailyKeysetPagination(KeysetPagination):
+    ordering = ("-day",)
+
+
+class KeysetModeMixin:
+    """Switch a viewset to `keyset_pagination_class` for `?paginate=cursor` or `?cursor=`."""
+
+    keyset_pagination_class: type[KeysetPagination] | None = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            keyset = self.keyset_pagination_class and (
+                params.get("paginate") == "cursor" or "cursor" in params
+            )
+            pagination_class = self.keyset_pagination_class if keyset else self.pagination_class
+            self._paginator = pagination_class() if pagination_class else None
+        return self._paginator
+
+
+__all__ = [
+    "EventKeysetPagination",
+    "KeysetModeMixin",
+    "KeysetPagination",
+    "StatsDailyKeysetPagination",
+]
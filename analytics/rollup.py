@@ -0,0 +1,105 @@
+"""Incremental `StatsDaily` rollup fed from the `Event` stream."""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.common.generations import bump_on_commit
+
+from .models import DailyTatSketch, Event, RollupWatermark, StatsDaily
+from .sketch import DDSketch
+
+WATERMARK_NAME = "stats_daily"
+SKETCH_ACCURACY = 0.01
+COUNTER_FIELDS = {
+    "pay_success": "pay_success",
+    "rx_started": "rx_started",
+    "rx_delivered": "rx_delivered",
+    "apk_download": "apk_downloads",
+}
+
+
+def _tat_ms(props: Any) -> float | None:
+    if not isinstance(props, dict):
+        return None
+    try:
+        return float(props["tat_ms"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _apply(counters: dict[date, dict[str, int]], sketches: dict[date, DDSketch]) -> None:
+    for day in counters.keys() | sketches.keys():
+        stats, _ = StatsDaily.objects.select_for_update().get_or_create(day=day)
+        updates: dict[str, Any] = {
+            field: F(field) + amount for field, amount in counters.get(day, {}).items()
+        }
+        if day in sketches:
+            stored, _ = DailyTatSketch.objects.select_for_update().get_or_create(day=day)
+            merged = DDSketch.from_dict(stored.sketch, SKETCH_ACCURACY)
+            merged.merge(sketches[day])
+            stored.sketch = merged.to_dict()
+            stored.save(update_fields=["sketch"])
+            updates["pay_tat_p50_ms"] = round(merged.quantile(0.5) or 0)
+            updates["pay_tat_p95_ms"] = round(merged.quantile(0.95) or 0)
+        if updates:
+            StatsDaily.objects.filter(pk=stats.pk).update(**updates)
+    if counters or sketches:
+        # `update()` sends no post_save; invalidate ETags/cached pages explicitly.
+        bump_on_commit(StatsDaily)
+
+
+def _rollup_batch(batch_size: int, cutoff) -> int:
+    """Fold the next batch of settled events into StatsDaily; returns events consumed."""
+    with transaction.atomic():
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(
+            name=WATERMARK_NAME
+        )
+        rows = (
+            Event.objects.filter(id__gt=watermark.last_event_id)
+            .order_by("id")
+            .values_list("id", "name", "at", "props")[:batch_size]
+        )
+        counters: dict[date, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        sketches: dict[date, DDSketch] = {}
+        consumed = 0
+        last_id = watermark.last_event_id
+        for event_id, name, at, props in rows:
+            if at > cutoff:
+                # Events are not guaranteed to commit in id order; stop at the first
+                # unsettled row so late commits below it are not skipped.
+                break
+            consumed += 1
+            last_id = event_id
+            field = COUNTER_FIELDS.get(name)
+            if field is None:
+                continue
+            day = timezone.localtime(at).date()
+            counters[day][field] += 1
+            if name == "pay_success" and (tat := _tat_ms(props)) is not None:
+                sketches.setdefault(day, DDSketch(SKETCH_ACCURACY)).add(tat)
+        if consumed:
+            _apply(counters, sketches)
+            watermark.last_event_id = last_id
+            watermark.save(update_fields=["last_event_id", "updated_at"])
+        return consumed
+
+
+def run_rollup(batch_size: int | None = None, max_batches: int = 0) -> int:
+    """Consume events past the stored watermark; returns the number of events read."""
+    batch_size = max(batch_size or settings.ANALYTICS_ROLLUP_BATCH_SIZE, 1)
+    cutoff = timezone.now() - timedelta(seconds=settings.ANALYTICS_ROLLUP_SETTLE_SECONDS)
+    total = batches = 0
+    while not max_batches or batches < max_batches:
+        consumed = _rollup_batch(batch_size, cutoff)
+        total += consumed
+        batches += 1
+        if consumed < batch_size:
+            break
+    return total
@@ -0,0 +1,84 @@
+"""Mergeable quantile sketch used by the daily payment TAT rollup."""
+from __future__ import annotations
+
+import math
+from typing import Any
+
+
+class DDSketch:
+    """Minimal DDSketch: log-spaced buckets with a bounded relative error.
+
+    Any quantile is returned within ``relative_accuracy`` of a real sample value, and two
+    sketches with the same accuracy merge by adding bucket counts, so per-batch sketches can
+    be folded into a stored per-day sketch without keeping the raw samples.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value <= 0:
+            self.zero_count += weight
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + weight
+        self.count += weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: DDSketch) -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different accuracy")
+        for key, weight in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + weight
+        self.zero_count += other.zero_count
+        self.count += other.count
+        for bound in (other.min, other.max):
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                estimate = 2 * self.gamma**key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "alpha": self.relative_accuracy,
+            "zero": self.zero_count,
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "bins": {str(key): weight for key, weight in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None, relative_accuracy: float = 0.01) -> DDSketch:
+        if not data:
+            return cls(relative_accuracy)
+        sketch = cls(data.get("alpha", relative_accuracy))
+        sketch.zero_count = int(data.get("zero", 0))
+        sketch.count = int(data.get("count", 0))
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        sketch.bins = {int(key): int(weight) for key, weight in data.get("bins", {}).items()}
+        return sketch
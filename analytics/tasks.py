@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task
+
+from . import emitter
+from .rollup import run_rollup
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_events() -> int:
+    flushed = emitter.flush()
+    if flushed:
+        logger.info("Flushed buffered analytics events", extra={"extra": {"count": flushed}})
+    return flushed
+
+
+@shared_task
+def rollup_stats() -> int:
+    consumed = run_rollup()
+    logger.info("Scheduled analytics rollup completed", extra={"extra": {"count": consumed}})
+    return consumed
@@ -0,0 +1,116 @@
+"""Stateless signed-token authentication for API clients.
+
+Access tokens are `django.core.signing` payloads (HMAC-SHA256 over the user id, staff and
+superuser flags, token kind and a random id) with an embedded timestamp, so verifying one
+needs no database or cache round trip. The request user is rebuilt from the claims with
+`pk`, `is_staff`, `is_superuser` and `is_active` set and every other field deferred, as with
+`QuerySet.only()`: reading e.g. `username` loads that column on first access.
+
+Only refresh tokens are revoked (on rotation and logout). Each revoked id gets its own cache
+key, `auth:revoked:<jti>`, expiring with the token, and is checked only when a refresh token
+is decoded; access tokens are short-lived and never consult the cache. A revocation in a
+per-process cache would not reach the other processes, so without `CACHE_SHARED` no refresh
+tokens are issued or accepted.
+"""
+from __future__ import annotations
+
+import secrets
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+ACCESS = "access"
+REFRESH = "refresh"
+_SALT = "helssa.auth.token"
+_REVOKED_PREFIX = "auth:revoked:"
+
+
+def _ttl(kind: str) -> int:
+    return settings.AUTH_ACCESS_TOKEN_TTL if kind == ACCESS else settings.AUTH_REFRESH_TOKEN_TTL
+
+
+def issue_token(user, kind: str = ACCESS) -> str:
+    claims = {
+        "uid": user.pk,
+        "staff": bool(user.is_staff),
+        "su": bool(user.is_superuser),
+        "kind": kind,
+        "jti": secrets.token_hex(8),
+    }
+    return signing.dumps(claims, salt=_SALT, compress=False)
+
+
+def issue_pair(user) -> dict[str, Any]:
+    """Access token, plus a refresh token when revocations can be shared across processes."""
+    pair = {"access": issue_token(user, ACCESS), "expires_in": settings.AUTH_ACCESS_TOKEN_TTL}
+    if settings.CACHE_SHARED:
+        pair["refresh"] = issue_token(user, REFRESH)
+    return pair
+
+
+def decode_token(token: str, kind: str = ACCESS) -> dict[str, Any]:
+    """Claims of a valid, unexpired and unrevoked `kind` token, else `AuthenticationFailed`."""
+    if kind == REFRESH and not settings.CACHE_SHARED:
+        raise AuthenticationFailed("Refresh tokens are disabled.")
+    try:
+        claims = signing.loads(token, salt=_SALT, max_age=_ttl(kind))
+    except signing.SignatureExpired:
+        raise AuthenticationFailed("Token expired.") from None
+    except signing.BadSignature:
+        raise AuthenticationFailed("Invalid token.") from None
+    if not isinstance(claims, dict) or claims.get("kind") != kind:
+        raise AuthenticationFailed("Invalid token.")
+    if kind == REFRESH and cache.get(_REVOKED_PREFIX + claims["jti"]) is not None:
+        raise AuthenticationFailed("Token revoked.")
+    return claims
+
+
+def revoke(claims: dict[str, Any]) -> bool:
+    """Reject the token with these claims from now on (until it would have expired anyway).
+
+    Returns False if it was already revoked. `cache.add` is atomic in the shared cache, so of
+    two concurrent rotations of the same refresh token only one gets True.
+    """
+    return cache.add(_REVOKED_PREFIX + claims["jti"], 1, _ttl(claims["kind"]))
+
+
+def token_user(claims: dict[str, Any]):
+    """The user the token asserts, built without a query; other fields load on first access."""
+    model = get_user_model()
+    known = {
+        model._meta.pk.attname: claims["uid"],
+        "is_staff": claims["staff"],
+        "is_superuser": claims.get("su", False),
+        "is_active": True,
+    }
+    # `from_db` expects the values in concrete field order.
+    names = [f.attname for f in model._meta.concrete_fields if f.attname in known]
+    return model.from_db(DEFAULT_DB_ALIAS, names, [known[name] for name in names])
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """`Authorization: Bearer <access token>`; other schemes fall through to the next class."""
+
+    keyword = b"bearer"
+
+    def authenticate(self, request):
+        parts = get_authorization_header(request).split()
+        if not parts or parts[0].lower() != self.keyword:
+            return None
+        if len(parts) != 2:
+            raise AuthenticationFailed("Invalid token header.")
+        try:
+            token = parts[1].decode("ascii")
+        except UnicodeError:
+            raise AuthenticationFailed("Invalid token header.") from None
+        claims = decode_token(token, ACCESS)
+        return token_user(claims), claims
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="api"'
@@ -0,0 +1,60 @@
+"""Per-model generation stamps used as cheap cache validators.
+
+Each tracked model has a cache entry `gen:<app_label.model>` holding the `time.time_ns()` of
+its last change. `post_save`/`post_delete` (and code paths that bypass signals, such as
+queryset `update()`) call `bump()`. Readers fetch all the stamps they depend on with
+one `get_many`. A missing entry (new cache or eviction) is initialised to "now", which can
+only cause an extra miss, never a stale hit.
+"""
+from __future__ import annotations
+
+import time
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+PREFIX = "gen:"
+
+
+def _key(model) -> str:
+    return PREFIX + model._meta.label_lower
+
+
+def bump(*models) -> None:
+    cache.set_many({_key(model): time.time_ns() for model in models}, timeout=None)
+
+
+def bump_on_commit(*models) -> None:
+    """Bump now and again after commit, so readers that raced the commit miss as well."""
+    bump(*models)
+    transaction.on_commit(partial(bump, *models))
+
+
+def generations(*models) -> dict[str, int]:
+    """Change stamps (nanoseconds) keyed by model label, in one cache round trip."""
+    keys = [_key(model) for model in models]
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        for key, stamp in missing.items():
+            cache.add(key, stamp, timeout=None)
+        found.update(cache.get_many(list(missing)))
+        # An eviction between add() and get_many() must still produce a fresh stamp.
+        found.update({key: stamp for key, stamp in missing.items() if key not in found})
+    return {key.removeprefix(PREFIX): found[key] for key in keys}
+
+
+def _changed(sender, **kwargs) -> None:
+    bump_on_commit(sender)
+
+
+def connect() -> None:
+    """Track every model in `GENERATION_TRACKED_MODELS`; called from `CommonConfig.ready()`."""
+    for label in settings.GENERATION_TRACKED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_changed, sender=model, dispatch_uid=f"generation:{label}:save")
+        post_delete.connect(_changed, sender=model, dispatch_uid=f"generation:{label}:delete")
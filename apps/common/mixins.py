@@ -0,0 +1,208 @@
+"""Reusable DRF view mixins."""
+from __future__ import annotations
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, urlencode
+from rest_framework.permissions import SAFE_METHODS
+
+from core.db import read_alias
+
+from .generations import generations
+
+CONDITIONAL_METHODS = frozenset({"GET", "HEAD"})
+
+
+class _ShortCircuitError(Exception):
+    """Raised from `initial()` to answer with `response` instead of running the handler."""
+
+    def __init__(self, response) -> None:
+        self.response = response
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+
+
+class _GenerationMixin:
+    """Shared by the mixins whose validity follows `apps.common.generations` stamps."""
+
+    validator_models: tuple = ()
+
+    def get_validator_models(self) -> tuple:
+        return self.validator_models or (self.queryset.model,)
+
+    def generation_stamps(self) -> dict[str, int]:
+        """Stamps for `get_validator_models()`, fetched once per request."""
+        if getattr(self, "_generation_stamps", None) is None:
+            self._generation_stamps = generations(*self.get_validator_models())
+        return self._generation_stamps
+
+    def stamps_settled(self) -> bool:
+        """Whether this request's rows are known to reflect the newest stamp.
+
+        A replica read (see `ReplicaReadMixin`) may lag a write by up to
+        `DATABASE_REPLICA_MAX_LAG_SECONDS`; until that has passed since the last bump, rows read
+        there must not be published under the new stamps.
+        """
+        if getattr(self, "read_db", DEFAULT_DB_ALIAS) == DEFAULT_DB_ALIAS:
+            return True
+        age_ns = time.time_ns() - max(self.generation_stamps().values())
+        return age_ns >= settings.DATABASE_REPLICA_MAX_LAG_SECONDS * 1_000_000_000
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _ShortCircuitError):
+            return exc.response
+        return super().handle_exception(exc)
+
+
+class ReplicaReadMixin:
+    """Run safe-method querysets on the read replica (see `core.db.read_alias`).
+
+    The alias is chosen once per request, after authentication, and bound with `.using()`
+    so lazily evaluated querysets (e.g. streamed exports) stay on it.
+    """
+
+    read_db = DEFAULT_DB_ALIAS
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            self.read_db = read_alias(request.user)
+
+    def get_queryset(self):
+        return super().get_queryset().using(self.read_db)
+
+
+class ConditionalGetMixin(_GenerationMixin):
+    """Answer `If-None-Match` with 304 before any query or serialization.
+
+    The ETag hashes the generation stamps of `validator_models` (see
+    `apps.common.generations`) with the full path and the caller's scope. Checking it costs one
+    cache round trip after authentication and permission checks. `Last-Modified` (the newest
+    stamp) is informational only: two changes within one second share it, so
+    `If-Modified-Since` is not honoured. `cache_control` is sent with both 200 and 304
+    responses. No validators are issued while `stamps_settled()` is false, nor without
+    `CACHE_SHARED`: a bump stored in one process's LocMem is invisible to the others, which
+    would keep answering 304 for data that has changed.
+    """
+
+    cache_control = "private, no-cache"
+
+    def get_validator_scope(self, request) -> str:
+        user = request.user
+        return f"user:{user.pk}:{int(user.is_staff)}" if user.is_authenticated else "anon"
+
+    def get_validators(self, request) -> tuple[str, int]:
+        stamps = self.generation_stamps()
+        digest = _digest(
+            request.get_full_path(),
+            self.get_validator_scope(request),
+            *(f"{label}={stamp}" for label, stamp in sorted(stamps.items())),
+        )
+        return f'"{digest}"', max(stamps.values()) // 1_000_000_000
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if (
+            request.method in CONDITIONAL_METHODS
+            and settings.CACHE_SHARED
+            and self.stamps_settled()
+        ):
+            self.validators = self.get_validators(request)
+            response = get_conditional_response(request._request, etag=self.validators[0])
+            if response is not None:
+                raise _ShortCircuitError(response)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, "validators", None)
+        if validators and response.status_code in (200, 304):
+            response["ETag"] = validators[0]
+            response["Last-Modified"] = http_date(validators[1])
+            response["Cache-Control"] = self.cache_control
+        return response
+
+
+class CachedResponseMixin(_GenerationMixin):
+    """Serve repeated GETs from the cache without touching the database or serializers.
+
+    Entries are keyed by view, host, path, normalized query string, accepted format, caller
+    scope and the generation stamps of `validator_models`, so a save or delete on any of those
+    models retires every entry at once without scanning keys. Only list/retrieve-style
+    200 responses are stored, as rendered bytes, for `RESPONSE_CACHE_TIMEOUT` seconds, and
+    never while `stamps_settled()` is false: the scope is shared, so a lagging replica read
+    stored under new stamps would also be served to the writer pinned to the primary.
+    Both hits and misses carry `Vary: Accept`, since the format is part of the key.
+
+    Without `CACHE_SHARED` the mixin does nothing: a bump stored in one process's LocMem
+    would not retire the entries held by the others.
+    """
+
+    cached_actions = frozenset({None, "list", "retrieve"})
+
+    def get_cache_scope(self, request) -> str:
+        """Callers sharing a scope see identical data; staff share one."""
+        user = request.user
+        if not user.is_authenticated:
+            return "anon"
+        return "staff" if user.is_staff else f"user:{user.pk}"
+
+    def get_response_cache_key(self, request) -> str:
+        params = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values
+        )
+        stamps = self.generation_stamps()
+        digest = _digest(
+            request.get_host(),
+            request.path,
+            urlencode(params),
+            request.accepted_renderer.format,
+            self.get_cache_scope(request),
+            *(f"{label}={stamp}" for label, stamp in sorted(stamps.items())),
+        )
+        return f"resp:{type(self).__name__}:{digest}"
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.response_cache_key = None
+        if (
+            not settings.CACHE_SHARED
+            or request.method != "GET"
+            or getattr(self, "action", None) not in self.cached_actions
+        ):
+            return
+        self.response_cache_key = self.get_response_cache_key(request)
+        cached = cache.get(self.response_cache_key)
+        if cached is not None:
+            status, content_type, content = cached
+            response = HttpResponse(content, content_type=content_type, status=status)
+            response["X-Cache"] = "hit"
+            patch_vary_headers(response, ("Accept",))
+            raise _ShortCircuitError(response)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, "response_cache_key", None)
+        if key and response.status_code == 200 and not response.streaming:
+            if not response.has_header("X-Cache"):
+                if self.stamps_settled():
+                    if hasattr(response, "render"):
+                        response.render()
+                    cache.set(
+                        key,
+                        (response.status_code, response["Content-Type"], response.content),
+                        settings.RESPONSE_CACHE_TIMEOUT,
+                    )
+                response["X-Cache"] = "miss"
+                patch_vary_headers(response, ("Accept",))
+        return response
@@ -1,5 +1,68 @@
+from collections.abc import Mapping
+
+from django.contrib.auth import authenticate, get_user_model
 from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .auth import REFRESH, decode_token, issue_pair, revoke
 
 
 def health(request):
     return JsonResponse({"status": "ok"})
+
+
+def _required(request, field: str) -> str:
+    if not isinstance(request.data, Mapping):
+        raise ValidationError("Expected an object.")
+    value = request.data.get(field)
+    if not value or not isinstance(value, str):
+        raise ValidationError({field: "This field is required."})
+    return value
+
+
+class _TokenView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = ()
+
+    def get_authenticate_header(self, request):
+        # Answer bad credentials with 401 rather than DRF's 403 for header-less auth.
+        return 'Bearer realm="api"'
+
+
+class TokenObtainView(_TokenView):
+    """Exchange username/password for an access/refresh token pair."""
+
+    def post(self, request):
+        user = authenticate(
+            request,
+            username=_required(request, "username"),
+            password=_required(request, "password"),
+        )
+        if user is None:
+            raise AuthenticationFailed("Invalid credentials.")
+        return Response(issue_pair(user))
+
+
+class TokenRefreshView(_TokenView):
+    """Rotate a refresh token: the old one is revoked and a new pair is issued."""
+
+    def post(self, request):
+        claims = decode_token(_required(request, "refresh"), REFRESH)
+        # The only database read in the token flow: pick up deactivation and staff changes.
+        user = get_user_model().objects.filter(pk=claims["uid"], is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("User inactive or deleted.")
+        if not revoke(claims):
+            raise AuthenticationFailed("Token revoked.")
+        return Response(issue_pair(user))
+
+
+class TokenRevokeView(_TokenView):
+    """Revoke a refresh token (logout); outstanding access tokens expire on their own."""
+
+    def post(self, request):
+        revoke(decode_token(_required(request, "refresh"), REFRESH))
+        return Response(status=204)
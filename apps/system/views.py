@@ -3,6 +3,10 @@ from __future__ import annotations
 import logging
 import os
 import subprocess
+import threading
+import time
+from datetime import UTC, datetime
+from functools import lru_cache
 from uuid import uuid4
 
 from celery import current_app as celery_app
@@ -14,16 +18,18 @@ from django.utils import timezone
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.views import APIView
 
-from perf.metrics import note_ready_success
+from perf.metrics import note_ready_check, note_ready_success
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def _version() -> str:
     """
     نسخهٔ جاری برنامه را تعیین می‌کند با اولویت‌بندی: متغیر محیطی HELSSA_VERSION، تنظیمات
     APP_VERSION، و در صورت نبودن آن‌ها تلاش برای استخراج آخرین تگ گیت؛ در نهایت در صورت
-    هرگونه مشکل مقدار پیش‌فرض "v2.0.0" را برمی‌گرداند.
+    هرگونه مشکل مقدار پیش‌فرض "v2.0.0" را برمی‌گرداند. نتیجه برای هر پروسه یک بار محاسبه
+    و نگه‌داری می‌شود تا `git describe` در هر درخواست اجرا نشود.
     
     Returns:
         str: رشتهٔ نسخهٔ برنامه؛ مقدار ممکن شامل مقدار HELSSA_VERSION، مقدار
@@ -66,78 +72,151 @@ class SystemHealthView(APIView):
         )
 
 
+def _check_db() -> dict:
+    connection.ensure_connection()
+    return {"status": "ok"}
+
+
+def _check_cache() -> dict:
+    # TieredCache answers from its in-process tier; probe the shared backend directly.
+    backend = getattr(cache, "remote", cache)
+    probe_key = f"ready-probe-{uuid4()}"
+    backend.set(probe_key, "1", timeout=5)
+    cache_ok = backend.get(probe_key) == "1"
+    backend.delete(probe_key)
+    return {"status": "ok" if cache_ok else "fail", "backend": type(backend).__name__}
+
+
+def _check_celery() -> dict:
+    workers = celery_app.control.ping(timeout=1.0)
+    return {"status": "ok" if workers else "fail", "workers": workers}
+
+
+READY_CHECKS = (("db", _check_db), ("cache", _check_cache), ("celery", _check_celery))
+
+_snapshot: dict | None = None
+_probe_lock = threading.Lock()
+_prober: threading.Thread | None = None
+_prober_lock = threading.Lock()
+
+
+def probe() -> dict:
+    """
+    همهٔ بررسی‌های آمادگی را اجرا و نتیجه را همراه زمان بررسی به‌عنوان snapshot جاری ذخیره می‌کند.
+
+    زمان اجرای هر بررسی در `latency_ms` و گیج‌های `/metrics` ثبت می‌شود؛ استثناء هر مؤلفه
+    به‌صورت `status="fail"` با نام کلاس استثناء در `error` گزارش می‌شود.
+    """
+    global _snapshot
+    components, latency = {}, {}
+    for name, check in READY_CHECKS:
+        started = time.perf_counter()
+        try:
+            components[name] = check()
+        except Exception as exc:  # pragma: no cover - db/cache/broker outages hard to simulate
+            components[name] = {"status": "fail", "error": exc.__class__.__name__}
+            logger.exception("%s readiness check failed", name)
+        elapsed = time.perf_counter() - started
+        latency[name] = round(elapsed * 1000, 2)
+        note_ready_check(name, elapsed, components[name]["status"] == "ok")
+
+    ok = all(component["status"] == "ok" for component in components.values())
+    if ok:
+        note_ready_success()
+    else:
+        logger.warning("system readiness degraded", extra={"components": components})
+    _snapshot = {
+        "ok": ok,
+        "checked_at": time.time(),
+        "components": components,
+        "latency_ms": latency,
+    }
+    return _snapshot
+
+
+def _run_prober(interval: float) -> None:
+    while True:
+        try:
+            probe()
+        except Exception:  # pragma: no cover - keep probing after unexpected errors
+            logger.exception("readiness prober failed")
+        finally:
+            # This thread's connection would otherwise stay checked out for the process lifetime.
+            connection.close()
+        time.sleep(interval)
+
+
+def _ensure_prober() -> None:
+    global _prober
+    if _prober is not None and _prober.is_alive():
+        return
+    with _prober_lock:
+        # Also covers forked workers: the parent's thread does not exist in the child.
+        if _prober is None or not _prober.is_alive():
+            _prober = threading.Thread(
+                target=_run_prober,
+                args=(settings.READY_PROBE_INTERVAL_SECONDS,),
+                name="readiness-prober",
+                daemon=True,
+            )
+            _prober.start()
+
+
+def readiness_snapshot() -> dict:
+    """
+    آخرین snapshot آمادگی را برمی‌گرداند و فقط وقتی قدیمی‌تر از `READY_SNAPSHOT_MAX_AGE_SECONDS`
+    باشد (یا هنوز وجود نداشته باشد) بررسی‌ها را همین‌جا اجرا می‌کند.
+
+    مقدار `0` برای `READY_SNAPSHOT_MAX_AGE_SECONDS` هر درخواست را به بررسی مستقیم می‌فرستد.
+    با مقدار مثبت `READY_PROBE_INTERVAL_SECONDS` (پیش‌فرض `0`، خاموش) یک thread پس‌زمینه
+    در هر پروسه snapshot را تازه نگه می‌دارد؛ چون هر پروسهٔ وب جداگانه Celery را `ping`
+    می‌کند، فقط برای تعداد کم پروسه مناسب است.
+    """
+    max_age = settings.READY_SNAPSHOT_MAX_AGE_SECONDS
+    if max_age > 0 and settings.READY_PROBE_INTERVAL_SECONDS > 0:
+        _ensure_prober()
+    snapshot = _snapshot
+    if snapshot is None or time.time() - snapshot["checked_at"] >= max_age:
+        with _probe_lock:
+            snapshot = _snapshot
+            if snapshot is None or time.time() - snapshot["checked_at"] >= max_age:
+                snapshot = probe()
+    return snapshot
+
+
 class SystemReadyView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request, *args, **kwargs):
         """
-        وضعیت آماده‌به‌کار هر مؤلفهٔ سیستم را بررسی و وضعیت کلی را بازمی‌گرداند.
-        
-        این متد سه بررسی جداگانه انجام می‌دهد و نتایج هر یک را در فیلد `components` جمع‌آوری می‌کند:
-        - `db`: اتصال به پایگاه‌داده را با `connection.ensure_connection()` بررسی می‌کند؛
-          مقدار `status` برابر `"ok"` در صورت موفقیت و `"fail"` در صورت شکست است و در
-          شکست نام کلاس استثناء در فیلد `error` قرار می‌گیرد.
-        - `cache`: با نوشتن و خواندن یک کلید موقت وضعیت کش را آزمایش می‌کند؛ `status` برابر
-          `"ok"` وقتی مقدار خوانده‌شده مطابق انتظار باشد، و در غیر این‌صورت `"fail"` است.
-          در صورت استثناء، نام کلاس استثناء در `error` گزارش می‌شود.
-        - `celery`: با فراخوانی `celery_app.control.ping(timeout=1.0)` وضعیت کارگران/بروکر
-          سلری را بررسی می‌کند؛ فیلد `workers` نتیجهٔ `ping` و `status` برابر `"ok"` یا
-          `"fail"` خواهد بود. در صورت استثناء، نام کلاس استثناء در `error` قرار می‌گیرد.
-        
-        اگر هر یک از مؤلفه‌ها دچار شکست یا استثناء شود، وضعیت کلی به‌عنوان کاهش‌یافته (`degraded`)
-        گزارش و کد وضعیت HTTP به 503 تغییر می‌کند. در حین بررسی‌ها، خطاها و وضعیت کاهش‌یافته با
-        logger ثبت می‌شوند.
-        
+        وضعیت آماده‌به‌کار مؤلفه‌های سیستم را از آخرین snapshot بررسی‌ها بازمی‌گرداند.
+
+        بررسی‌ها در `probe()` انجام می‌شوند و معمولاً thread پس‌زمینه آن‌ها را اجرا می‌کند، پس
+        این درخواست منتظر اتصال پایگاه‌داده یا `ping` سلری نمی‌ماند (نگاه کنید به
+        `readiness_snapshot`):
+        - `db`: اتصال به پایگاه‌داده با `connection.ensure_connection()`.
+        - `cache`: نوشتن، خواندن و حذف یک کلید موقت روی backend مشترک (در `TieredCache` لایهٔ
+          remote و نه LRU داخل پروسه)؛ نام کلاس آن در `backend` می‌آید.
+        - `celery`: فراخوانی `celery_app.control.ping(timeout=1.0)`؛ نتیجه در `workers`.
+
         Returns:
-            JsonResponse: پاسخ JSON با دو کلید:
-                - `status`: رشته `"ok"` وقتی همهٔ مؤلفه‌ها سالم باشند، یا `"degraded"` در
-                  غیر این‌صورت.
-                - `components`: دیکشنری حاوی وضعیت هر مؤلفه (`db`, `cache`, `celery`) و
-                  اطلاعات مرتبط (مثلاً `error` یا `workers`).
+            JsonResponse: پاسخ JSON با کلیدهای:
+                - `status`: `"ok"` وقتی همهٔ مؤلفه‌ها سالم باشند، یا `"degraded"`.
+                - `components`: وضعیت هر مؤلفه (`db`, `cache`, `celery`) و اطلاعات مرتبط
+                  (مثلاً `error` یا `workers`).
+                - `checked_at` و `age_seconds`: زمان اجرای بررسی‌ها و عمر snapshot.
+                - `latency_ms`: مدت اجرای هر بررسی به میلی‌ثانیه.
             وضعیت HTTP مربوطه 200 برای سالم و 503 برای کاهش‌یافته.
         """
-        components = {}
-        status_code = 200
-
-        try:
-            connection.ensure_connection()
-            components["db"] = {"status": "ok"}
-        except Exception as exc:  # pragma: no cover - difficult to simulate
-            components["db"] = {"status": "fail", "error": exc.__class__.__name__}
-            logger.exception("database readiness check failed")
-            status_code = 503
-
-        try:
-            probe_key = f"ready-probe-{uuid4()}"
-            cache.set(probe_key, "1", timeout=1)
-            cache_ok = cache.get(probe_key) == "1"
-            cache.delete(probe_key)
-            components["cache"] = {"status": "ok" if cache_ok else "fail"}
-            if not cache_ok:
-                status_code = 503
-        except Exception as exc:  # pragma: no cover - cache misconfig rare
-            components["cache"] = {"status": "fail", "error": exc.__class__.__name__}
-            logger.exception("cache readiness check failed")
-            status_code = 503
-
-        try:
-            workers = celery_app.control.ping(timeout=1.0)
-            celery_ok = bool(workers)
-            components["celery"] = {"status": "ok" if celery_ok else "fail", "workers": workers}
-            if not celery_ok:
-                status_code = 503
-        except Exception as exc:  # pragma: no cover - broker unavailable
-            components["celery"] = {"status": "fail", "error": exc.__class__.__name__}
-            logger.exception("celery readiness check failed")
-            status_code = 503
-
-        if status_code == 503:
-            logger.warning("system readiness degraded", extra={"components": components})
-
-        response = JsonResponse(
-            {"status": "ok" if status_code == 200 else "degraded", "components": components},
-            status=status_code,
+        snapshot = readiness_snapshot()
+        checked_at = snapshot["checked_at"]
+        return JsonResponse(
+            {
+                "status": "ok" if snapshot["ok"] else "degraded",
+                "components": snapshot["components"],
+                "checked_at": datetime.fromtimestamp(checked_at, UTC).isoformat(),
+                "age_seconds": round(max(time.time() - checked_at, 0), 3),
+                "latency_ms": snapshot["latency_ms"],
+            },
+            status=200 if snapshot["ok"] else 503,
         )
-        if status_code == 200:
-            note_ready_success()
-        return response
@@ -1,6 +1,8 @@
 from rest_framework import serializers, viewsets
 from rest_framework.permissions import IsAuthenticated
 
+from apps.common.mixins import ConditionalGetMixin
+
 from .models import Certificate
 
 
@@ -11,9 +13,10 @@ class CertificateSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class CertificateViewSet(viewsets.ReadOnlyModelViewSet):
+class CertificateViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = CertificateSerializer
     permission_classes = [IsAuthenticated]
+    validator_models = (Certificate,)
 
     def get_queryset(self):
         """
@@ -2,20 +2,22 @@ from __future__ import annotations
 
 import base64
 import hashlib
-import json
 from datetime import timedelta
 from typing import Any, Callable, Dict, Iterator, Optional
 from uuid import uuid4
 
 from django.conf import settings
 from django.core.cache import cache
-from django.http import JsonResponse, StreamingHttpResponse
+from django.http import StreamingHttpResponse
 from django.utils.encoding import force_str
 from django.utils import timezone
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 
+from core.db import release_connections
+from core.json import JSONParser, JsonResponse, format_sse
+
 from .models import Attachment, ChatConsent, ChatNote
 from .prompt_templates import DISCLAIMER, system_prompt
 from .serializers import AskSerializer
@@ -33,10 +35,6 @@ from .services.router import select_model
 from .services.summary import make_note
 
 
-def _format_sse(data: Dict[str, Any]) -> str:
-    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
-
-
 def _extract_text_from_response(response: Any) -> str:
     if response is None:
         return ""
@@ -130,12 +128,15 @@ class ChatbotAskView(APIView):
     ) -> Iterator[str]:
         answer_parts: list[str] = []
         usage: Dict[str, Any] = {}
+        # Middleware may have touched the DB since the view returned; `on_complete`
+        # reacquires a connection only once the stream has finished.
+        release_connections()
 
         def emit_delta(delta_text: str) -> Iterator[str]:
             if not delta_text:
                 return
             answer_parts.append(delta_text)
-            yield _format_sse({"delta": delta_text})
+            yield format_sse({"delta": delta_text})
 
         if mode == "responses":
             with stream_obj as stream:
@@ -176,7 +177,7 @@ class ChatbotAskView(APIView):
                             payload["storage"] = storage_metadata
                         if consent_value is not None:
                             payload["consent"] = consent_value
-                        yield _format_sse(payload)
+                        yield format_sse(payload)
                         return
                     elif event_type == "response.error":
                         error = getattr(event, "error", None) or (
@@ -185,7 +186,7 @@ class ChatbotAskView(APIView):
                         message = getattr(error, "message", None)
                         if isinstance(error, dict):
                             message = error.get("message")
-                        yield _format_sse(
+                        yield format_sse(
                             {
                                 "done": True,
                                 "error": "upstream_error",
@@ -242,7 +243,7 @@ class ChatbotAskView(APIView):
             payload["storage"] = storage_metadata
         if consent_value is not None:
             payload["consent"] = consent_value
-        yield _format_sse(payload)
+        yield format_sse(payload)
 
     def post(self, request, *args, **kwargs):
         data = request.data.copy() if hasattr(request.data, "copy") else dict(request.data)
@@ -363,6 +364,8 @@ class ChatbotAskView(APIView):
             response["X-Cache"] = "hit"
             return response
 
+        # The upstream call can take many seconds; don't hold a pooled DB connection meanwhile.
+        release_connections()
         try:
             mode, result = invoke_response(
                 system_prompt=system_prompt(),
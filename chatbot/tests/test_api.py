@@ -174,7 +174,7 @@ def test_chatbot_streaming_sse(api_client, monkeypatch, settings):
     assert response["Content-Type"] == "text/event-stream"
     chunks = b"".join(part if isinstance(part, bytes) else part.encode("utf-8") for part in response.streaming_content)
     payloads = [line for line in chunks.decode("utf-8").split("\n\n") if line]
-    assert payloads[0].startswith("data: {\"delta\": \"در\"}")
-    assert "\"done\": true" in payloads[-1]
+    assert payloads[0].startswith("data: {\"delta\":\"در\"}")
+    assert "\"done\":true" in payloads[-1]
     assert "درمان" in payloads[-1]
 
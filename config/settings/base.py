@@ -8,6 +8,8 @@ import dj_database_url
 from celery.schedules import crontab
 from dotenv import load_dotenv
 
+from core.db import configure_database
+
 load_dotenv()
 
 
@@ -52,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.fast_path.FastPathMiddleware",
+    "core.middleware.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -62,6 +66,9 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "core.middleware.request_id.RequestIDMiddleware",
+    "core.middleware.query_profiler.QueryProfilerMiddleware",
+    "core.middleware.profiler.SamplingProfilerMiddleware",
+    "core.middleware.replica.PrimaryStickyMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -85,13 +92,41 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
 
+DB_POOL_ENABLED = bool_env("DB_POOL_ENABLED", False)
+DB_PGBOUNCER = bool_env("DB_PGBOUNCER", False)
 DATABASES = {
-    "default": dj_database_url.parse(
-        os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
-        conn_max_age=600,
-        ssl_require=False,
+    "default": configure_database(
+        dj_database_url.parse(
+            os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
+            conn_max_age=600,
+            ssl_require=False,
+        ),
+        pool=DB_POOL_ENABLED,
+        min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        pgbouncer=DB_PGBOUNCER,
     )
 }
+DB_RELEASE_DURING_UPSTREAM = bool_env(
+    "DB_RELEASE_DURING_UPSTREAM", DB_POOL_ENABLED or DB_PGBOUNCER
+)
+# Optional read replica; only views that opt in (`ReplicaReadMixin`) and /metrics use it.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "")
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = configure_database(
+        dj_database_url.parse(DATABASE_REPLICA_URL, conn_max_age=600, ssl_require=False),
+        pool=DB_POOL_ENABLED,
+        min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        pgbouncer=DB_PGBOUNCER,
+    )
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["core.db.ReplicaRouter"]
+DATABASE_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "10"))
+DATABASE_REPLICA_LAG_CHECK_SECONDS = float(os.getenv("DATABASE_REPLICA_LAG_CHECK_SECONDS", "5"))
+DATABASE_STICKY_SECONDS = int(os.getenv("DATABASE_STICKY_SECONDS", "15"))
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -112,7 +147,17 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
-    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    "DEFAULT_RENDERER_CLASSES": ["core.json.JSONRenderer"],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.json.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "apps.common.auth.SignedTokenAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -121,6 +166,23 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 50,
 }
 
+# Models whose saves/deletes bump the generation stamps behind ETags and cached responses.
+GENERATION_TRACKED_MODELS = [
+    "analytics.StatsDaily",
+    "certificate.Certificate",
+    "doctor_online.Visit",
+    "down.APKDownloadStat",
+    "sub.Subscription",
+    "sub.BoxMoney",
+]
+# Lifetime of entries stored by apps.common.mixins.CachedResponseMixin; a generation bump
+# retires them sooner.
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "300"))
+
+# Signed bearer tokens (apps.common.auth); lifetimes in seconds.
+AUTH_ACCESS_TOKEN_TTL = int(os.getenv("AUTH_ACCESS_TOKEN_TTL", "300"))
+AUTH_REFRESH_TOKEN_TTL = int(os.getenv("AUTH_REFRESH_TOKEN_TTL", str(7 * 24 * 3600)))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Helssa API",
     "VERSION": APP_VERSION,
@@ -130,6 +192,29 @@ SPECTACULAR_SETTINGS = {
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split()
 CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "").split()
 
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "core.cache.TieredCache",
+            "LOCATION": CACHE_URL,
+            "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "helssa"),
+            "OPTIONS": {
+                "REMOTE_BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCAL_NAMESPACES": os.getenv("CACHE_LOCAL_NAMESPACES", "chatbot").split(),
+                "LOCAL_MAX_ENTRIES": int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1024")),
+                "LOCAL_TTL": float(os.getenv("CACHE_LOCAL_TTL", "5")),
+                "serializer": "core.cache.CompressedSerializer",
+            },
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+# Whether every process (web workers, Celery) sees the same CACHES["default"]. Features that
+# coordinate through the cache are turned off without it rather than diverging per process.
+CACHE_SHARED = bool_env("CACHE_SHARED", bool(CACHE_URL))
+
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
 CELERY_TASK_TRACK_STARTED = True
@@ -138,12 +223,70 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_BEAT_SCHEDULE = {}
 
+PERF_SNAPSHOT_LIMIT = int(os.getenv("PERF_SNAPSHOT_LIMIT", "500"))
+PERF_SNAPSHOT_RETENTION_DAYS = int(os.getenv("PERF_SNAPSHOT_RETENTION_DAYS", "90"))
+PERF_REGRESSION_MEAN_RATIO = float(os.getenv("PERF_REGRESSION_MEAN_RATIO", "1.5"))
+PERF_REGRESSION_RATE_RATIO = float(os.getenv("PERF_REGRESSION_RATE_RATIO", "2.0"))
+PERF_REGRESSION_MIN_CALLS = int(os.getenv("PERF_REGRESSION_MIN_CALLS", "50"))
+
 if os.getenv("ENABLE_PERF_SLOWLOG_BEAT", "false").lower() == "true":
     CELERY_BEAT_SCHEDULE["perf-slowlog-weekly"] = {
         "task": "perf.tasks.collect_slowlog",
         "schedule": crontab(hour=1, minute=0, day_of_week="sun"),
     }
 
+QUERY_PROFILER_SAMPLE_RATE = float(os.getenv("QUERY_PROFILER_SAMPLE_RATE", "0"))
+QUERY_PROFILER_NPLUSONE_THRESHOLD = int(os.getenv("QUERY_PROFILER_NPLUSONE_THRESHOLD", "5"))
+
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_HEADER = os.getenv("PROFILER_HEADER", "X-Profile")
+PROFILER_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR", ".reports/flamegraphs")
+PROFILER_SIGNAL_ENABLED = bool_env("PROFILER_SIGNAL_ENABLED", False)
+
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+METRICS_COUNT_MAX_AGE_SECONDS = float(os.getenv("METRICS_COUNT_MAX_AGE_SECONDS", "60"))
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "512"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+# /api/v1/system/ready serves a snapshot re-probed on request once it is older than the max
+# age. A positive interval adds a background prober thread in *each* process (each pings
+# Celery), so it is off by default.
+READY_PROBE_INTERVAL_SECONDS = float(os.getenv("READY_PROBE_INTERVAL_SECONDS", "0"))
+READY_SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("READY_SNAPSHOT_MAX_AGE_SECONDS", "30"))
+METRICS_EXACT_COUNTS = bool_env("METRICS_EXACT_COUNTS", False)
+CELERY_METRICS_CACHE = os.getenv("CELERY_METRICS_CACHE", "default")
+
+ANALYTICS_BUFFER_ENABLED = bool_env("ANALYTICS_BUFFER_ENABLED", True)
+ANALYTICS_BUFFER_CAPACITY = int(os.getenv("ANALYTICS_BUFFER_CAPACITY", "10000"))
+ANALYTICS_BUFFER_FLUSH_SIZE = int(os.getenv("ANALYTICS_BUFFER_FLUSH_SIZE", "200"))
+ANALYTICS_BUFFER_FLUSH_SECONDS = float(os.getenv("ANALYTICS_BUFFER_FLUSH_SECONDS", "2"))
+
+if bool_env("ENABLE_ANALYTICS_FLUSH_BEAT"):
+    CELERY_BEAT_SCHEDULE["analytics-flush-events"] = {
+        "task": "analytics.tasks.flush_events",
+        "schedule": 30.0,
+    }
+
+ANALYTICS_EVENT_PROP_FILTERS = set(
+    os.getenv(
+        "ANALYTICS_EVENT_PROP_FILTERS", "gateway currency service source op scope reason code"
+    ).split()
+)
+ANALYTICS_AGG_VALUE_KEYS = set(os.getenv("ANALYTICS_AGG_VALUE_KEYS", "tat_ms").split())
+ANALYTICS_AGG_MAX_BUCKETS = int(os.getenv("ANALYTICS_AGG_MAX_BUCKETS", "2000"))
+ANALYTICS_AGG_CACHE_TTL = int(os.getenv("ANALYTICS_AGG_CACHE_TTL", str(7 * 24 * 3600)))
+ANALYTICS_EXPORT_CHUNK_SIZE = int(os.getenv("ANALYTICS_EXPORT_CHUNK_SIZE", "2000"))
+ANALYTICS_ROLLUP_BATCH_SIZE = int(os.getenv("ANALYTICS_ROLLUP_BATCH_SIZE", "5000"))
+ANALYTICS_ROLLUP_SETTLE_SECONDS = int(os.getenv("ANALYTICS_ROLLUP_SETTLE_SECONDS", "30"))
+
+if bool_env("ENABLE_ANALYTICS_ROLLUP_BEAT"):
+    CELERY_BEAT_SCHEDULE["analytics-rollup-stats"] = {
+        "task": "analytics.tasks.rollup_stats",
+        "schedule": crontab(minute="*/5"),
+    }
+
 PAYMENT_GATEWAY = os.getenv("PAYMENT_GATEWAY", "bitpay")
 BITPAY_WEBHOOK_SECRET = os.getenv("BITPAY_WEBHOOK_SECRET")
 if not BITPAY_WEBHOOK_SECRET and not DEBUG:
@@ -152,13 +295,35 @@ BITPAY_SIGNATURE_HEADER = os.getenv("BITPAY_SIGNATURE_HEADER", "X-Signature")
 BITPAY_TIMESTAMP_HEADER = os.getenv("BITPAY_TIMESTAMP_HEADER", "X-Timestamp")
 PAY_SIG_MAX_SKEW_SECONDS = int(os.getenv("PAY_SIG_MAX_SKEW_SECONDS", "300"))
 BITPAY_VERIFY_URL = os.getenv("BITPAY_VERIFY_URL", "https://bitpay.example/verify")
+BITPAY_VERIFY_CONNECT_TIMEOUT = float(os.getenv("BITPAY_VERIFY_CONNECT_TIMEOUT", "3"))
+BITPAY_VERIFY_READ_TIMEOUT = float(os.getenv("BITPAY_VERIFY_READ_TIMEOUT", "10"))
+BITPAY_VERIFY_RETRIES = int(os.getenv("BITPAY_VERIFY_RETRIES", "2"))
+BITPAY_VERIFY_BACKOFF_SECONDS = float(os.getenv("BITPAY_VERIFY_BACKOFF_SECONDS", "0.3"))
+BITPAY_VERIFY_DEADLINE_SECONDS = float(os.getenv("BITPAY_VERIFY_DEADLINE_SECONDS", "10"))
+BITPAY_HTTP_POOL_SIZE = int(os.getenv("BITPAY_HTTP_POOL_SIZE", "10"))
+BITPAY_VERIFY_ASYNC = bool_env("BITPAY_VERIFY_ASYNC", False)
+if BITPAY_VERIFY_ASYNC and not CACHE_URL:
+    # Workers report results through the cache; a per-process LocMem would never be polled.
+    raise ValueError("BITPAY_VERIFY_ASYNC requires a shared cache (set CACHE_URL)")
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "168"))
+IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", "5000"))
+
+if bool_env("ENABLE_IDEMPOTENCY_PURGE_BEAT"):
+    CELERY_BEAT_SCHEDULE["telemedicine-idempotency-purge"] = {
+        "task": "telemedicine.tasks.purge_idempotency_keys",
+        "schedule": crontab(minute=15),
+    }
 
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "handlers": {
         "console": {
-            "class": "logging.StreamHandler",
+            "()": (
+                "core.logging.QueueStreamHandler"
+                if bool_env("LOG_ASYNC", True)
+                else "logging.StreamHandler"
+            ),
             "formatter": "json",
         }
     },
@@ -15,3 +15,8 @@ PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
+ANALYTICS_BUFFER_ENABLED = False
+METRICS_COUNT_MAX_AGE_SECONDS = 0
+READY_SNAPSHOT_MAX_AGE_SECONDS = 0
+# The suite runs in one process (Celery eagerly), so LocMem is shared by everything.
+CACHE_SHARED = True
@@ -4,7 +4,7 @@ from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework.routers import DefaultRouter
 
 from analytics.api import DailyStatsViewSet, EventViewSet
-from apps.common.views import health
+from apps.common.views import TokenObtainView, TokenRefreshView, TokenRevokeView, health
 from apps.system.views import SystemHealthView, SystemReadyView
 from certificate.api import CertificateViewSet
 from doctor_online.api import VisitViewSet
@@ -27,6 +27,9 @@ urlpatterns = [
     path("health", health, name="health"),
     path("api/v1/system/health", SystemHealthView.as_view(), name="system-health"),
     path("api/v1/system/ready", SystemReadyView.as_view(), name="system-ready"),
+    path("api/v1/auth/token", TokenObtainView.as_view(), name="auth-token"),
+    path("api/v1/auth/token/refresh", TokenRefreshView.as_view(), name="auth-token-refresh"),
+    path("api/v1/auth/token/revoke", TokenRevokeView.as_view(), name="auth-token-revoke"),
     path("api/v1/subscriptions/me", MeSubscriptionView.as_view(), name="subscriptions-me"),
     path("api/v1/", include(router.urls)),
     path("api/v1/chatbot/ask", ChatbotAskView.as_view(), name="chatbot-ask"),
@@ -46,6 +49,11 @@ urlpatterns = [
         telemedicine_views.bitpay_verify,
         name="telemedicine-bitpay-verify",
     ),
+    path(
+        "telemedicine/pay/verify/status",
+        telemedicine_views.bitpay_verify_status,
+        name="telemedicine-bitpay-verify-status",
+    ),
 ]
 
 if metrics_enabled():
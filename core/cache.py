@@ -0,0 +1,214 @@
+"""Two-tier Django cache: a small per-process LRU in front of a shared remote backend.
+
+Only keys whose namespace (the text before the first `:`) is listed in `LOCAL_NAMESPACES`
+are kept in the local tier, and only for `LOCAL_TTL` seconds, because a local copy is not
+invalidated when another process deletes or overwrites the key. Idempotency and readiness
+keys therefore always go to the remote tier. Hits and misses are counted per namespace.
+"""
+from __future__ import annotations
+
+import pickle
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Any
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.redis import RedisSerializer
+from django.utils.module_loading import import_string
+
+_COMPRESSED = b"z"
+_MISSING = object()
+
+_stats: Counter[tuple[str, str]] = Counter()
+
+
+def namespace(key: str) -> str:
+    head, sep, _ = str(key).partition(":")
+    return head if sep else "-"
+
+
+def record(key: str, result: str) -> None:
+    _stats[(namespace(key), result)] += 1
+
+
+def namespace_stats() -> dict[tuple[str, str], int]:
+    return dict(_stats)
+
+
+class CompressedSerializer(RedisSerializer):
+    """Pickle values, zlib-compressing those over `CACHE_COMPRESS_MIN_BYTES`.
+
+    Integers stay raw so `incr`/`decr` remain atomic on Redis.
+    """
+
+    def dumps(self, obj):
+        if type(obj) is int:
+            return obj
+        data = pickle.dumps(obj, self.protocol)
+        if len(data) >= settings.CACHE_COMPRESS_MIN_BYTES:
+            return _COMPRESSED + zlib.compress(data, 6)
+        return data
+
+    def loads(self, data):
+        if data[:1] == _COMPRESSED:
+            return pickle.loads(zlib.decompress(data[1:]))
+        return super().loads(data)
+
+
+class _LocalLRU:
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value: Any, timeout: float | None) -> None:
+        ttl = self.ttl if timeout is None else min(self.ttl, timeout)
+        if ttl <= 0:
+            self.delete(key)
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache(BaseCache):
+    """`BACKEND` for CACHES; `OPTIONS["REMOTE_BACKEND"]` picks the shared tier.
+
+    Remaining `OPTIONS` are passed to the remote backend (e.g. `serializer` for Redis).
+    """
+
+    def __init__(self, location, params):
+        options = dict(params.get("OPTIONS", {}))
+        remote_class = import_string(
+            options.pop("REMOTE_BACKEND", "django.core.cache.backends.redis.RedisCache")
+        )
+        local_namespaces = options.pop("LOCAL_NAMESPACES", ())
+        local = _LocalLRU(options.pop("LOCAL_MAX_ENTRIES", 1024), options.pop("LOCAL_TTL", 5))
+        super().__init__({**params, "OPTIONS": {}})
+        self.remote = remote_class(location, {**params, "OPTIONS": options})
+        self.local = local
+        self.local_namespaces = frozenset(local_namespaces)
+
+    def _local_key(self, key: str, version) -> str | None:
+        if namespace(key) not in self.local_namespaces:
+            return None
+        return self.make_and_validate_key(key, version=version)
+
+    def _timeout(self, timeout) -> float | None:
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            value = self.local.get(local_key)
+            if value is not _MISSING:
+                record(key, "local_hit")
+                return value
+        value = self.remote.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            record(key, "miss")
+            return default
+        record(key, "hit")
+        if local_key is not None:
+            self.local.set(local_key, value, None)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = {}
+        remote_keys = []
+        for key in keys:
+            local_key = self._local_key(key, version)
+            value = self.local.get(local_key) if local_key is not None else _MISSING
+            if value is _MISSING:
+                remote_keys.append(key)
+            else:
+                record(key, "local_hit")
+                found[key] = value
+        fetched = self.remote.get_many(remote_keys, version=version) if remote_keys else {}
+        for key in remote_keys:
+            if key in fetched:
+                record(key, "hit")
+                found[key] = fetched[key]
+                local_key = self._local_key(key, version)
+                if local_key is not None:
+                    self.local.set(local_key, fetched[key], None)
+            else:
+                record(key, "miss")
+        return found
+
+    def _store_local(self, key, value, timeout, version) -> None:
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self.local.set(local_key, value, self._timeout(timeout))
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.remote.set(key, value, timeout, version=version)
+        self._store_local(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.remote.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            self._store_local(key, value, timeout, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.remote.add(key, value, timeout, version=version)
+        if added:
+            self._store_local(key, value, timeout, version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.remote.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self.local.delete(local_key)
+        return self.remote.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            local_key = self._local_key(key, version)
+            if local_key is not None:
+                self.local.delete(local_key)
+        return self.remote.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return self.remote.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        return self.remote.incr(key, delta, version=version)
+
+    def clear(self):
+        self.local.clear()
+        return self.remote.clear()
+
+    def close(self, **kwargs):
+        self.remote.close(**kwargs)
@@ -0,0 +1,172 @@
+"""Database connection settings and helpers shared by settings, views and metrics."""
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, Error, connections
+
+logger = logging.getLogger(__name__)
+
+POSTGRES_ENGINES = {"django.db.backends.postgresql"}
+REPLICA_ALIAS = "replica"
+
+# Zero while the replica has replayed everything it received; otherwise the age of the
+# last replayed transaction, so an idle primary does not look like a lagging replica.
+_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+_lag: tuple[float, float] | None = None
+_lag_lock = threading.Lock()
+
+
+def configure_database(
+    config: dict[str, Any],
+    *,
+    pool: bool = False,
+    min_size: int = 2,
+    max_size: int = 10,
+    timeout: float = 10.0,
+    pgbouncer: bool = False,
+) -> dict[str, Any]:
+    """Apply pooling / PgBouncer settings to a `dj_database_url` config (PostgreSQL only).
+
+    `pool` enables psycopg's built-in pool (`OPTIONS["pool"]`), which replaces persistent
+    connections, so `CONN_MAX_AGE` is forced to 0. `pgbouncer` targets transaction-mode
+    pooling, where consecutive statements may run on different server connections. It
+    turns off server-side cursors and prepared statements, and persistent connections
+    become pointless.
+    """
+    if config.get("ENGINE") not in POSTGRES_ENGINES:
+        return config
+    config = {**config, "OPTIONS": dict(config.get("OPTIONS", {}))}
+    if pool:
+        config["CONN_MAX_AGE"] = 0
+        config["OPTIONS"]["pool"] = {"min_size": min_size, "max_size": max_size, "timeout": timeout}
+    if pgbouncer:
+        config["CONN_MAX_AGE"] = 0
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+        config["OPTIONS"]["prepare_threshold"] = None
+    return config
+
+
+def release_connections() -> int:
+    """Close idle connections before a long wait on an upstream service.
+
+    With a pool (or PgBouncer) this hands the connection back for other requests; the next
+    query transparently acquires one again. Connections inside a transaction are kept.
+    """
+    if not settings.DB_RELEASE_DURING_UPSTREAM:
+        return 0
+    released = 0
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is not None and not conn.in_atomic_block:
+            conn.close()
+            released += 1
+    return released
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    """`psycopg_pool` counters per alias whose pool has been opened in this process."""
+    stats = {}
+    for conn in connections.all(initialized_only=True):
+        pool = getattr(conn, "_connection_pools", {}).get(conn.alias)
+        if pool is None:
+            continue
+        try:
+            stats[conn.alias] = pool.get_stats()
+        except Exception:  # pragma: no cover - metrics must not fail the scrape
+            logger.warning("pool stats unavailable", extra={"extra": {"alias": conn.alias}})
+    return stats
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _measure_lag() -> float:
+    conn = connections[REPLICA_ALIAS]
+    if conn.vendor != "postgresql":
+        return 0.0
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except Error:
+        logger.warning("replica lag check failed", exc_info=True)
+        return math.inf
+
+
+def replica_lag() -> float:
+    """Replica lag in seconds, measured at most every `DATABASE_REPLICA_LAG_CHECK_SECONDS`.
+
+    An unreachable replica reports infinite lag so reads fall back to the primary.
+    """
+    global _lag
+    max_age = settings.DATABASE_REPLICA_LAG_CHECK_SECONDS
+    checked = _lag
+    if checked and time.monotonic() - checked[1] < max_age:
+        return checked[0]
+    with _lag_lock:
+        checked = _lag
+        if checked and time.monotonic() - checked[1] < max_age:
+            return checked[0]
+        value = _measure_lag()
+        _lag = (value, time.monotonic())
+        return value
+
+
+def _sticky_key(user) -> str:
+    return f"db:primary:{user.pk}"
+
+
+def pin_primary(user) -> None:
+    """Serve `user`'s reads from the primary for `DATABASE_STICKY_SECONDS` after a write."""
+    if replica_configured() and getattr(user, "is_authenticated", False):
+        cache.set(_sticky_key(user), 1, settings.DATABASE_STICKY_SECONDS)
+
+
+def read_alias(user=None) -> str:
+    """Database alias for a read that tolerates replication lag.
+
+    The replica is used when it is configured, its lag is within
+    `DATABASE_REPLICA_MAX_LAG_SECONDS`, and `user` has not written recently.
+    """
+    if not replica_configured():
+        return DEFAULT_DB_ALIAS
+    if getattr(user, "is_authenticated", False) and cache.get(_sticky_key(user)):
+        return DEFAULT_DB_ALIAS
+    if replica_lag() > settings.DATABASE_REPLICA_MAX_LAG_SECONDS:
+        return DEFAULT_DB_ALIAS
+    return REPLICA_ALIAS
+
+
+class ReplicaRouter:
+    """Writes, migrations and unqualified reads go to `default`.
+
+    Reads reach the replica only when a caller opts in with `.using(read_alias(...))`, so
+    code that reads its own writes keeps working without knowing about the replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,92 @@
+"""Project-wide JSON encoding backed by orjson, with a stdlib fallback.
+
+orjson is an optional dependency (`pip install helssa[speedups]`). Without it the same
+functions and classes work through `json`, producing equivalent compact UTF-8 output.
+Types orjson does not know natively (Decimal, lazy translations, querysets, ...) go through
+the DRF or Django encoder's `default`, so results match what those encoders would produce.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder as DRFJSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_DRF_DEFAULT = DRFJSONEncoder().default
+_DJANGO_DEFAULT = DjangoJSONEncoder().default
+# Raw U+2028/U+2029 are valid JSON but terminate lines in JavaScript; DRF escapes them too.
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any, default=_DJANGO_DEFAULT) -> bytes:
+        return orjson.dumps(obj, default=default, option=_OPTIONS)
+
+    def loads(data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+else:
+
+    def dumps(obj: Any, default=_DJANGO_DEFAULT) -> bytes:
+        return json.dumps(
+            obj, default=default, ensure_ascii=False, separators=(",", ":"), allow_nan=False
+        ).encode("utf-8")
+
+    def loads(data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+def format_sse(data: Any) -> str:
+    """One server-sent event carrying `data` as JSON."""
+    return f"data: {dumps(data).decode('utf-8')}\n\n"
+
+
+class JsonResponse(HttpResponse):
+    """`django.http.JsonResponse` encoded with `dumps`; takes the same `safe` flag."""
+
+    def __init__(self, data: Any, safe: bool = True, **kwargs) -> None:
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the safe "
+                "parameter to False."
+            )
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """DRF renderer using `dumps`; `?indent=` requests fall back to the stdlib renderer."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = dumps(data, default=_DRF_DEFAULT)
+        for raw, escaped in _LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+class JSONParser(parsers.JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding") or "utf-8"
+        try:
+            data = stream.read() if stream is not None else b""
+            if encoding.lower().replace("-", "") != "utf8":
+                data = data.decode(encoding)
+            return loads(data)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}") from None
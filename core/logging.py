@@ -1,34 +1,155 @@
+import atexit
 import json
 import logging
+import os
+import queue
+import sys
 import time
+import weakref
 from collections.abc import Mapping
 from contextvars import ContextVar
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 request_id_ctx: ContextVar[str] = ContextVar("request_id", default="-")
 MASK_KEYS = {"password", "token", "otp", "national_code"}
 
+# Attributes every LogRecord has; anything else was passed through `extra=`.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "request_id",
+}
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+
+
+@lru_cache(maxsize=1024)
+def _masked(key: Any) -> bool:
+    return isinstance(key, str) and key.lower() in MASK_KEYS
+
+
 def _mask(obj: Any) -> Any:
+    """Mask sensitive keys, copying only the containers that actually hold one."""
+    if type(obj) in _SCALARS:
+        return obj
     if isinstance(obj, Mapping):
-        return {k: ("***" if k in MASK_KEYS else _mask(v)) for k, v in obj.items()}
+        masked = None
+        for k, v in obj.items():
+            new = "***" if _masked(k) else _mask(v)
+            if masked is None and new is not v:
+                masked = dict(obj)
+            if masked is not None:
+                masked[k] = new
+        return obj if masked is None else masked
     if isinstance(obj, list | tuple):
-        return [_mask(v) for v in obj]
+        items = [_mask(v) for v in obj]
+        return obj if all(a is b for a, b in zip(items, obj, strict=True)) else items
     return obj
 
+
 class JsonFormatter(logging.Formatter):
+    # One (second, text) tuple: swapped in a single assignment, so threads never see a
+    # second paired with another second's text.
+    _second: tuple[int, str] = (-1, "")
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        cached = self._second
+        if cached[0] != second:
+            cached = (second, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second)))
+            self._second = cached
+        return f"{cached[1]}.{int((created - second) * 1000):03d}Z"
+
     def format(self, record: logging.LogRecord) -> str:
         base = {
-            "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "ts": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "msg": record.getMessage(),
-            "request_id": request_id_ctx.get("-"),
+            "request_id": getattr(record, "request_id", None) or request_id_ctx.get("-"),
         }
         if record.args and isinstance(record.args, Mapping):
             base["args"] = _mask(record.args)
-        if record.__dict__.get("extra"):
-            base["extra"] = _mask(record.__dict__["extra"])
-        return json.dumps(base, ensure_ascii=False)
+        extra = {k: v for k, v in record.__dict__.items() if k not in _RECORD_ATTRS}
+        nested = extra.pop("extra", None)
+        if isinstance(nested, Mapping):
+            extra.update(nested)
+        elif nested is not None:
+            extra["extra"] = nested
+        if extra:
+            base["extra"] = _mask(extra)
+        if record.exc_info or record.exc_text:
+            base["exc"] = record.exc_text or self.formatException(record.exc_info)
+        return _encode(base)
+
+
+class _StderrHandler(logging.StreamHandler):
+    """Write to whatever `sys.stderr` is at emit time (test runners swap it out)."""
+
+    def __init__(self) -> None:
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+class QueueStreamHandler(QueueHandler):
+    """Queue records for a background thread that formats them and writes the stream.
+
+    Request threads only tag the record with the current request id and enqueue it; the
+    message, extras and traceback are rendered by the listener. When the queue is full,
+    records are dropped and counted instead of blocking.
+    """
+
+    def __init__(self, stream=None, maxsize: int = 10000) -> None:
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream) if stream else _StderrHandler()
+        self.dropped = 0
+        self._start()
+        _queue_handlers.add(self)
+        atexit.register(self.close)
+
+    def _start(self) -> None:
+        # After a fork the parent's listener thread is gone; the queue may hold its records.
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def setFormatter(self, fmt: logging.Formatter | None) -> None:  # noqa: N802
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread, which cannot see this context.
+        record.request_id = request_id_ctx.get("-")
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        _queue_handlers.discard(self)
+        if self.listener._thread is not None:
+            self.listener.stop()
+            self.target.flush()
+        super().close()
+
+
+_queue_handlers: weakref.WeakSet[QueueStreamHandler] = weakref.WeakSet()
+
+
+def _restart_listeners() -> None:
+    for handler in list(_queue_handlers):
+        handler._start()
+
+
+os.register_at_fork(after_in_child=_restart_listeners)
+
 
 def setup_logging():
     h = logging.StreamHandler()
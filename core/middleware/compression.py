@@ -0,0 +1,160 @@
+"""Negotiated brotli/gzip response compression that keeps streams streaming.
+
+Brotli is used when the optional `brotli` package is installed and the client prefers it;
+otherwise gzip. Bodies under `COMPRESSION_MIN_BYTES`, already-encoded responses and
+already-compressed media types are left alone. Streaming responses are compressed
+incrementally. For `text/event-stream` the compressor is flushed at the end of every SSE
+frame, so each event reaches the client as soon as it is produced.
+
+BREACH: compressing a page that holds a secret next to attacker-influenced text leaks the
+secret through the compressed length. Rather than padding bodies with random bytes, HTML
+(where Django's CSRF token is embedded) and any response that sets the CSRF cookie are
+never compressed; the JSON API, exports and SSE streams are what compression is for.
+"""
+from __future__ import annotations
+
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SKIP_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "application/pdf",
+    "application/octet-stream",
+)
+# Never compressed, see BREACH above.
+SECRET_BEARING_TYPES = ("text/html",)
+_SSE_FRAME_END = b"\n\n"
+
+
+class _Gzip:
+    def __init__(self) -> None:
+        self._z = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def flush(self) -> bytes:
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class _Brotli:
+    def __init__(self) -> None:
+        self._b = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._b.process(data)
+
+    def flush(self) -> bytes:
+        return self._b.flush()
+
+    def finish(self) -> bytes:
+        return self._b.finish()
+
+
+ENCODERS = {"br": _Brotli, "gzip": _Gzip}
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Best supported coding from an `Accept-Encoding` header, brotli winning ties."""
+    best, best_q = None, 0.0
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if coding not in ENCODERS or (coding == "br" and brotli is None):
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                continue
+        if q > best_q or (q == best_q and coding == "br"):
+            best, best_q = coding, q
+    return best
+
+
+def _compress_stream(chunks, encoder, per_frame: bool):
+    for chunk in chunks:
+        out = encoder.compress(chunk)
+        if per_frame and chunk.endswith(_SSE_FRAME_END):
+            out += encoder.flush()
+        if out:
+            yield out
+    yield encoder.finish()
+
+
+async def _compress_async_stream(chunks, encoder, per_frame: bool):
+    async for chunk in chunks:
+        out = encoder.compress(chunk)
+        if per_frame and chunk.endswith(_SSE_FRAME_END):
+            out += encoder.flush()
+        if out:
+            yield out
+    yield encoder.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        content_type = response.get("Content-Type", "").lower()
+        if (
+            response.has_header("Content-Encoding")
+            or content_type.startswith(SKIP_TYPES)
+            or content_type.startswith(SECRET_BEARING_TYPES)
+            or settings.CSRF_COOKIE_NAME in response.cookies
+            or "no-transform" in response.get("Cache-Control", "")
+        ):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_BYTES:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate(request.headers.get("Accept-Encoding", ""))
+        if coding is None:
+            return response
+        encoder = ENCODERS[coding]()
+
+        if response.streaming:
+            per_frame = content_type.startswith("text/event-stream")
+            if response.is_async:
+                response.streaming_content = _compress_async_stream(
+                    response.streaming_content, encoder, per_frame
+                )
+            else:
+                response.streaming_content = _compress_stream(
+                    response.streaming_content, encoder, per_frame
+                )
+            del response["Content-Length"]
+        else:
+            compressed = encoder.compress(response.content) + encoder.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # The representation changed, so a strong validator no longer applies (RFC 9110).
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = coding
+        return response
@@ -0,0 +1,82 @@
+"""Answer health probes and `/metrics` before the rest of the middleware stack runs.
+
+These endpoints need no session, CSRF, auth, CORS or static-file handling, so this
+middleware sits first in `MIDDLEWARE` and builds the response itself. It still sets the
+request id, the response-time header and the security headers the skipped middleware
+would add, and records the request in the latency histogram under the URL pattern name.
+"""
+from __future__ import annotations
+
+import time
+import uuid
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+
+from apps.system.views import _version
+from core.json import dumps
+from core.logging import request_id_ctx
+from perf import histogram
+from perf.metrics import build_metrics, metrics_enabled
+
+FAST_METHODS = frozenset({"GET", "HEAD"})
+_HEALTH_BODY = dumps({"status": "ok"})
+
+
+def _static_headers() -> dict[str, str]:
+    """What SecurityMiddleware and XFrameOptionsMiddleware would add, computed once."""
+    headers = {"X-Frame-Options": settings.X_FRAME_OPTIONS, "Cache-Control": "no-store"}
+    if settings.SECURE_CONTENT_TYPE_NOSNIFF:
+        headers["X-Content-Type-Options"] = "nosniff"
+    if settings.SECURE_REFERRER_POLICY:
+        headers["Referrer-Policy"] = settings.SECURE_REFERRER_POLICY
+    if settings.SECURE_CROSS_ORIGIN_OPENER_POLICY:
+        headers["Cross-Origin-Opener-Policy"] = settings.SECURE_CROSS_ORIGIN_OPENER_POLICY
+    return headers
+
+
+class FastPathMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.headers = _static_headers()
+        self.version = _version()
+        # path -> (URL pattern used as the histogram route label, handler)
+        self.routes = {
+            "/health": ("health", self.health),
+            "/api/v1/system/health": ("api/v1/system/health", self.system_health),
+            "/metrics": ("metrics", self.metrics),
+        }
+
+    def health(self) -> HttpResponse:
+        return HttpResponse(_HEALTH_BODY, content_type="application/json")
+
+    def system_health(self) -> HttpResponse:
+        body = {"status": "ok", "time": timezone.now().isoformat(), "version": self.version}
+        return HttpResponse(dumps(body), content_type="application/json")
+
+    def metrics(self) -> HttpResponse | None:
+        if not metrics_enabled():
+            return None
+        return HttpResponse(build_metrics(), content_type="text/plain; version=0.0.4")
+
+    def __call__(self, request):
+        route = self.routes.get(request.path_info)
+        if route is None or request.method not in FAST_METHODS:
+            return self.get_response(request)
+        started = time.perf_counter()
+        rid = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        token = request_id_ctx.set(rid)
+        try:
+            response = route[1]()
+        finally:
+            request_id_ctx.reset(token)
+        if response is None:
+            return self.get_response(request)
+        for name, value in self.headers.items():
+            response[name] = value
+        elapsed = time.perf_counter() - started
+        response["X-Request-ID"] = rid
+        response["X-Response-Time-ms"] = int(elapsed * 1000)
+        histogram.observe(route[0], request.method, response.status_code, elapsed)
+        return response
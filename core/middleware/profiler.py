@@ -0,0 +1,44 @@
+"""Run selected requests under the stack sampler and keep a flamegraph per request.
+
+Staff users opt in per request with the `PROFILER_HEADER` header (default `X-Profile: 1`);
+`PROFILER_SAMPLE_RATE` additionally profiles a random fraction of all requests. The file
+name is returned to staff in `X-Profile-File`.
+
+DRF authenticates inside the view, so whether a header-requested profile belongs to staff
+is only known once the response is back; samples taken for anyone else are discarded.
+"""
+from __future__ import annotations
+
+import random
+import threading
+
+from django.conf import settings
+
+from perf.profiler import StackSampler, write_folded
+
+
+class SamplingProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = request.headers.get(settings.PROFILER_HEADER) == "1"
+        rate = settings.PROFILER_SAMPLE_RATE
+        sampled = rate > 0 and random.random() < rate
+        if not (requested or sampled):
+            return self.get_response(request)
+
+        sampler = StackSampler(thread_id=threading.get_ident()).start()
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = sampler.stop()
+        # Set by session auth before the view, or by DRF (e.g. bearer tokens) inside it.
+        staff = getattr(getattr(request, "user", None), "is_staff", False)
+        if not (sampled or staff):
+            return response
+        match = getattr(request, "resolver_match", None)
+        path = write_folded(stacks, f"{request.method}-{match.route if match else request.path}")
+        if staff:
+            response["X-Profile-File"] = path.name
+        return response
@@ -0,0 +1,88 @@
+"""Sampled per-request SQL profiling with N+1 detection.
+
+For a sampled request every database call goes through `connection.execute_wrapper`. The
+middleware then logs the query count, total DB time and the statements that repeated with
+only their parameters changed. The log line carries the request id set by
+`RequestIDMiddleware`, so it must sit after that middleware.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """Statement shape with literals and IN-list lengths removed."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryProfile:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold: int) -> list[dict]:
+        return [
+            {"sql": sql[:300], "count": count}
+            for sql, count in self.statements.most_common(5)
+            if count >= threshold
+        ]
+
+
+class QueryProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.QUERY_PROFILER_SAMPLE_RATE
+        if rate <= 0 or random.random() >= rate:
+            return self.get_response(request)
+
+        profile = QueryProfile()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(profile))
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        duplicates = profile.duplicates(settings.QUERY_PROFILER_NPLUSONE_THRESHOLD)
+        payload = {
+            "method": request.method,
+            "route": match.route if match else request.path,
+            "status": response.status_code,
+            "queries": profile.count,
+            "db_ms": round(profile.duration * 1000, 2),
+            "duplicates": duplicates,
+        }
+        if duplicates:
+            logger.warning("possible N+1 queries", extra={"extra": payload})
+        else:
+            logger.info("sql profile", extra={"extra": payload})
+        return response
@@ -0,0 +1,21 @@
+"""Pin a user's reads to the primary for a short window after they write.
+
+DRF authenticates inside the view and copies the user onto the Django request, so the
+check runs on the way out and sees token-authenticated users too.
+"""
+from __future__ import annotations
+
+from core.db import pin_primary
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE"})
+
+
+class PrimaryStickyMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_primary(getattr(request, "user", None))
+        return response
@@ -4,6 +4,7 @@ import uuid
 from django.utils.deprecation import MiddlewareMixin
 
 from core.logging import request_id_ctx
+from perf import histogram
 
 
 class RequestIDMiddleware(MiddlewareMixin):
@@ -16,5 +17,10 @@ class RequestIDMiddleware(MiddlewareMixin):
     def process_response(self, request, response):
         response["X-Request-ID"] = getattr(request, "request_id", "-")
         if hasattr(request, "_t0"):
-            response["X-Response-Time-ms"] = int((time.perf_counter() - request._t0) * 1000)
+            elapsed = time.perf_counter() - request._t0
+            response["X-Response-Time-ms"] = int(elapsed * 1000)
+            match = getattr(request, "resolver_match", None)
+            # Label by URL pattern, never the raw path, to keep series cardinality bounded.
+            route = match.route if match else "unmatched"
+            histogram.observe(route, request.method, response.status_code, elapsed)
         return response
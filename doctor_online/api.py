@@ -1,6 +1,12 @@
 from rest_framework import serializers, viewsets
 from rest_framework.permissions import IsAdminUser
 
+from apps.common.mixins import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+)
+
 from .models import Visit
 
 
@@ -11,7 +17,9 @@ class VisitSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class VisitViewSet(viewsets.ReadOnlyModelViewSet):
+class VisitViewSet(
+    CachedResponseMixin, ConditionalGetMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet
+):
     serializer_class = VisitSerializer
     permission_classes = [IsAdminUser]
     queryset = Visit.objects.select_related("user").order_by("-created_at")
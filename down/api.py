@@ -1,6 +1,12 @@
 from rest_framework import serializers, viewsets
 from rest_framework.permissions import IsAdminUser
 
+from apps.common.mixins import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+)
+
 from .models import APKDownloadStat
 
 
@@ -11,7 +17,10 @@ class APKDownloadStatSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class APKStatsViewSet(viewsets.ReadOnlyModelViewSet):
+class APKStatsViewSet(
+    CachedResponseMixin, ConditionalGetMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet
+):
     serializer_class = APKDownloadStatSerializer
     permission_classes = [IsAdminUser]
     queryset = APKDownloadStat.objects.all().order_by("-updated_at")
+    cache_control = "private, max-age=30"
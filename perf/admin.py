@@ -0,0 +1,8 @@
+from django.contrib import admin
+
+from .models import QuerySnapshot
+
+
+@admin.register(QuerySnapshot)
+class QuerySnapshotAdmin(admin.ModelAdmin):
+    list_display = ("id", "taken_at", "server_version", "window_seconds")
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class PerfConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "perf"
+
+    def ready(self) -> None:
+        from django.conf import settings
+
+        from . import celery_metrics, profiler
+
+        celery_metrics.connect()
+        if settings.PROFILER_SIGNAL_ENABLED:
+            profiler.install_signal_handler()
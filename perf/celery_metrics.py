@@ -0,0 +1,165 @@
+"""Celery task metrics pushed to the shared cache and merged into `/metrics`.
+
+Workers record through Celery signals with atomic `cache.incr` calls against
+`CELERY_METRICS_CACHE`, so every worker and the web process share one view. That needs a
+shared backend (`CACHE_SHARED`, i.e. `CACHE_URL`); without one nothing is rendered, since a
+per-process cache would report zeros for tasks that ran in the workers.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from bisect import bisect_left
+
+from celery import current_app
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    task_retry,
+)
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "celery:metrics"
+PUBLISHED_HEADER = "helssa_published_at"
+DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+WAIT_BUCKETS = (0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0)
+COUNTERS = ("failures", "retries", "in_flight")
+HISTOGRAMS = {
+    "duration": ("helssa_celery_task_duration_seconds", DURATION_BUCKETS),
+    "wait": ("helssa_celery_task_queue_wait_seconds", WAIT_BUCKETS),
+}
+# Sums are stored as integer microseconds so they can use atomic `incr`.
+MICROS = 1_000_000
+
+_started: dict[str, float] = {}
+_tasks_imported = False
+
+
+def _cache():
+    return caches[settings.CELERY_METRICS_CACHE]
+
+
+def _key(task: str, field: str) -> str:
+    return f"{PREFIX}:{task}:{field}"
+
+
+def _incr(task: str, field: str, delta: int = 1) -> None:
+    cache = _cache()
+    key = _key(task, field)
+    try:
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            if not cache.add(key, delta, timeout=None):
+                cache.incr(key, delta)
+    except Exception:  # metrics must never fail a task
+        logger.warning("celery metric update failed", extra={"extra": {"key": key}})
+
+
+def _observe(task: str, name: str, seconds: float) -> None:
+    index = bisect_left(HISTOGRAMS[name][1], seconds)
+    _incr(task, f"{name}:b{index}")
+    _incr(task, f"{name}:sum", int(seconds * MICROS))
+
+
+def _task_name(sender) -> str | None:
+    return getattr(sender, "name", None) or (sender if isinstance(sender, str) else None)
+
+
+def on_publish(sender=None, headers=None, **_) -> None:
+    if headers is not None:
+        headers.setdefault(PUBLISHED_HEADER, time.time())
+
+
+def on_prerun(task_id=None, task=None, **_) -> None:
+    name = _task_name(task)
+    if name is None:
+        return
+    _started[task_id] = time.perf_counter()
+    _incr(name, "in_flight")
+    published = getattr(task.request, PUBLISHED_HEADER, None)
+    if published is not None:
+        _observe(name, "wait", max(time.time() - float(published), 0.0))
+
+
+def on_postrun(task_id=None, task=None, state=None, **_) -> None:
+    name = _task_name(task)
+    started = _started.pop(task_id, None)
+    if name is None or started is None:
+        return
+    _incr(name, "in_flight", -1)
+    _observe(name, "duration", time.perf_counter() - started)
+    if state == "FAILURE":
+        _incr(name, "failures")
+
+
+def on_retry(sender=None, **_) -> None:
+    if name := _task_name(sender):
+        _incr(name, "retries")
+
+
+def connect() -> None:
+    before_task_publish.connect(on_publish, dispatch_uid="perf.celery_metrics.publish")
+    task_prerun.connect(on_prerun, dispatch_uid="perf.celery_metrics.prerun")
+    task_postrun.connect(on_postrun, dispatch_uid="perf.celery_metrics.postrun")
+    task_retry.connect(on_retry, dispatch_uid="perf.celery_metrics.retry")
+
+
+def task_names() -> list[str]:
+    global _tasks_imported
+    if not _tasks_imported:
+        # The web process only imports task modules lazily; load them all once so every
+        # task has a series even before it first runs here.
+        current_app.loader.import_default_modules()
+        _tasks_imported = True
+    return sorted(name for name in current_app.tasks if not name.startswith("celery."))
+
+
+def _fields() -> list[str]:
+    fields = list(COUNTERS)
+    for name, (_, buckets) in HISTOGRAMS.items():
+        fields += [f"{name}:b{idx}" for idx in range(len(buckets) + 1)] + [f"{name}:sum"]
+    return fields
+
+
+def render() -> list[str]:
+    """Prometheus lines for every registered task, read with a single `get_many`."""
+    if not settings.CACHE_SHARED:
+        return []
+    tasks = task_names()
+    fields = _fields()
+    try:
+        values = _cache().get_many([_key(task, field) for task in tasks for field in fields])
+    except Exception:
+        logger.warning("celery metrics unavailable")
+        return []
+    families: dict[str, list[str]] = {
+        "failures": ["# TYPE helssa_celery_task_failures_total counter"],
+        "retries": ["# TYPE helssa_celery_task_retries_total counter"],
+        "in_flight": ["# TYPE helssa_celery_tasks_in_flight gauge"],
+    }
+    families.update(
+        {name: [f"# TYPE {metric} histogram"] for name, (metric, _) in HISTOGRAMS.items()}
+    )
+    for task in tasks:
+        label = f'task="{task}"'
+        count = {field: values.get(_key(task, field), 0) for field in fields}
+        for field, metric in (
+            ("failures", "helssa_celery_task_failures_total"),
+            ("retries", "helssa_celery_task_retries_total"),
+            ("in_flight", "helssa_celery_tasks_in_flight"),
+        ):
+            families[field].append(f"{metric}{{{label}}} {max(count[field], 0)}")
+        for name, (metric, buckets) in HISTOGRAMS.items():
+            lines = families[name]
+            cumulative = 0
+            for idx, bound in enumerate((*buckets, "+Inf")):
+                cumulative += count[f"{name}:b{idx}"]
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{label}}} {count[f'{name}:sum'] / MICROS:.6f}")
+            lines.append(f"{metric}_count{{{label}}} {cumulative}")
+    return [line for lines in families.values() for line in lines]
@@ -0,0 +1,161 @@
+"""Per-route request latency histograms, aggregated across worker processes.
+
+Each thread records into its own shard, so the request path never takes a lock. When
+`METRICS_MULTIPROC_DIR` is set, every process periodically publishes its totals to
+`hist_<pid>.json` in that directory (written to a temp file and renamed into place), and
+`/metrics` sums the files of all workers. Point the setting at an empty directory that is
+wiped on deploy, like `PROMETHEUS_MULTIPROC_DIR`.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+METRIC = "helssa_http_request_duration_seconds"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FILE_PREFIX = "hist_"
+
+# (route, method, status) -> [per-bucket counts..., +Inf count, sum of seconds]
+Series = dict[tuple[str, str, str], list[float]]
+
+_local = threading.local()
+_shards: list[Series] = []
+_shards_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def _shard() -> Series:
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = {}
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+def observe(route: str, method: str, status: int, seconds: float) -> None:
+    key = (route, method, str(status))
+    shard = _shard()
+    values = shard.get(key)
+    if values is None:
+        values = shard[key] = [0.0] * (len(BUCKETS) + 2)
+    values[bisect_left(BUCKETS, seconds)] += 1
+    values[-1] += seconds
+    if _multiproc_dir() and time.monotonic() - _last_flush >= settings.METRICS_FLUSH_SECONDS:
+        flush()
+
+
+def _merge(into: Series, series) -> None:
+    for key, values in series:
+        key = tuple(key)
+        current = into.get(key)
+        if current is None:
+            into[key] = list(values)
+        else:
+            for idx, value in enumerate(values):
+                current[idx] += value
+
+
+def local_series() -> Series:
+    merged: Series = {}
+    with _shards_lock:
+        shards = list(_shards)
+    for shard in shards:
+        _merge(merged, list(shard.items()))
+    return merged
+
+
+def _multiproc_dir() -> Path | None:
+    path = settings.METRICS_MULTIPROC_DIR
+    return Path(path) if path else None
+
+
+def flush() -> None:
+    """Publish this process's totals to the shared directory."""
+    global _last_flush
+    directory = _multiproc_dir()
+    if directory is None or not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        _last_flush = time.monotonic()
+        payload = [[list(key), values] for key, values in local_series().items()]
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(payload, handle)
+        os.replace(tmp, directory / f"{FILE_PREFIX}{os.getpid()}.json")
+    except OSError:
+        logger.exception("histogram flush failed", extra={"extra": {"dir": str(directory)}})
+    finally:
+        _flush_lock.release()
+
+
+def collect() -> Series:
+    """Totals across every worker that published to the shared directory."""
+    merged = local_series()
+    directory = _multiproc_dir()
+    if directory is None or not directory.is_dir():
+        return merged
+    own = f"{FILE_PREFIX}{os.getpid()}.json"
+    for path in directory.glob(f"{FILE_PREFIX}*.json"):
+        if path.name == own:
+            continue
+        try:
+            _merge(merged, json.loads(path.read_text()))
+        except (OSError, ValueError):
+            logger.warning(
+                "skipping unreadable histogram file", extra={"extra": {"path": str(path)}}
+            )
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render() -> list[str]:
+    lines = [
+        f"# HELP {METRIC} Request latency by route, method and status.",
+        f"# TYPE {METRIC} histogram",
+    ]
+    for (route, method, status), values in sorted(collect().items()):
+        labels = f'route="{_escape(route)}",method="{method}",status="{status}"'
+        cumulative = 0.0
+        for bound, count in zip((*BUCKETS, "+Inf"), values[:-1], strict=True):
+            cumulative += count
+            lines.append(f'{METRIC}_bucket{{{labels},le="{bound}"}} {int(cumulative)}')
+        lines.append(f"{METRIC}_sum{{{labels}}} {values[-1]:.6f}")
+        lines.append(f"{METRIC}_count{{{labels}}} {int(cumulative)}")
+    return lines
+
+
+def reset() -> None:
+    global _last_flush
+    with _shards_lock:
+        for shard in _shards:
+            shard.clear()
+    _last_flush = 0.0
+
+
+def _after_fork() -> None:
+    global _shards, _shards_lock, _flush_lock, _local
+    _local = threading.local()
+    _shards = []
+    _shards_lock = threading.Lock()
+    _flush_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(flush)
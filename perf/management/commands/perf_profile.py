@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from perf.profiler import (
+    PROFILE_SIGNAL,
+    handler_installed,
+    output_dir,
+    ready_file,
+    request_file,
+)
+
+
+class Command(BaseCommand):
+    help = "Sample a running worker's stacks for N seconds and write a .folded flamegraph."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pid", type=int, required=True, help="Worker process id.")
+        parser.add_argument("--seconds", type=float, default=10.0)
+        parser.add_argument("--label", default="worker", help="Included in the file name.")
+
+    def handle(self, *args, **options):
+        pid, seconds = options["pid"], options["seconds"]
+        if not handler_installed(pid):
+            # Without the handler the signal's default action would kill the worker.
+            raise CommandError(
+                f"Process {pid} has no profiling handler; "
+                "start it with PROFILER_SIGNAL_ENABLED=true."
+            )
+        result = output_dir() / f"result-{pid}-{time.time_ns()}"
+        request_file(pid).write_text(
+            json.dumps({"seconds": seconds, "label": options["label"], "result": str(result)})
+        )
+        try:
+            os.kill(pid, PROFILE_SIGNAL)
+        except ProcessLookupError:
+            ready_file(pid).unlink(missing_ok=True)
+            raise CommandError(f"Process {pid} is not running.") from None
+
+        deadline = time.monotonic() + seconds + 10
+        while not result.exists():
+            if time.monotonic() > deadline:
+                raise CommandError(f"Process {pid} did not write a profile in time.")
+            time.sleep(0.05)
+        path = result.read_text()
+        result.unlink()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
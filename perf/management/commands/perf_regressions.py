@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import textwrap
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from perf.models import QuerySnapshot
+from perf.slowlog import find_regressions
+
+
+class Command(BaseCommand):
+    help = "Compare two pg_stat_statements snapshots and report regressed queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base", type=int, help="Baseline snapshot id (default: the one before --head)."
+        )
+        parser.add_argument("--head", type=int, help="Snapshot to check (default: latest).")
+        parser.add_argument(
+            "--mean-ratio",
+            type=float,
+            default=settings.PERF_REGRESSION_MEAN_RATIO,
+            help="Flag queries whose mean time grew by at least this factor.",
+        )
+        parser.add_argument(
+            "--rate-ratio",
+            type=float,
+            default=settings.PERF_REGRESSION_RATE_RATIO,
+            help="Flag queries whose calls per hour grew by at least this factor.",
+        )
+        parser.add_argument(
+            "--min-calls",
+            type=int,
+            default=settings.PERF_REGRESSION_MIN_CALLS,
+            help="Ignore queries with fewer calls than this in either window.",
+        )
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Exit with an error when any regression is found.",
+        )
+
+    def _snapshots(self, options) -> tuple[QuerySnapshot, QuerySnapshot]:
+        try:
+            if options["head"]:
+                head = QuerySnapshot.objects.get(pk=options["head"])
+            else:
+                head = QuerySnapshot.objects.all()[0]
+            if options["base"]:
+                base = QuerySnapshot.objects.get(pk=options["base"])
+            else:
+                base = QuerySnapshot.objects.filter(taken_at__lt=head.taken_at)[0]
+        except (IndexError, QuerySnapshot.DoesNotExist):
+            raise CommandError("Need two snapshots; run perf_slowlog --snapshot first.") from None
+        return base, head
+
+    def handle(self, *args, **options):
+        base, head = self._snapshots(options)
+        regressions = find_regressions(
+            base,
+            head,
+            mean_ratio=options["mean_ratio"],
+            rate_ratio=options["rate_ratio"],
+            min_calls=options["min_calls"],
+        )
+        self.stdout.write(f"Snapshot {base.pk} -> {head.pk}: {len(regressions)} regression(s)")
+        for item in regressions:
+            self.stdout.write(
+                f"[{','.join(item.reasons)}] mean {item.base_mean_ms:.2f}ms -> "
+                f"{item.head_mean_ms:.2f}ms, calls/h {item.base_rate:.0f} -> {item.head_rate:.0f}"
+            )
+            query = textwrap.shorten(item.query, width=200, placeholder="…")
+            self.stdout.write(f"    {query}")
+        if regressions and options["fail"]:
+            raise CommandError(f"{len(regressions)} query regression(s) detected")
@@ -6,6 +6,8 @@ import textwrap
 from django.core.management.base import BaseCommand
 from django.db import connections
 
+from perf.slowlog import stat_columns, take_snapshot
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +24,11 @@ class Command(BaseCommand):
             action="store_true",
             help="Reset pg_stat_statements after reporting.",
         )
+        parser.add_argument(
+            "--snapshot",
+            action="store_true",
+            help="Store a QuerySnapshot for perf_regressions before any reset.",
+        )
 
     def handle(self, *args, **options):
         connection = connections["default"]
@@ -31,11 +38,12 @@ class Command(BaseCommand):
             )
             return
 
+        total, mean = stat_columns(connection)
         with connection.cursor() as cursor:
             try:
                 cursor.execute(
-                    """
-                    SELECT query, calls, total_time, mean_time
+                    f"""
+                    SELECT query, calls, {total} AS total_time, {mean} AS mean_time
                     FROM pg_stat_statements
                     WHERE query NOT ILIKE '%%pg_stat_statements%%'
                     ORDER BY total_time DESC
@@ -47,8 +55,8 @@ class Command(BaseCommand):
                 top_total = [dict(zip(columns, row, strict=True)) for row in top_total]
 
                 cursor.execute(
-                    """
-                    SELECT query, calls, total_time, mean_time
+                    f"""
+                    SELECT query, calls, {total} AS total_time, {mean} AS mean_time
                     FROM pg_stat_statements
                     WHERE query NOT ILIKE '%%pg_stat_statements%%'
                     ORDER BY mean_time DESC
@@ -83,6 +91,10 @@ class Command(BaseCommand):
         self.stdout.write("")
         self.stdout.write(_render("Top 10 by mean time:", top_mean))
 
+        if options["snapshot"]:
+            snapshot = take_snapshot(connection)
+            self.stdout.write(f"Stored snapshot {snapshot.pk} ({snapshot.stats.count()} queries).")
+
         if options["reset"]:
             with connection.cursor() as cursor:
                 try:
@@ -2,38 +2,127 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+import time
 
 from django.conf import settings
-from django.db import Error
+from django.db import Error, connections
 from django.utils.timezone import now
 
+from core.cache import namespace_stats
+from core.db import pool_stats, read_alias, replica_configured, replica_lag
+
+from . import celery_metrics, histogram
+
 logger = logging.getLogger(__name__)
 
 READY_LAST_OK_TIMESTAMP = 0
 
+# (metric name, key in `core.db.pool_stats()`, Prometheus type)
+_POOL_METRICS = (
+    ("helssa_db_pool_size", "pool_size", "gauge"),
+    ("helssa_db_pool_available", "pool_available", "gauge"),
+    ("helssa_db_pool_requests_waiting", "requests_waiting", "gauge"),
+    ("helssa_db_pool_requests_num_total", "requests_num", "counter"),
+    ("helssa_db_pool_requests_queued_total", "requests_queued", "counter"),
+    ("helssa_db_pool_requests_errors_total", "requests_errors", "counter"),
+    ("helssa_db_pool_connections_errors_total", "connections_errors", "counter"),
+)
+
 
 def note_ready_success() -> None:
     global READY_LAST_OK_TIMESTAMP
     READY_LAST_OK_TIMESTAMP = int(now().timestamp())
 
 
+_ready_checks: dict[str, tuple[float, bool]] = {}
+
+
+def note_ready_check(component: str, seconds: float, ok: bool) -> None:
+    _ready_checks[component] = (seconds, ok)
+
+
+_count_cache: dict[str, tuple[int, float]] = {}
+_count_lock = threading.Lock()
+
+
+def _estimated_count(model, alias: str) -> int | None:
+    """Planner row estimate from `pg_class`; `None` until the table has been analyzed."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row and row[0] >= 0 else None
+
+
+def _count(model) -> int:
+    alias = read_alias()
+    if connections[alias].vendor == "postgresql" and not settings.METRICS_EXACT_COUNTS:
+        estimate = _estimated_count(model, alias)
+        if estimate is not None:
+            return estimate
+    return model.objects.using(alias).count()
+
+
 def _safe_count(model) -> int:
-    try:
-        return model.objects.count()
-    except Error:  # pragma: no cover - db outages hard to simulate
-        logger.exception("metrics count failed", extra={"model": model._meta.label_lower})
-        return 0
+    """Row count served from a per-process cache at most `METRICS_COUNT_MAX_AGE_SECONDS` old."""
+    label = model._meta.label_lower
+    cached = _count_cache.get(label)
+    if cached and time.monotonic() - cached[1] < settings.METRICS_COUNT_MAX_AGE_SECONDS:
+        return cached[0]
+    with _count_lock:
+        cached = _count_cache.get(label)
+        if cached and time.monotonic() - cached[1] < settings.METRICS_COUNT_MAX_AGE_SECONDS:
+            return cached[0]
+        try:
+            value = _count(model)
+        except Error:  # pragma: no cover - db outages hard to simulate
+            logger.exception("metrics count failed", extra={"model": label})
+            return cached[0] if cached else 0
+        _count_cache[label] = (value, time.monotonic())
+        return value
 
 
 def build_metrics() -> str:
+    from analytics.emitter import buffer_stats
     from analytics.models import Event, StatsDaily
 
+    buffered = buffer_stats()
     parts = [
         f'helssa_app_info{{version="{settings.APP_VERSION}"}} 1',
         f"helssa_events_total {_safe_count(Event)}",
         f"helssa_statsdays_total {_safe_count(StatsDaily)}",
         f"helssa_ready_last_ok_timestamp {READY_LAST_OK_TIMESTAMP}",
+        f"helssa_analytics_events_buffered {buffered['buffered']}",
+        f"helssa_analytics_events_dropped_total {buffered['dropped']}",
+        f"helssa_analytics_events_flush_failed_total {buffered['failed']}",
     ]
+    parts.append("# TYPE helssa_cache_requests_total counter")
+    parts.extend(
+        f'helssa_cache_requests_total{{namespace="{ns}",result="{result}"}} {count}'
+        for (ns, result), count in sorted(namespace_stats().items())
+    )
+    pools = sorted(pool_stats().items())
+    for metric, stat, kind in _POOL_METRICS:
+        if pools:
+            parts.append(f"# TYPE {metric} {kind}")
+        parts.extend(f'{metric}{{alias="{alias}"}} {stats.get(stat, 0)}' for alias, stats in pools)
+    parts.append("# TYPE helssa_ready_check_duration_seconds gauge")
+    parts.extend(
+        f'helssa_ready_check_duration_seconds{{component="{name}"}} {seconds:.6f}'
+        for name, (seconds, _) in sorted(_ready_checks.items())
+    )
+    parts.append("# TYPE helssa_ready_check_up gauge")
+    parts.extend(
+        f'helssa_ready_check_up{{component="{name}"}} {int(ok)}'
+        for name, (_, ok) in sorted(_ready_checks.items())
+    )
+    if replica_configured():
+        parts.append(f"helssa_db_replica_lag_seconds {replica_lag()}")
+    parts.extend(histogram.render())
+    parts.extend(celery_metrics.render())
     return "\n".join(parts) + "\n"
 
 
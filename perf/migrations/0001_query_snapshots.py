@@ -0,0 +1,69 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="QuerySnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("taken_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("server_version", models.PositiveIntegerField(default=0)),
+                ("window_seconds", models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ["-taken_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="QueryStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=64)),
+                ("query", models.TextField()),
+                ("calls", models.BigIntegerField(default=0)),
+                ("total_time_ms", models.FloatField(default=0)),
+                ("rows", models.BigIntegerField(default=0)),
+                ("delta_calls", models.BigIntegerField(default=0)),
+                ("delta_time_ms", models.FloatField(default=0)),
+                (
+                    "snapshot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stats",
+                        to="perf.querysnapshot",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("snapshot", "fingerprint"),
+                        name="perf_querystat_snapshot_fp_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
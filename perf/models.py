@@ -0,0 +1,38 @@
+from django.db import models
+
+
+class QuerySnapshot(models.Model):
+    taken_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    server_version = models.PositiveIntegerField(default=0)
+    window_seconds = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-taken_at"]
+
+    def __str__(self) -> str:
+        return f"QuerySnapshot({self.pk}@{self.taken_at:%Y-%m-%d %H:%M})"
+
+
+class QueryStat(models.Model):
+    snapshot = models.ForeignKey(QuerySnapshot, related_name="stats", on_delete=models.CASCADE)
+    fingerprint = models.CharField(max_length=64)
+    query = models.TextField()
+    calls = models.BigIntegerField(default=0)
+    total_time_ms = models.FloatField(default=0)
+    rows = models.BigIntegerField(default=0)
+    delta_calls = models.BigIntegerField(default=0)
+    delta_time_ms = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["snapshot", "fingerprint"], name="perf_querystat_snapshot_fp_uniq"
+            )
+        ]
+
+    @property
+    def delta_mean_ms(self) -> float:
+        return self.delta_time_ms / self.delta_calls if self.delta_calls else 0.0
+
+    def __str__(self) -> str:
+        return f"QueryStat({self.fingerprint[:12]}, calls={self.calls})"
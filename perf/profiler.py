@@ -0,0 +1,190 @@
+"""Statistical stack sampler producing collapsed-stack (flamegraph) files.
+
+A daemon thread reads `sys._current_frames()` every `PROFILER_INTERVAL_MS` and counts each
+stack, so the profiled code runs unmodified. Output uses the "folded" format understood by
+`flamegraph.pl`, speedscope and inferno: one `frame;frame;frame count` line per stack.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SIGNAL = signal.SIGUSR2
+_SLUG = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__") or Path(code.co_filename).stem
+    return f"{module}:{code.co_name}".replace(";", ":")
+
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+class StackSampler:
+    """Sample one thread (`thread_id`) or every other thread until `stop()` is called."""
+
+    def __init__(
+        self,
+        thread_id: int | None = None,
+        interval: float | None = None,
+        exclude: frozenset[int] = frozenset(),
+    ) -> None:
+        self.thread_id = thread_id
+        self.exclude = exclude
+        self.interval = interval or settings.PROFILER_INTERVAL_MS / 1000
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        skip = self.exclude | {threading.get_ident()}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frame = frames.get(self.thread_id)
+                targets = [frame] if frame is not None else []
+            else:
+                targets = [frame for ident, frame in frames.items() if ident not in skip]
+            for frame in targets:
+                self.stacks[_collapse(frame)] += 1
+            self.samples += 1
+
+    def start(self) -> StackSampler:
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+def output_dir() -> Path:
+    return Path(settings.PROFILER_OUTPUT_DIR)
+
+
+def write_folded(stacks: Counter[str], label: str) -> Path:
+    directory = output_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+    slug = _SLUG.sub("_", label).strip("_") or "root"
+    path = directory / f"{stamp}-{os.getpid()}-{slug}.folded"
+    path.write_text("".join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+    return path
+
+
+def request_file(pid: int) -> Path:
+    return output_dir() / f"request-{pid}.json"
+
+
+def ready_file(pid: int) -> Path:
+    return output_dir() / f"ready-{pid}"
+
+
+def _start_time(pid: int) -> str | None:
+    """Kernel start time of `pid` (distinguishes a reused pid); None without `/proc`."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return None
+    return stat.rsplit(")", 1)[1].split()[19]
+
+
+def handler_installed(pid: int) -> bool:
+    """Whether `pid` is the very process that installed the handler and wrote its ready file.
+
+    A ready file left by a process that died without cleanup, whose pid now belongs to
+    another process, is removed: `SIGUSR2`'s default action would kill that process.
+    """
+    try:
+        recorded = ready_file(pid).read_text()
+    except OSError:
+        return False
+    if recorded == (_start_time(pid) or ""):
+        return True
+    ready_file(pid).unlink(missing_ok=True)
+    return False
+
+
+def profile_process(seconds: float, label: str = "worker") -> Path:
+    sampler = StackSampler(exclude=frozenset({threading.get_ident()})).start()
+    time.sleep(seconds)
+    return write_folded(sampler.stop(), label)
+
+
+def _on_signal(signum, frame) -> None:
+    request = request_file(os.getpid())
+    try:
+        options = json.loads(request.read_text())
+        request.unlink()
+    except (OSError, ValueError):
+        options = {}
+
+    def run() -> None:
+        path = profile_process(float(options.get("seconds", 10)), options.get("label", "worker"))
+        result = options.get("result")
+        if result:
+            Path(result).write_text(str(path))
+        logger.info("worker profile written", extra={"extra": {"path": str(path)}})
+
+    threading.Thread(target=run, name="stack-sampler-signal", daemon=True).start()
+
+
+def _in_gunicorn_master() -> bool:
+    """True while a preloading gunicorn arbiter imports the app, before any worker forks.
+
+    The arbiter uses `SIGUSR2` for binary upgrades and workers reset it after forking, so
+    the handler must not be installed there.
+    """
+    modules = set()
+    frame = sys._getframe()
+    while frame is not None:
+        modules.add(frame.f_globals.get("__name__"))
+        frame = frame.f_back
+    return "gunicorn.arbiter" in modules and "gunicorn.workers.base" not in modules
+
+
+def _remove_ready_file(pid: int) -> None:
+    if os.getpid() == pid:
+        ready_file(pid).unlink(missing_ok=True)
+
+
+def install_signal_handler() -> bool:
+    """Let `perf_profile --pid` sample this process.
+
+    Returns False off the main thread and in a preloading gunicorn master.
+    """
+    if _in_gunicorn_master():
+        return False
+    try:
+        signal.signal(PROFILE_SIGNAL, _on_signal)
+    except ValueError:
+        return False
+    pid = os.getpid()
+    directory = output_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    ready_file(pid).write_text(_start_time(pid) or "")
+    atexit.register(_remove_ready_file, pid)
+    return True
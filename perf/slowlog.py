@@ -0,0 +1,164 @@
+"""`pg_stat_statements` snapshots and week-over-week regression detection."""
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QuerySnapshot, QueryStat
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\$\d+(?:\s*,\s*\$\d+)*\s*\)")
+
+
+def stat_columns(connection) -> tuple[str, str]:
+    """`(total, mean)` column names; PostgreSQL 13 renamed them to `*_exec_time`."""
+    if (connection.pg_version or 0) >= 130000:
+        return "total_exec_time", "mean_exec_time"
+    return "total_time", "mean_time"
+
+
+def normalize(query: str) -> str:
+    """Collapse whitespace and `IN ($1, $2, ...)` lists so equivalent statements share a key."""
+    query = _WHITESPACE.sub(" ", query).strip().lower()
+    return _PLACEHOLDER_LIST.sub("($n)", query)
+
+
+def fingerprint(query: str) -> str:
+    return hashlib.sha256(normalize(query).encode("utf-8")).hexdigest()
+
+
+def fetch_statements(connection, limit: int) -> list[dict]:
+    total, _ = stat_columns(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT query, calls, {total} AS total_time, rows
+            FROM pg_stat_statements
+            WHERE query NOT ILIKE '%%pg_stat_statements%%'
+            ORDER BY {total} DESC
+            LIMIT %s
+            """,
+            [limit],
+        )
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row, strict=True)) for row in cursor.fetchall()]
+
+
+def take_snapshot(connection, rows: list[dict] | None = None) -> QuerySnapshot:
+    """Store current totals plus deltas against the previous snapshot.
+
+    A statement whose counters went backwards (stats reset, server restart) is treated as
+    new, so its delta equals its current totals.
+    """
+    if rows is None:
+        rows = fetch_statements(connection, settings.PERF_SNAPSHOT_LIMIT)
+    merged: dict[str, dict] = {}
+    for row in rows:
+        key = fingerprint(row["query"])
+        entry = merged.setdefault(
+            key, {"query": normalize(row["query"]), "calls": 0, "total_time": 0.0, "rows": 0}
+        )
+        entry["calls"] += row["calls"] or 0
+        entry["total_time"] += row["total_time"] or 0.0
+        entry["rows"] += row["rows"] or 0
+
+    previous = QuerySnapshot.objects.first()
+    before = {}
+    if previous is not None:
+        before = {
+            stat.fingerprint: stat
+            for stat in previous.stats.filter(fingerprint__in=merged.keys())
+        }
+    with transaction.atomic():
+        now = timezone.now()
+        snapshot = QuerySnapshot.objects.create(
+            server_version=getattr(connection, "pg_version", None) or 0,
+            window_seconds=(now - previous.taken_at).total_seconds() if previous else None,
+        )
+        stats = []
+        for key, entry in merged.items():
+            prior = before.get(key)
+            delta_calls, delta_time = entry["calls"], entry["total_time"]
+            if prior is not None and entry["calls"] >= prior.calls:
+                delta_calls -= prior.calls
+                delta_time -= prior.total_time_ms
+            stats.append(
+                QueryStat(
+                    snapshot=snapshot,
+                    fingerprint=key,
+                    query=entry["query"],
+                    calls=entry["calls"],
+                    total_time_ms=entry["total_time"],
+                    rows=entry["rows"],
+                    delta_calls=delta_calls,
+                    delta_time_ms=max(delta_time, 0.0),
+                )
+            )
+        QueryStat.objects.bulk_create(stats)
+    cutoff = now - timedelta(days=settings.PERF_SNAPSHOT_RETENTION_DAYS)
+    QuerySnapshot.objects.filter(taken_at__lt=cutoff).delete()
+    return snapshot
+
+
+@dataclass
+class Regression:
+    fingerprint: str
+    query: str
+    base_mean_ms: float
+    head_mean_ms: float
+    base_rate: float
+    head_rate: float
+    reasons: list[str]
+
+
+def _rate(stat: QueryStat, snapshot: QuerySnapshot) -> float:
+    """Calls per hour over the snapshot window (or the raw delta when unknown)."""
+    if not snapshot.window_seconds:
+        return float(stat.delta_calls)
+    return stat.delta_calls * 3600 / snapshot.window_seconds
+
+
+def find_regressions(
+    base: QuerySnapshot,
+    head: QuerySnapshot,
+    *,
+    mean_ratio: float,
+    rate_ratio: float,
+    min_calls: int,
+) -> list[Regression]:
+    """Statements in `head` whose mean time or call rate grew past the ratios vs `base`.
+
+    Both sides use per-window deltas, so a statement is compared on the traffic of each
+    interval rather than on lifetime averages. Statements absent from `base` are skipped.
+    """
+    previous = {stat.fingerprint: stat for stat in base.stats.all()}
+    found = []
+    for stat in head.stats.filter(delta_calls__gte=min_calls).order_by("-delta_time_ms"):
+        prior = previous.get(stat.fingerprint)
+        if prior is None or prior.delta_calls < min_calls:
+            continue
+        base_rate, head_rate = _rate(prior, base), _rate(stat, head)
+        reasons = []
+        if prior.delta_mean_ms and stat.delta_mean_ms >= prior.delta_mean_ms * mean_ratio:
+            reasons.append("mean")
+        if base_rate and head_rate >= base_rate * rate_ratio:
+            reasons.append("calls")
+        if reasons:
+            found.append(
+                Regression(
+                    fingerprint=stat.fingerprint,
+                    query=stat.query,
+                    base_mean_ms=prior.delta_mean_ms,
+                    head_mean_ms=stat.delta_mean_ms,
+                    base_rate=base_rate,
+                    head_rate=head_rate,
+                    reasons=reasons,
+                )
+            )
+    return found
@@ -11,5 +11,5 @@ logger = logging.getLogger(__name__)
 @shared_task
 def collect_slowlog() -> None:
     logger.info("Scheduled perf_slowlog run starting")
-    call_command("perf_slowlog")
+    call_command("perf_slowlog", snapshot=True)
     logger.info("Scheduled perf_slowlog run completed")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Measure per-request overhead of the probe endpoints with and without FastPathMiddleware.
+
+"before" runs the full `MIDDLEWARE` stack and URL resolution, as it was before the fast
+path existed; "after" is the current stack. Requests are handed straight to Django's
+WSGI handler, so no server or network time is included:
+
+    python scripts/bench_fast_path.py --requests 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.test")
+os.environ.setdefault("BITPAY_WEBHOOK_SECRET", "bench")
+os.environ.setdefault("ENABLE_METRICS", "true")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+FAST_PATH = "core.middleware.fast_path.FastPathMiddleware"
+PATHS = ("/health", "/api/v1/system/health")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    return parser.parse_args()
+
+
+def _environ(path: str) -> dict:
+    return {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+
+
+def bench(path: str, requests: int) -> float:
+    """Median microseconds per request."""
+    handler = WSGIHandler()  # builds the middleware chain from the current settings
+
+    def start_response(status, headers):
+        assert status.startswith("200"), status
+
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        b"".join(handler(_environ(path), start_response))
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def main() -> None:
+    args = parse_args()
+    legacy = [name for name in settings.MIDDLEWARE if name != FAST_PATH]
+    print(f"{'path':<24} {'before µs':>10} {'after µs':>10} {'speedup':>8}")
+    for path in PATHS:
+        with override_settings(MIDDLEWARE=legacy):
+            before = bench(path, args.requests)
+        after = bench(path, args.requests)
+        print(f"{path:<24} {before:>10.1f} {after:>10.1f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Compare insert latency of string-keyed vs digest-keyed idempotency tables.
+
+Runs against a throwaway SQLite database so it needs no Django setup:
+
+    python scripts/bench_idempotency.py --rows 1000000 --inserts 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+SCHEMAS = {
+    "varchar_key": (
+        "CREATE TABLE idem (id INTEGER PRIMARY KEY, key VARCHAR(160) NOT NULL UNIQUE, "
+        "created_at REAL NOT NULL)"
+    ),
+    "binary_digest": (
+        "CREATE TABLE idem (id INTEGER PRIMARY KEY, key VARCHAR(160) NOT NULL, "
+        "digest BLOB NOT NULL UNIQUE, created_at REAL NOT NULL)"
+    ),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows preloaded per table.")
+    parser.add_argument("--inserts", type=int, default=20_000, help="Timed single-row inserts.")
+    return parser.parse_args()
+
+
+def _key(i: int) -> str:
+    token = hashlib.sha256(str(i).encode()).hexdigest()
+    return f"webhook:bitpay:{token}"
+
+
+def _row(variant: str, i: int) -> tuple:
+    key = _key(i)
+    if variant == "binary_digest":
+        return key, hashlib.sha256(key.encode()).digest(), time.time()
+    return key, time.time()
+
+
+def bench(variant: str, rows: int, inserts: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = sqlite3.connect(Path(tmp) / "bench.sqlite3")
+        db.execute(SCHEMAS[variant])
+        placeholders = "?, ?, ?" if variant == "binary_digest" else "?, ?"
+        columns = "key, digest, created_at" if variant == "binary_digest" else "key, created_at"
+        sql = f"INSERT INTO idem ({columns}) VALUES ({placeholders})"
+        db.executemany(sql, (_row(variant, i) for i in range(rows)))
+        db.commit()
+
+        samples = []
+        for i in range(rows, rows + inserts):
+            row = _row(variant, i)
+            started = time.perf_counter()
+            db.execute(sql, row)
+            db.commit()
+            samples.append(time.perf_counter() - started)
+        db.execute("PRAGMA wal_checkpoint")
+        size = sum(p.stat().st_size for p in Path(tmp).iterdir())
+        db.close()
+    samples.sort()
+    return {
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[int(len(samples) * 0.99)] * 1e6,
+        "db_mb": size / 1024 / 1024,
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    print(f"rows={args.rows} inserts={args.inserts}")
+    for variant in SCHEMAS:
+        result = bench(variant, args.rows, args.inserts)
+        print(
+            f"{variant:>14}: p50={result['p50_us']:.1f}us "
+            f"p99={result['p99_us']:.1f}us size={result['db_mb']:.1f}MB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
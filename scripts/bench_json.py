@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Compare stdlib and orjson-backed JSON on analytics pages and chatbot SSE streams.
+
+Times three workloads with the previous code path and `core.json`:
+
+- rendering a page of analytics events through DRF's renderer
+- formatting the delta events of a long streamed chatbot answer
+- parsing a large JSON request body
+
+    python scripts/bench_json.py --page-size 200 --deltas 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.test")
+os.environ.setdefault("BITPAY_WEBHOOK_SECRET", "bench")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser as StdlibParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer as StdlibRenderer  # noqa: E402
+
+from core.json import JSONParser, JSONRenderer, format_sse, orjson  # noqa: E402
+
+
+def legacy_format_sse(data) -> str:
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--deltas", type=int, default=2000, help="SSE events per answer.")
+    parser.add_argument("--repeat", type=int, default=200)
+    return parser.parse_args()
+
+
+def analytics_page(size: int) -> dict:
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    results = [
+        {
+            "id": i,
+            "name": "visit.completed",
+            "at": (start + timedelta(seconds=i)).isoformat(),
+            "props": {"gateway": "bitpay", "service": "visit", "tat_ms": i % 900, "note": "دکتر"},
+        }
+        for i in range(size)
+    ]
+    return {
+        "count": size * 10,
+        "next": "https://example.com/?page=2",
+        "previous": None,
+        "results": results,
+    }
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+def main() -> None:
+    args = parse_args()
+    page = analytics_page(args.page_size)
+    deltas = [{"delta": f"بخش {i} از پاسخ "} for i in range(args.deltas)]
+    body = json.dumps(page).encode()
+    stdlib_renderer, fast_renderer = StdlibRenderer(), JSONRenderer()
+    stdlib_parser, fast_parser = StdlibParser(), JSONParser()
+
+    workloads = {
+        f"render page ({args.page_size} events)": (
+            lambda: stdlib_renderer.render(page),
+            lambda: fast_renderer.render(page),
+        ),
+        f"format SSE ({args.deltas} deltas)": (
+            lambda: [legacy_format_sse(d) for d in deltas],
+            lambda: [format_sse(d) for d in deltas],
+        ),
+        f"parse body ({len(body) // 1024} KiB)": (
+            lambda: stdlib_parser.parse(io.BytesIO(body)),
+            lambda: fast_parser.parse(io.BytesIO(body)),
+        ),
+    }
+    print(f"backend: {'orjson ' + orjson.__version__ if orjson else 'stdlib fallback'}")
+    print(f"{'workload':<32} {'stdlib ms':>10} {'core.json ms':>13} {'speedup':>8}")
+    for name, (legacy, current) in workloads.items():
+        before, after = timed(legacy, args.repeat), timed(current, args.repeat)
+        print(f"{name:<32} {before:>10.3f} {after:>13.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Measure JSON log throughput (records/second) of the old and current formatters.
+
+Also times how long the calling thread spends per record with a direct StreamHandler
+versus the QueueStreamHandler, writing to /dev/null:
+
+    python scripts/bench_logging.py --records 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.logging import JsonFormatter, QueueStreamHandler, request_id_ctx  # noqa: E402
+
+LEGACY_MASK_KEYS = {"password", "token", "otp", "national_code"}
+
+
+def _legacy_mask(obj: Any) -> Any:
+    if isinstance(obj, Mapping):
+        return {k: ("***" if k in LEGACY_MASK_KEYS else _legacy_mask(v)) for k, v in obj.items()}
+    if isinstance(obj, list | tuple):
+        return [_legacy_mask(v) for v in obj]
+    return obj
+
+
+class LegacyJsonFormatter(logging.Formatter):
+    """The formatter as it was before the rework, kept here for comparison."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        base = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": request_id_ctx.get("-"),
+        }
+        if record.args and isinstance(record.args, Mapping):
+            base["args"] = _legacy_mask(record.args)
+        if record.__dict__.get("extra"):
+            base["extra"] = _legacy_mask(record.__dict__["extra"])
+        return json.dumps(base, ensure_ascii=False)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    return parser.parse_args()
+
+
+def _records(count: int) -> list[logging.LogRecord]:
+    extra = {"extra": {"gateway": "bitpay", "amount": 1200, "items": [{"sku": "a", "qty": 1}]}}
+    logger = logging.getLogger("bench")
+    return [
+        logger.makeRecord("bench", logging.INFO, __file__, 1, "paid %s", (i,), None, extra=extra)
+        for i in range(count)
+    ]
+
+
+def bench_formatter(formatter: logging.Formatter, records: list[logging.LogRecord]) -> float:
+    started = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return len(records) / (time.perf_counter() - started)
+
+
+def bench_handler(handler: logging.Handler, count: int) -> float:
+    logger = logging.getLogger(f"bench.{type(handler).__name__}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    started = time.perf_counter()
+    for i in range(count):
+        logger.info("paid %s", i, extra={"extra": {"gateway": "bitpay"}})
+    elapsed = time.perf_counter() - started
+    logger.removeHandler(handler)
+    handler.close()
+    return elapsed / count * 1e6
+
+
+def main() -> None:
+    args = parse_args()
+    request_id_ctx.set("bench-request")
+    records = _records(args.records)
+    print(f"{'formatter':<22}{'records/s':>14}")
+    for name, formatter in (("legacy", LegacyJsonFormatter()), ("current", JsonFormatter())):
+        print(f"{name:<22}{bench_formatter(formatter, records):>14,.0f}")
+
+    print(f"\n{'handler':<22}{'caller us/record':>18}")
+    with open(os.devnull, "w") as sink:
+        direct = logging.StreamHandler(sink)
+        direct.setFormatter(JsonFormatter())
+        queued = QueueStreamHandler(stream=sink, maxsize=args.records + 1)
+        queued.setFormatter(JsonFormatter())
+        for name, handler in (("StreamHandler", direct), ("QueueStreamHandler", queued)):
+            print(f"{name:<22}{bench_handler(handler, args.records):>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,14 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.common.mixins import ConditionalGetMixin
+
 from .models import BoxMoney, Subscription
 
 
-class MeSubscriptionView(APIView):
+class MeSubscriptionView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
+    validator_models = (Subscription, BoxMoney)
 
     def get(self, request):
         """
@@ -1,18 +1,78 @@
 import json
 import logging
+import threading
+import time
 
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+_session: requests.Session | None = None
+_lock = threading.Lock()
+
+
+def _build_session():
+    # Retries happen in verify_payment(), where they can be held to the overall deadline.
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.BITPAY_HTTP_POOL_SIZE,
+        max_retries=0,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _transient(exc: requests.RequestException) -> bool:
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code in RETRY_STATUSES
+
 
 def verify_payment(url, payload, headers=None):
-    try:
-        resp = requests.post(url, json=payload, headers=headers or {}, timeout=10)
-        resp.raise_for_status()
-    except requests.RequestException as exc:
-        logger.warning("bitpay.verify_failed", extra={"error": str(exc)})
-        raise
+    """POST to the gateway, retrying transient failures until `BITPAY_VERIFY_DEADLINE_SECONDS`.
+
+    Every attempt's timeouts are clipped to the time left, so a call returns or raises within
+    the deadline plus one connect timeout.
+    """
+    deadline = time.monotonic() + settings.BITPAY_VERIFY_DEADLINE_SECONDS
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        timeout = (
+            min(settings.BITPAY_VERIFY_CONNECT_TIMEOUT, remaining),
+            min(settings.BITPAY_VERIFY_READ_TIMEOUT, remaining),
+        )
+        try:
+            resp = get_session().post(url, json=payload, headers=headers or {}, timeout=timeout)
+            resp.raise_for_status()
+            break
+        except requests.RequestException as exc:
+            delay = settings.BITPAY_VERIFY_BACKOFF_SECONDS * 2**attempt
+            if (
+                attempt >= settings.BITPAY_VERIFY_RETRIES
+                or not _transient(exc)
+                or time.monotonic() + delay >= deadline
+            ):
+                logger.warning("bitpay.verify_failed", extra={"error": str(exc)})
+                raise
+            time.sleep(delay)
+            attempt += 1
     try:
         return resp.json()
     except json.JSONDecodeError:
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from telemedicine.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency keys older than the configured retention window in small chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ttl-hours",
+            type=int,
+            default=None,
+            help="Override IDEMPOTENCY_KEY_TTL_HOURS for this run.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Override IDEMPOTENCY_PURGE_BATCH_SIZE for this run.",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=0,
+            help="Stop after this many batches (0 means until no expired keys remain).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many keys would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        ttl_hours = options["ttl_hours"]
+        if ttl_hours is None:
+            ttl_hours = settings.IDEMPOTENCY_KEY_TTL_HOURS
+        batch_size = max(options["batch_size"] or settings.IDEMPOTENCY_PURGE_BATCH_SIZE, 1)
+        cutoff = timezone.now() - timedelta(hours=ttl_hours)
+        expired = IdempotencyKey.objects.filter(created_at__lt=cutoff)
+
+        if options["dry_run"]:
+            count = expired.count()
+            self.stdout.write(f"{count} idempotency keys older than {cutoff.isoformat()}.")
+            return
+
+        deleted = batches = 0
+        while not options["max_batches"] or batches < options["max_batches"]:
+            ids = list(expired.order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            count, _ = IdempotencyKey.objects.filter(id__in=ids).delete()
+            deleted += count
+            batches += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Removed {deleted} idempotency keys in {batches} batches.")
+        )
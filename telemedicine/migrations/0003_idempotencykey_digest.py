@@ -0,0 +1,50 @@
+import hashlib
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def fill_digests(apps, schema_editor):
+    model = apps.get_model("telemedicine", "IdempotencyKey")
+    pending = model.objects.filter(digest__isnull=True).only("id", "key")
+    batch = []
+    for row in pending.iterator(chunk_size=BATCH_SIZE):
+        row.digest = hashlib.sha256(row.key.encode("utf-8")).digest()
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_update(batch, ["digest"], batch_size=BATCH_SIZE)
+            batch = []
+    if batch:
+        model.objects.bulk_update(batch, ["digest"], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("telemedicine", "0002_transaction_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="digest",
+            field=models.BinaryField(editable=False, max_length=32, null=True),
+        ),
+        migrations.RunPython(fill_digests, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="idempotencykey",
+            name="digest",
+            field=models.BinaryField(editable=False, max_length=32, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="idempotencykey",
+            name="key",
+            field=models.CharField(max_length=160),
+        ),
+        migrations.AlterField(
+            model_name="idempotencykey",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
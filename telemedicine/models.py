@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import hashlib
+
 from django.db import models
 
 
+def key_digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode("utf-8")).digest()
+
+
 class IdempotencyKey(models.Model):
-    key = models.CharField(max_length=160, unique=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    key = models.CharField(max_length=160)
+    digest = models.BinaryField(max_length=32, unique=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         verbose_name = "Idempotency Key"
@@ -13,3 +20,8 @@ class IdempotencyKey(models.Model):
 
     def __str__(self) -> str:
         return self.key
+
+    def save(self, *args, **kwargs):
+        if not self.digest:
+            self.digest = key_digest(self.key)
+        super().save(*args, **kwargs)
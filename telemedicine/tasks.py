@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task
+from django.core.management import call_command
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def verify_payment_async(key: str, cache_key: str, data: dict) -> int:
+    from .views import complete_verification
+
+    _, status = complete_verification(key, cache_key, data)
+    return status
+
+
+@shared_task
+def purge_idempotency_keys() -> None:
+    logger.info("Scheduled idempotency_purge run starting")
+    call_command("idempotency_purge")
+    logger.info("Scheduled idempotency_purge run completed")
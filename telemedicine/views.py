@@ -1,37 +1,34 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import logging
 from datetime import datetime
 from typing import Any
 
 from django.conf import settings
+from django.core import signing
 from django.core.cache import cache
 from django.db import IntegrityError, transaction
-from django.http import HttpRequest, JsonResponse
+from django.http import HttpRequest
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 
-from analytics.models import Event
+from analytics.emitter import emit
+from core.json import JsonResponse, loads
 
 from .gateway.bitpay import verify_payment
 from .gateway.signature import verify_signature
-from .models import IdempotencyKey
+from .models import IdempotencyKey, key_digest
+from .tasks import verify_payment_async
 
 logger = logging.getLogger(__name__)
 SUCCESS = {"status": "ok"}
 ERROR = {"status": "error", "code": "gateway_unavailable"}
 SUCCESS_STATUSES = {"confirmed", "completed", "success", "paid", "settled"}
-
-
-def _emit(name: str, **props: Any) -> None:
-    try:
-        Event.objects.create(name=name, props=props)
-    except Exception:  # pragma: no cover
-        logger.exception("analytics_event_failed", extra={"name": name})
+ERROR_TTL_SECONDS = 300
+POLL_TOKEN_SALT = "telemedicine.verify.poll"
 
 
 def _idem_key(prefix: str, token: str | None, raw: bytes) -> str:
@@ -41,7 +38,9 @@ def _idem_key(prefix: str, token: str | None, raw: bytes) -> str:
 def _register_key(key: str) -> bool:
     try:
         with transaction.atomic():
-            _, created = IdempotencyKey.objects.get_or_create(key=key)
+            _, created = IdempotencyKey.objects.get_or_create(
+                digest=key_digest(key), defaults={"key": key}
+            )
             return created
     except IntegrityError:
         return False
@@ -51,7 +50,7 @@ def _acquire(prefix: str, token: str | None, request: HttpRequest, scope: str):
     key = _idem_key(prefix, token, request.body)
     cache_key = f"idem:{key}"
     if not _register_key(key):
-        _emit("pay_webhook_duplicate", key=key, scope=scope)
+        emit("pay_webhook_duplicate", key=key, scope=scope)
         return False, key, cache.get(cache_key), cache_key
     return True, key, None, cache_key
 
@@ -98,7 +97,7 @@ def _emit_success(payload: dict[str, Any], source: str) -> None:
         currency = amount.get("currency") or currency
         amount = amount.get("value") or amount.get("amount")
     tat_ms = max(int((finished - created).total_seconds() * 1000), 0)
-    _emit(
+    emit(
         "pay_success",
         tat_ms=tat_ms,
         amount=amount,
@@ -110,8 +109,8 @@ def _emit_success(payload: dict[str, Any], source: str) -> None:
 
 def _json_body(request: HttpRequest) -> dict[str, Any] | None:
     try:
-        return json.loads(request.body.decode("utf-8") or "{}")
-    except json.JSONDecodeError:
+        return loads(request.body or b"{}")
+    except ValueError:
         return None
 
 
@@ -120,11 +119,11 @@ def _json_body(request: HttpRequest) -> dict[str, Any] | None:
 def bitpay_webhook(request: HttpRequest) -> JsonResponse:
     ok, reason = verify_signature(request.headers, request.body)
     if not ok:
-        _emit("pay_webhook_bad_sig", reason=reason)
+        emit("pay_webhook_bad_sig", reason=reason)
         return JsonResponse({"status": "error", "code": "bad_signature"}, status=400)
     payload = _json_body(request)
     if payload is None:
-        _emit("pay_webhook_bad_payload", reason="bad_payload")
+        emit("pay_webhook_bad_payload", reason="bad_payload")
         return JsonResponse({"status": "error", "code": "bad_payload"}, status=400)
     event_id = payload.get("id") or payload.get("event_id")
     if isinstance(payload.get("data"), dict) and not event_id:
@@ -138,21 +137,13 @@ def bitpay_webhook(request: HttpRequest) -> JsonResponse:
     return JsonResponse(SUCCESS)
 
 
-@csrf_exempt
-@require_POST
-def bitpay_verify(request: HttpRequest) -> JsonResponse:
-    data = _json_body(request)
-    if data is None:
-        return JsonResponse({"status": "error", "code": "bad_payload"}, status=400)
-    txn_id = data.get("transaction_id") or data.get("id") or data.get("invoice_id")
-    ok, key, cached, cache_key = _acquire("verify", txn_id, request, "verify")
-    if not ok:
-        return JsonResponse(cached or SUCCESS)
+def complete_verification(key: str, cache_key: str, data: dict[str, Any]):
+    """Call the gateway and fill the idempotency cache; returns `(body, status)`."""
     try:
         response = verify_payment(settings.BITPAY_VERIFY_URL, data)
     except Exception as exc:
         logger.warning("bitpay.verify_error", extra={"error": str(exc)})
-        _emit(
+        emit(
             "ext_error",
             service="bitpay",
             op="verify",
@@ -160,11 +151,64 @@ def bitpay_verify(request: HttpRequest) -> JsonResponse:
             msg=str(exc),
         )
         try:
-            IdempotencyKey.objects.filter(key=key).delete()
+            IdempotencyKey.objects.filter(digest=key_digest(key)).delete()
         except Exception:
             logger.exception("idempotency_key_delete_failed", extra={"key": key})
-        return JsonResponse(cached or ERROR, status=502)
+        cache.set(cache_key, ERROR, ERROR_TTL_SECONDS)
+        return ERROR, 502
     success_body: dict[str, Any] = {"status": "ok", "data": response}
     cache.set(cache_key, success_body, 3600)
     _emit_success(response if isinstance(response, dict) else data, "verify")
-    return JsonResponse(success_body)
+    return success_body, 200
+
+
+def _status_for(body: dict[str, Any]) -> int:
+    status = body.get("status")
+    if status == "pending":
+        return 202
+    return 502 if status == "error" else 200
+
+
+def _enqueue_verification(key: str, cache_key: str, data: dict[str, Any]) -> JsonResponse | None:
+    pending = {
+        "status": "pending",
+        "token": signing.dumps(cache_key, salt=POLL_TOKEN_SALT),
+    }
+    cache.set(cache_key, pending, 3600)
+    try:
+        verify_payment_async.delay(key, cache_key, data)
+    except Exception:
+        logger.exception("bitpay.verify_enqueue_failed", extra={"key": key})
+        return None
+    return JsonResponse(pending, status=202)
+
+
+@csrf_exempt
+@require_POST
+def bitpay_verify(request: HttpRequest) -> JsonResponse:
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({"status": "error", "code": "bad_payload"}, status=400)
+    txn_id = data.get("transaction_id") or data.get("id") or data.get("invoice_id")
+    ok, key, cached, cache_key = _acquire("verify", txn_id, request, "verify")
+    if not ok:
+        body = cached or SUCCESS
+        return JsonResponse(body, status=_status_for(body))
+    if settings.BITPAY_VERIFY_ASYNC:
+        queued = _enqueue_verification(key, cache_key, data)
+        if queued is not None:
+            return queued
+    body, status = complete_verification(key, cache_key, data)
+    return JsonResponse(body, status=status)
+
+
+@require_GET
+def bitpay_verify_status(request: HttpRequest) -> JsonResponse:
+    try:
+        cache_key = signing.loads(request.GET.get("token", ""), salt=POLL_TOKEN_SALT)
+    except signing.BadSignature:
+        return JsonResponse({"status": "error", "code": "bad_token"}, status=400)
+    body = cache.get(cache_key)
+    if body is None:
+        return JsonResponse({"status": "error", "code": "unknown_token"}, status=404)
+    return JsonResponse(body, status=_status_for(body))
@@ -1,23 +1,26 @@
 from __future__ import annotations
 
-from datetime import date
+import csv
+import gzip
+import io
+import json
+from datetime import UTC, date, datetime
 
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
 from rest_framework.test import APIClient
 
+from analytics.api import filter_event_props
 from analytics.models import Event, StatsDaily
 
 pytestmark = pytest.mark.django_db
 
 
-def test_daily_stats_requires_staff_and_filters(django_user_model):
-    client = APIClient()
-    assert client.get("/api/v1/analytics/daily/").status_code in {401, 403}
-
-    user = django_user_model.objects.create_superuser(
-        username="staff", email="staff@example.com", password="pass"
-    )
-    client.force_authenticate(user=user)
+def test_daily_stats_requires_staff_and_filters(staff_client):
+    assert APIClient().get("/api/v1/analytics/daily/").status_code in {401, 403}
+    client = staff_client("staff")
 
     StatsDaily.objects.create(day=date(2025, 9, 25), pay_success=1)
     StatsDaily.objects.create(day=date(2025, 9, 26), pay_success=3)
@@ -29,7 +32,7 @@ def test_daily_stats_requires_staff_and_filters(django_user_model):
     assert payload["results"][0]["pay_success"] == 3
 
 
-def test_events_filter_and_limit(django_user_model):
+def test_events_filter_and_limit(staff_client):
     """
     قابلیت فیلتر بر اساس نام و محدودسازی تعداد نتایج در endpoint رویدادها را تست می‌کند.
     
@@ -38,11 +41,7 @@ def test_events_filter_and_limit(django_user_model):
     ارسال می‌کند و بررسی می‌کند که پاسخ با کد 200 بازگردد، تعداد نتایج حداکثر برابر با مقدار limit
     باشد و همهٔ آیتم‌های بازگشتی نام "pay_success" داشته باشند.
     """
-    user = django_user_model.objects.create_superuser(
-        username="staff2", email="staff2@example.com", password="pass"
-    )
-    client = APIClient()
-    client.force_authenticate(user=user)
+    client = staff_client("staff2")
 
     for idx in range(5):
         Event.objects.create(name="pay_success", props={"idx": idx})
@@ -52,3 +51,134 @@ def test_events_filter_and_limit(django_user_model):
     assert response.status_code == 200
     assert len(payload["results"]) == 3
     assert all(item["name"] == "pay_success" for item in payload["results"])
+
+
+def test_events_export_streams_ndjson_csv_and_gzip(staff_client):
+    client = staff_client("exporter")
+    for day in (25, 26, 27):
+        Event.objects.create(
+            name="pay_success",
+            at=datetime(2025, 9, day, 12, tzinfo=UTC),
+            props={"tat_ms": day},
+        )
+    Event.objects.create(name="ext_error", props={"service": "bitpay"})
+
+    url = "/api/v1/analytics/events/export/?name=pay_success&from=2025-09-26&to=2025-09-27"
+    response = client.get(url)
+    assert response.status_code == 200 and response.streaming
+    rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+    assert [row["props"]["tat_ms"] for row in rows] == [26, 27]
+
+    response = client.get(url + "&fmt=csv")
+    reader = csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode()))
+    assert [json.loads(row["props"])["tat_ms"] for row in reader] == [26, 27]
+
+    response = client.get(url + "&gzip=1")
+    assert response["Content-Type"] == "application/gzip"
+    assert gzip.decompress(b"".join(response.streaming_content)).count(b"\n") == 2
+
+    assert client.get(url + "&fmt=xml").status_code == 400
+    assert client.get("/api/v1/analytics/events/export/?from=yesterday").status_code == 400
+    assert client.get("/api/v1/analytics/events/?to=2025-13-01").status_code == 400
+
+
+def test_events_and_daily_keyset_pagination(staff_client, django_assert_num_queries):
+    client = staff_client("cursor")
+    same_at = datetime(2025, 9, 26, 12, tzinfo=UTC)
+    created = [Event.objects.create(name="pay_success", at=same_at) for _ in range(3)]
+    created += [Event.objects.create(name="pay_success") for _ in range(2)]
+    expected = sorted(created, key=lambda e: (e.at, e.id), reverse=True)
+
+    seen = []
+    url = "/api/v1/analytics/events/?name=pay_success&paginate=cursor&limit=2"
+    while url:
+        with django_assert_num_queries(1):
+            payload = client.get(url).json()
+        assert "count" not in payload
+        seen += [item["id"] for item in payload["results"]]
+        url = payload["next"]
+    assert seen == [event.id for event in expected]
+
+    for day in (24, 25, 26):
+        StatsDaily.objects.create(day=date(2025, 9, day))
+    first = client.get("/api/v1/analytics/daily/?paginate=cursor&limit=2").json()
+    assert [row["day"] for row in first["results"]] == ["2025-09-26", "2025-09-25"]
+    second = client.get(first["next"]).json()
+    assert [row["day"] for row in second["results"]] == ["2025-09-24"]
+    assert second["next"] is None
+
+    assert client.get("/api/v1/analytics/daily/?cursor=bm9wZQ").status_code == 404
+    assert client.get("/api/v1/analytics/daily/?paginate=cursor&limit=0").status_code == 400
+    capped = client.get("/api/v1/analytics/daily/?paginate=cursor&limit=500").json()
+    assert len(capped["results"]) == 3
+    assert client.get("/api/v1/analytics/events/?cursor=WyJ4IiwgInkiXQ==").status_code == 404
+
+
+def test_events_filter_by_whitelisted_props(staff_client):
+    client = staff_client("props")
+    Event.objects.create(name="pay_success", props={"gateway": "bitpay", "currency": "USD"})
+    Event.objects.create(name="pay_success", props={"gateway": "bitpay", "currency": "EUR"})
+    Event.objects.create(name="ext_error", props={"service": "bitpay", "code": 500})
+
+    response = client.get("/api/v1/analytics/events/?props.gateway=bitpay&props.currency=EUR")
+    assert [row["props"]["currency"] for row in response.json()["results"]] == ["EUR"]
+    response = client.get("/api/v1/analytics/events/?name=ext_error&props.code=500")
+    assert response.json()["count"] == 1
+    assert client.get("/api/v1/analytics/events/?props.national_code=1").status_code == 400
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"name": "pay_success", "props.gateway": "bitpay"},
+        {"name": "pay_success", "props.currency": "USD"},
+        {"name": "ext_error", "props.service": "bitpay"},
+    ],
+)
+def test_event_prop_filter_query_plans(params):
+    query = QueryDict(mutable=True)
+    query.update(params)
+    qs = filter_event_props(Event.objects.filter(name=params["name"]), query).order_by("-at")
+    plan = qs.explain()
+    if connection.vendor == "postgresql":
+        key = next(k for k in params if k.startswith("props.")).removeprefix("props.")
+        assert "analytics_event_name_at_idx" in plan or f"analytics_event_{key}_idx" in plan
+    else:
+        assert "USING INDEX analytics_event_name_at_idx" in plan
+
+
+def test_events_agg_buckets_and_caches_closed_buckets(staff_client, django_assert_num_queries):
+    cache.clear()
+    client = staff_client("agg")
+    for hour, tats in ((10, [100, 200, 300]), (11, [50])):
+        for tat in tats:
+            Event.objects.create(
+                name="pay_success",
+                at=datetime(2025, 9, 26, hour, 30, tzinfo=UTC),
+                props={"tat_ms": tat, "gateway": "bitpay"},
+            )
+    url = (
+        "/api/v1/analytics/events/agg/?name=pay_success&bucket=hour&value=tat_ms"
+        "&from=2025-09-26T10:00:00Z&to=2025-09-26T12:59:00Z"
+    )
+    payload = client.get(url).json()
+    rows = payload["results"]
+    assert [row["count"] for row in rows] == [3, 1, 0]
+    assert rows[0]["p50"] == 200 and rows[0]["p95"] == pytest.approx(290)
+    assert rows[2]["p50"] is None
+
+    Event.objects.create(name="pay_success", at=datetime(2025, 9, 26, 10, 5, tzinfo=UTC))
+    with django_assert_num_queries(0):
+        assert client.get(url).json()["results"] == rows
+
+    daily = client.get(
+        "/api/v1/analytics/events/agg/?name=pay_success&bucket=day&props.gateway=bitpay"
+        "&from=2025-09-26&to=2025-09-26"
+    ).json()["results"]
+    assert daily == [{"start": "2025-09-26T00:00:00+00:00", "count": 4}]
+
+    assert client.get("/api/v1/analytics/events/agg/?bucket=hour").status_code == 400
+    assert client.get("/api/v1/analytics/events/agg/?name=x&bucket=week").status_code == 400
+    assert client.get("/api/v1/analytics/events/agg/?name=x&value=amount").status_code == 400
+    too_wide = "/api/v1/analytics/events/agg/?name=x&from=2000-01-01&to=2025-01-01"
+    assert client.get(too_wide).status_code == 400
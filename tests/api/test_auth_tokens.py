@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from apps.common import auth
+
+pytestmark = pytest.mark.django_db
+
+
+def _obtain(client, username="tokenuser", **extra):
+    get_user_model().objects.create_user(username=username, password="pass", **extra)
+    response = client.post(
+        "/api/v1/auth/token", {"username": username, "password": "pass"}, format="json"
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_access_token_authenticates_without_auth_queries(django_assert_num_queries):
+    client = APIClient()
+    tokens = _obtain(client)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    # Only the view's own subscription and balance lookups.
+    with django_assert_num_queries(2):
+        response = client.get("/api/v1/subscriptions/me")
+    assert response.status_code == 200
+    assert response.json() == {"tokens": 0, "balance": 0}
+
+
+def test_staff_flag_carried_in_token():
+    client = APIClient()
+    tokens = _obtain(client, username="tokenstaff", is_staff=True)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    assert client.get("/api/v1/analytics/daily/").status_code == 200
+
+
+def test_invalid_expired_and_wrong_kind_tokens_rejected(settings):
+    client = APIClient()
+    tokens = _obtain(client)
+    for token in (tokens["access"] + "x", tokens["refresh"]):
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        assert client.get("/api/v1/subscriptions/me").status_code == 401
+
+    settings.AUTH_ACCESS_TOKEN_TTL = -1
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    response = client.get("/api/v1/subscriptions/me")
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"] == 'Bearer realm="api"'
+
+
+def test_refresh_rotates_and_revoke_logs_out():
+    client = APIClient()
+    tokens = _obtain(client)
+    refreshed = client.post(
+        "/api/v1/auth/token/refresh", {"refresh": tokens["refresh"]}, format="json"
+    )
+    assert refreshed.status_code == 200
+    new = refreshed.json()
+    assert set(new) == {"access", "refresh", "expires_in"}
+
+    reused = client.post(
+        "/api/v1/auth/token/refresh", {"refresh": tokens["refresh"]}, format="json"
+    )
+    assert reused.status_code == 401
+
+    revoked = client.post("/api/v1/auth/token/revoke", {"refresh": new["refresh"]}, format="json")
+    assert revoked.status_code == 204
+    again = client.post("/api/v1/auth/token/refresh", {"refresh": new["refresh"]}, format="json")
+    assert again.status_code == 401
+
+
+def test_rotation_is_single_use_and_access_skips_revocation_lookup(monkeypatch):
+    client = APIClient()
+    tokens = _obtain(client, username="rotator")
+    claims = auth.decode_token(tokens["refresh"], auth.REFRESH)
+    assert auth.revoke(claims) is True
+    assert auth.revoke(claims) is False
+    assert cache.get(f"auth:revoked:{claims['jti']}") == 1
+
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    original_get = cache.get
+    looked_up = []
+
+    def spy(key, *args, **kwargs):
+        looked_up.append(key)
+        return original_get(key, *args, **kwargs)
+
+    monkeypatch.setattr(cache, "get", spy)
+    assert client.get("/api/v1/subscriptions/me").status_code == 200
+    assert not any(key.startswith("auth:revoked") for key in looked_up)
+
+
+def test_obtain_rejects_bad_credentials():
+    client = APIClient()
+    _obtain(client)
+    bad = client.post(
+        "/api/v1/auth/token", {"username": "tokenuser", "password": "nope"}, format="json"
+    )
+    assert bad.status_code == 401
+    assert client.post("/api/v1/auth/token", {}, format="json").status_code == 400
+
+
+def test_token_user_loads_other_fields_on_first_access(django_assert_num_queries):
+    admin = get_user_model().objects.create_superuser("root", "root@example.com", "pass")
+    claims = auth.decode_token(auth.issue_token(admin))
+    with django_assert_num_queries(0):
+        user = auth.token_user(claims)
+        assert (user.pk, user.is_staff, user.is_superuser) == (admin.pk, True, True)
+    with django_assert_num_queries(2):
+        assert (user.username, user.email) == ("root", "root@example.com")
+
+
+def test_non_object_bodies_are_rejected():
+    client = APIClient()
+    for body in (["tokenuser", "pass"], "tokenuser"):
+        assert client.post("/api/v1/auth/token", body, format="json").status_code == 400
+
+
+def test_no_refresh_tokens_without_shared_cache(settings):
+    client = APIClient()
+    refresh = _obtain(client)["refresh"]
+    settings.CACHE_SHARED = False
+    assert "refresh" not in _obtain(client, username="local")
+    rejected = client.post("/api/v1/auth/token/refresh", {"refresh": refresh}, format="json")
+    assert rejected.status_code == 401
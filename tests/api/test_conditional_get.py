@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from analytics import rollup
+from analytics.models import StatsDaily
+from core.db import pin_primary
+from sub.models import Subscription
+
+pytestmark = pytest.mark.django_db
+
+
+def test_unchanged_subscription_answers_304_without_queries(
+    user_client, django_assert_num_queries
+):
+    client = user_client("poller")
+    first = client.get("/api/v1/subscriptions/me")
+    assert first.status_code == 200
+    assert first["Cache-Control"] == "private, no-cache"
+    etag, last_modified = first["ETag"], first["Last-Modified"]
+
+    with django_assert_num_queries(0):
+        cached = client.get("/api/v1/subscriptions/me", HTTP_IF_NONE_MATCH=etag)
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached["ETag"] == etag
+    # Last-Modified has one-second resolution, so it alone never earns a 304.
+    since = client.get("/api/v1/subscriptions/me", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert since.status_code == 200
+
+    Subscription.objects.create(user=client.user, tokens=7)
+    changed = client.get("/api/v1/subscriptions/me", HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200 and changed.json()["tokens"] == 7
+    assert changed["ETag"] != etag
+
+
+def test_etag_is_scoped_to_the_caller(user_client):
+    first = user_client("first")
+    second = user_client("second")
+    etag = first.get("/api/v1/certificates/")["ETag"]
+    assert second.get("/api/v1/certificates/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+    assert first.get("/api/v1/certificates/?page=2", HTTP_IF_NONE_MATCH=etag).status_code != 304
+
+
+def test_rollup_invalidates_daily_stats_validators(staff_client):
+    StatsDaily.objects.create(day=date(2026, 1, 1))
+    client = staff_client("dash")
+    first = client.get("/api/v1/analytics/daily/")
+    assert first["Cache-Control"] == "private, max-age=30"
+    again = client.get("/api/v1/analytics/daily/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert again.status_code == 304
+
+    # The rollup only issues queryset updates, which send no post_save.
+    rollup._apply({date(2026, 1, 1): {"pay_success": 1}}, {})
+    after = client.get("/api/v1/analytics/daily/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert after.status_code == 200 and after.json()["results"][0]["pay_success"] == 1
+
+
+def test_replica_reads_issue_no_validators_within_max_lag(replica_reads, staff_client, settings):
+    client = staff_client("lagged")
+    StatsDaily.objects.create(day=date(2026, 1, 1))
+    fresh = client.get("/api/v1/analytics/daily/")
+    assert fresh.status_code == 200 and not fresh.has_header("ETag")
+
+    pin_primary(client.user)
+    assert client.get("/api/v1/analytics/daily/").has_header("ETag")
+
+    other = staff_client("other")
+    settings.DATABASE_REPLICA_MAX_LAG_SECONDS = 0
+    assert other.get("/api/v1/analytics/daily/").has_header("ETag")
+
+
+def test_no_validators_without_shared_cache(user_client, settings):
+    settings.CACHE_SHARED = False
+    client = user_client("local")
+    response = client.get("/api/v1/subscriptions/me")
+    assert response.status_code == 200 and not response.has_header("ETag")
+    assert client.get("/api/v1/subscriptions/me", HTTP_IF_NONE_MATCH="*").status_code == 200
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from analytics.models import StatsDaily
+from core.db import pin_primary
+from down.models import APKDownloadStat
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_repeat_request_is_served_without_queries(staff_client, django_assert_num_queries):
+    StatsDaily.objects.create(day=date(2026, 1, 1))
+    client = staff_client("dash")
+    first = client.get("/api/v1/analytics/daily/?from=2026-01-01&limit=10")
+    assert first.status_code == 200 and first["X-Cache"] == "miss"
+
+    with django_assert_num_queries(0):
+        again = client.get("/api/v1/analytics/daily/?limit=10&from=2026-01-01")
+    assert again.status_code == 200 and again["X-Cache"] == "hit"
+    assert again.content == first.content
+    assert again["Content-Type"] == first["Content-Type"]
+    assert again.has_header("ETag")
+    assert "Accept" in again["Vary"] and again["Vary"] == first["Vary"]
+
+    other = client.get("/api/v1/analytics/daily/?from=2026-01-02&limit=10")
+    assert other["X-Cache"] == "miss"
+
+
+def test_write_to_tracked_model_retires_entries(staff_client):
+    client = staff_client("dash")
+    assert client.get("/api/v1/down/apk-stats/").json()["count"] == 0
+
+    APKDownloadStat.objects.create(key="v1", count=3)
+    fresh = client.get("/api/v1/down/apk-stats/")
+    assert fresh["X-Cache"] == "miss" and fresh.json()["count"] == 1
+
+
+def test_staff_share_entries_and_errors_are_not_cached(staff_client):
+    staff_client("first").get("/api/v1/doctor/visits/")
+    assert staff_client("second").get("/api/v1/doctor/visits/")["X-Cache"] == "hit"
+
+    missing = staff_client("third").get("/api/v1/doctor/visits/999/")
+    assert missing.status_code == 404 and not missing.has_header("X-Cache")
+
+    anonymous = APIClient().get("/api/v1/doctor/visits/")
+    assert anonymous.status_code in (401, 403) and not anonymous.has_header("X-Cache")
+
+
+def test_entries_are_per_host_and_need_a_shared_cache(staff_client, settings):
+    settings.ALLOWED_HOSTS = ["testserver", "other.example"]
+    client = staff_client("dash")
+    client.get("/api/v1/down/apk-stats/")
+    assert client.get("/api/v1/down/apk-stats/", HTTP_HOST="other.example")["X-Cache"] == "miss"
+
+    settings.CACHE_SHARED = False
+    local = client.get("/api/v1/down/apk-stats/")
+    assert local.status_code == 200 and not local.has_header("X-Cache")
+
+
+def test_lagging_replica_reads_are_not_stored(replica_reads, staff_client, settings):
+    reader = staff_client("reader")
+    APKDownloadStat.objects.create(key="v2", count=1)
+    assert reader.get("/api/v1/down/apk-stats/")["X-Cache"] == "miss"
+
+    writer = staff_client("writer")
+    pin_primary(writer.user)
+    # Nothing was stored from the replica, so the writer reads its own write from the primary.
+    assert writer.get("/api/v1/down/apk-stats/")["X-Cache"] == "miss"
+    assert reader.get("/api/v1/down/apk-stats/")["X-Cache"] == "hit"
+
+    cache.clear()
+    settings.DATABASE_REPLICA_MAX_LAG_SECONDS = 0
+    reader.get("/api/v1/down/apk-stats/")
+    assert reader.get("/api/v1/down/apk-stats/")["X-Cache"] == "hit"
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import pytest
+from django.core.cache import caches
 from rest_framework.test import APIClient
 
+from perf.metrics import build_metrics
+
 pytestmark = pytest.mark.django_db
 
 
@@ -25,22 +28,6 @@ def _fake_celery(response):
     return type("Celery", (), {"control": _Control()})()
 
 
-def _auth_client(user):
-    """
-    یک نمونهٔ APIClient را ساخته و آن را به‌عنوان کاربر مشخص شده احراز هویت می‌کند.
-    
-    Parameters:
-        user (django.contrib.auth.models.User): نمونهٔ کاربر دجانگو که درخواست‌ها باید
-        به‌صورت آن کاربر اجرا شوند.
-    
-    Returns:
-        APIClient: نمونهٔ DRF `APIClient` که با کاربر داده‌شده احراز هویت شده است.
-    """
-    client = APIClient()
-    client.force_authenticate(user=user)
-    return client
-
-
 def test_system_health_public_headers():
     response = APIClient().get("/api/v1/system/health")
     body = response.json()
@@ -49,7 +36,7 @@ def test_system_health_public_headers():
     assert "X-Response-Time-ms" in response
 
 
-def test_system_ready_requires_staff(django_user_model):
+def test_system_ready_requires_staff(user_client):
     """
     بررسی می‌کند که endpoint سلامت/آمادگی سیستم (/api/v1/system/ready) فقط برای کاربران دارای
     دسترسی سطح مدیر (staff/superuser) قابل دسترسی باشد.
@@ -59,31 +46,68 @@ def test_system_ready_requires_staff(django_user_model):
     - درخواست از طرف یک کاربر عادی (non-staff) پس از احراز هویت باید با کد وضعیت 403 رد شود.
     
     Parameters:
-        django_user_model: فیکچر یا مدل کاربر Django که برای ایجاد کاربرهای آزمایشی (مثلاً کاربر
-        عادی) استفاده می‌شود.
+        user_client: فیکچر سازندهٔ APIClient احراز هویت‌شده با یک کاربر عادی تازه.
     """
-    client = APIClient()
-    assert client.get("/api/v1/system/ready").status_code in {401, 403}
-
-    user = django_user_model.objects.create_user(
-        username="regular", email="regular@example.com", password="pass"
-    )
-    client.force_authenticate(user=user)
-    assert client.get("/api/v1/system/ready").status_code == 403
+    assert APIClient().get("/api/v1/system/ready").status_code in {401, 403}
+    assert user_client("regular").get("/api/v1/system/ready").status_code == 403
 
 
 @pytest.mark.parametrize(
     "celery_response, expected_status",
     [([{"ok": True}], 200), ([], 503)],
 )
-def test_system_ready_status(monkeypatch, django_user_model, celery_response, expected_status):
+def test_system_ready_status(monkeypatch, staff_client, celery_response, expected_status):
     monkeypatch.setattr("apps.system.views.celery_app", _fake_celery(celery_response))
-    user = django_user_model.objects.create_superuser(
-        username="admin", email="admin@example.com", password="pass"
-    )
-    response = _auth_client(user).get("/api/v1/system/ready")
+    response = staff_client("admin").get("/api/v1/system/ready")
 
     assert response.status_code == expected_status
     payload = response.json()
     assert payload["status"] == ("ok" if expected_status == 200 else "degraded")
     assert "components" in payload
+
+
+def test_system_ready_probes_shared_cache_tier(monkeypatch, staff_client, settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "core.cache.TieredCache",
+            "LOCATION": "ready-probe",
+            "OPTIONS": {"REMOTE_BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        }
+    }
+    monkeypatch.setattr("apps.system.views.celery_app", _fake_celery([{"ok": True}]))
+    monkeypatch.setattr("apps.system.views.cache", caches["default"])
+    payload = staff_client("admin").get("/api/v1/system/ready").json()
+    assert payload["components"]["cache"] == {"status": "ok", "backend": "LocMemCache"}
+
+
+def test_system_ready_serves_cached_snapshot(monkeypatch, staff_client, settings):
+    pings = []
+
+    class _Control:
+        def ping(self, timeout: float = 1.0):
+            pings.append(timeout)
+            return [{"worker": {"ok": "pong"}}]
+
+    fake_celery = type("Celery", (), {"control": _Control()})()
+    monkeypatch.setattr("apps.system.views.celery_app", fake_celery)
+    started = []
+    monkeypatch.setattr("apps.system.views._ensure_prober", lambda: started.append(True))
+    monkeypatch.setattr("apps.system.views._snapshot", None)
+    settings.READY_SNAPSHOT_MAX_AGE_SECONDS = 60
+    client = staff_client("admin")
+
+    first = client.get("/api/v1/system/ready").json()
+    second = client.get("/api/v1/system/ready").json()
+    assert len(pings) == 1
+    assert not started  # no per-process background prober by default
+    assert first["checked_at"] == second["checked_at"]
+    assert set(second["latency_ms"]) == {"db", "cache", "celery"}
+    assert second["age_seconds"] >= 0
+
+    metrics = build_metrics()
+    assert 'helssa_ready_check_up{component="celery"} 1' in metrics
+    assert 'helssa_ready_check_duration_seconds{component="db"}' in metrics
+
+    settings.READY_PROBE_INTERVAL_SECONDS = 10
+    client.get("/api/v1/system/ready")
+    assert started
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.test import APIClient
+
+from core import db
+
+
+@pytest.fixture
+def user_client(django_user_model):
+    """Factory for an `APIClient` authenticated as a new user, available as `client.user`."""
+
+    def make(username: str = "user", **extra) -> APIClient:
+        user = django_user_model.objects.create_user(
+            username=username, email=f"{username}@example.com", password="pass", **extra
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.user = user
+        return client
+
+    return make
+
+
+@pytest.fixture
+def staff_client(user_client):
+    """Factory for an `APIClient` authenticated as a new superuser."""
+
+    def make(username: str = "staff") -> APIClient:
+        return user_client(username, is_staff=True, is_superuser=True)
+
+    return make
+
+
+@pytest.fixture
+def replica(monkeypatch, settings):
+    """Pretend a replica is configured, with a controllable lag."""
+    lag = {"seconds": 0.0, "checks": 0}
+
+    def measure():
+        lag["checks"] += 1
+        return lag["seconds"]
+
+    monkeypatch.setattr(db, "replica_configured", lambda: True)
+    monkeypatch.setattr(db, "_measure_lag", measure)
+    monkeypatch.setattr(db, "_lag", None)
+    settings.DATABASE_REPLICA_MAX_LAG_SECONDS = 5
+    settings.DATABASE_REPLICA_LAG_CHECK_SECONDS = 60
+    return lag
+
+
+@pytest.fixture
+def replica_reads(replica, monkeypatch):
+    """`replica`, with queries on the replica alias served by the test's own connection."""
+    monkeypatch.setattr(
+        connections._connections, db.REPLICA_ALIAS, connections[DEFAULT_DB_ALIAS], raising=False
+    )
+    return replica
@@ -0,0 +1,44 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from telemedicine.models import IdempotencyKey, key_digest
+from telemedicine.tasks import purge_idempotency_keys
+
+pytestmark = pytest.mark.django_db
+
+
+def _make(key, age_hours):
+    row = IdempotencyKey.objects.create(key=key)
+    IdempotencyKey.objects.filter(pk=row.pk).update(
+        created_at=timezone.now() - timedelta(hours=age_hours)
+    )
+    return row
+
+
+def test_digest_is_populated_and_unique():
+    row = IdempotencyKey.objects.create(key="webhook:bitpay:evt-1")
+    assert bytes(row.digest) == key_digest("webhook:bitpay:evt-1")
+    assert IdempotencyKey.objects.filter(digest=key_digest("webhook:bitpay:evt-1")).exists()
+
+
+def test_purge_deletes_only_expired_in_batches(settings):
+    settings.IDEMPOTENCY_KEY_TTL_HOURS = 24
+    for idx in range(5):
+        _make(f"verify:bitpay:old-{idx}", 48)
+    _make("verify:bitpay:fresh", 1)
+
+    dry = StringIO()
+    call_command("idempotency_purge", "--dry-run", stdout=dry)
+    assert dry.getvalue().startswith("5 idempotency keys")
+    assert IdempotencyKey.objects.count() == 6
+
+    out = StringIO()
+    call_command("idempotency_purge", "--batch-size", "2", "--max-batches", "2", stdout=out)
+    assert "Removed 4 idempotency keys in 2 batches" in out.getvalue()
+
+    purge_idempotency_keys()
+    assert list(IdempotencyKey.objects.values_list("key", flat=True)) == ["verify:bitpay:fresh"]
@@ -1,13 +1,18 @@
 import hmac
 import json
+import types
 from datetime import timedelta
 
 import pytest
 import requests
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 
 from analytics.models import Event
+from telemedicine import views
+from telemedicine.gateway import bitpay
+from telemedicine.models import IdempotencyKey, key_digest
 
 pytestmark = pytest.mark.django_db
 
@@ -80,3 +85,84 @@ def test_verify_errors_emit_ext_error(client, monkeypatch, factory, expected):
     assert resp.status_code == 502
     event = Event.objects.filter(name="ext_error", props__op="verify").last()
     assert event and event.props["code"] == expected
+
+
+def test_async_verify_returns_poll_token(client, monkeypatch, settings):
+    settings.BITPAY_VERIFY_ASYNC = True
+    calls = []
+
+    def fake_verify(url, payload):
+        calls.append(payload)
+        return {"status": "confirmed", "created_at": timezone.now().isoformat()}
+
+    monkeypatch.setattr("telemedicine.views.verify_payment", fake_verify)
+    body = json.dumps({"transaction_id": "txn-async"})
+    first = client.post("/telemedicine/pay/verify", data=body, content_type="application/json")
+    assert first.status_code == 202 and first.json()["status"] == "pending"
+    token = first.json()["token"]
+
+    polled = client.get("/telemedicine/pay/verify/status", {"token": token})
+    assert polled.status_code == 200 and polled.json()["data"]["status"] == "confirmed"
+    assert len(calls) == 1
+    assert client.get("/telemedicine/pay/verify/status", {"token": "forged"}).status_code == 400
+
+
+def test_duplicate_verify_reports_cached_failure(client):
+    key = views._idem_key("verify", "txn-dup", b"")
+    IdempotencyKey.objects.create(digest=key_digest(key), key=key)
+    cache.set(f"idem:{key}", views.ERROR, 60)
+    body = json.dumps({"transaction_id": "txn-dup"})
+    resp = client.post("/telemedicine/pay/verify", data=body, content_type="application/json")
+    assert resp.status_code == 502 and resp.json() == views.ERROR
+
+
+def test_verify_session_is_pooled(settings):
+    bitpay._session = None
+    session = bitpay.get_session()
+    assert bitpay.get_session() is session
+    adapter = session.get_adapter(settings.BITPAY_VERIFY_URL)
+    assert adapter._pool_maxsize == settings.BITPAY_HTTP_POOL_SIZE
+
+
+class _SlowGateway:
+    """Fake session whose every attempt uses its full timeouts on a fake clock."""
+
+    def __init__(self, statuses=()):
+        self.now = 0.0
+        self.attempts = 0
+        self.statuses = list(statuses)
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def post(self, url, json, headers, timeout):
+        self.attempts += 1
+        if self.statuses:
+            resp = requests.Response()
+            resp.status_code = self.statuses.pop(0)
+            return resp
+        self.now += timeout[0] + timeout[1]
+        raise requests.Timeout("slow")
+
+
+def test_verify_worst_case_is_bounded_by_deadline(monkeypatch, settings):
+    settings.BITPAY_VERIFY_RETRIES = 10
+    gateway = _SlowGateway()
+    monkeypatch.setattr(bitpay, "get_session", lambda: gateway)
+    monkeypatch.setattr(
+        bitpay, "time", types.SimpleNamespace(monotonic=lambda: gateway.now, sleep=gateway.sleep)
+    )
+    with pytest.raises(requests.Timeout):
+        bitpay.verify_payment(settings.BITPAY_VERIFY_URL, {})
+    bound = settings.BITPAY_VERIFY_DEADLINE_SECONDS + settings.BITPAY_VERIFY_CONNECT_TIMEOUT
+    assert gateway.now <= bound
+
+    gateway = _SlowGateway(statuses=[503, 200])
+    monkeypatch.setattr(bitpay, "get_session", lambda: gateway)
+    bitpay.verify_payment(settings.BITPAY_VERIFY_URL, {})
+    assert gateway.attempts == 2
+    gateway = _SlowGateway(statuses=[400])
+    monkeypatch.setattr(bitpay, "get_session", lambda: gateway)
+    with pytest.raises(requests.HTTPError):
+        bitpay.verify_payment(settings.BITPAY_VERIFY_URL, {})
+    assert gateway.attempts == 1
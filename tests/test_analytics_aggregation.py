@@ -0,0 +1,46 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from analytics import aggregation
+from analytics.models import Event
+
+pytestmark = pytest.mark.django_db
+
+AT = datetime(2025, 9, 26, 10, 30, tzinfo=UTC)
+
+
+class _RecordingCursor:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.sink.append((sql, params))
+
+    def fetchall(self):
+        return []
+
+
+def test_only_json_numbers_feed_percentiles():
+    for value in (100, 300.0, "1000", True, None):
+        Event.objects.create(name="pay_success", at=AT, props={"tat_ms": value})
+    rows = aggregation._aggregate_python(Event.objects.all(), "hour", "tat_ms")
+    row = rows[aggregation.floor_bucket(AT, "hour")]
+    assert row["count"] == 5
+    assert (row["p50"], row["p99"]) == (200.0, pytest.approx(298))
+
+
+def test_postgres_path_filters_on_the_same_rule(monkeypatch):
+    executed = []
+    fake = type("Conn", (), {"cursor": lambda self: _RecordingCursor(executed)})()
+    monkeypatch.setattr(aggregation, "connections", {"default": fake})
+    aggregation._aggregate_postgresql(Event.objects.all(), "hour", "tat_ms")
+    sql, params = executed[0]
+    assert "FILTER (WHERE jsonb_typeof(sub.props -> %s) = 'number')" in sql
+    assert params[:4] == ["hour", list(aggregation.PERCENTILES), "tat_ms", "tat_ms"]
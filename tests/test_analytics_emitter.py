@@ -0,0 +1,53 @@
+import pytest
+
+from analytics import emitter
+from analytics.emitter import EventBuffer
+from analytics.models import Event
+from analytics.tasks import flush_events
+from perf.metrics import build_metrics
+
+pytestmark = pytest.mark.django_db
+
+
+def _event(name="pay_webhook_bad_sig", **props):
+    return Event(name=name, props=props)
+
+
+def test_buffer_flushes_on_size_with_bulk_insert(django_assert_num_queries):
+    buffer = EventBuffer(capacity=10, flush_size=3, flush_interval=60, background=False)
+    buffer.append(_event(reason="mismatch"))
+    buffer.append(_event(reason="mismatch"))
+    assert Event.objects.count() == 0 and len(buffer) == 2
+    with django_assert_num_queries(1):
+        buffer.append(_event(reason="skew"))
+    assert Event.objects.count() == 3 and len(buffer) == 0
+    assert buffer.stats()["flushed"] == 3
+
+
+def test_buffer_flushes_on_age():
+    buffer = EventBuffer(capacity=10, flush_size=10, flush_interval=0, background=False)
+    buffer.append(_event())
+    assert Event.objects.count() == 1
+
+
+def test_full_buffer_drops_and_counts():
+    buffer = EventBuffer(capacity=2, flush_size=2, flush_interval=60, background=False)
+    buffer.flush_size = 5
+    assert buffer.append(_event()) and buffer.append(_event())
+    assert not buffer.append(_event())
+    assert buffer.stats() == {"buffered": 2, "dropped": 1, "flushed": 0, "failed": 0}
+    assert buffer.flush() == 2
+
+
+def test_emit_buffers_until_task_flush(settings, monkeypatch):
+    settings.ANALYTICS_BUFFER_ENABLED = True
+    buffer = EventBuffer(capacity=5, flush_size=5, flush_interval=60, background=False)
+    monkeypatch.setattr(emitter, "get_buffer", lambda: buffer)
+    monkeypatch.setattr(emitter, "_buffer", buffer)
+    monkeypatch.setattr(emitter, "_buffer_pid", __import__("os").getpid())
+
+    emitter.emit("ext_error", service="bitpay")
+    assert Event.objects.count() == 0
+    assert "helssa_analytics_events_buffered 1" in build_metrics()
+    assert flush_events() == 1
+    assert Event.objects.get().props == {"service": "bitpay"}
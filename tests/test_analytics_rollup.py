@@ -0,0 +1,74 @@
+import random
+from datetime import UTC, datetime, timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from analytics.models import DailyTatSketch, Event, RollupWatermark, StatsDaily
+from analytics.rollup import run_rollup
+from analytics.sketch import DDSketch
+from analytics.tasks import rollup_stats
+
+pytestmark = pytest.mark.django_db
+
+DAY = datetime(2025, 9, 26, 10, tzinfo=UTC)
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[round(q * (len(ordered) - 1))]
+
+
+def test_sketch_quantiles_within_accuracy_and_merge():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(8, 1) for _ in range(5000)]
+    left, right = DDSketch(0.01), DDSketch(0.01)
+    for idx, value in enumerate(values):
+        (left if idx % 2 else right).add(value)
+    left.merge(DDSketch.from_dict(right.to_dict()))
+    assert left.count == len(values)
+    for q in (0.5, 0.95, 0.99):
+        assert left.quantile(q) == pytest.approx(_exact(values, q), rel=0.02)
+    assert DDSketch().quantile(0.5) is None
+
+
+def test_rollup_is_incremental(settings, django_assert_max_num_queries):
+    settings.ANALYTICS_ROLLUP_SETTLE_SECONDS = 0
+    for tat in (100, 200, 300):
+        Event.objects.create(name="pay_success", at=DAY, props={"tat_ms": tat})
+    Event.objects.create(name="rx_started", at=DAY)
+    Event.objects.create(name="apk_download", at=DAY + timedelta(days=1))
+    Event.objects.create(name="pay_webhook_bad_sig", at=DAY)
+
+    assert run_rollup(batch_size=4) == 6
+    stats = StatsDaily.objects.get(day=DAY.date())
+    assert (stats.pay_success, stats.rx_started) == (3, 1)
+    assert stats.pay_tat_p50_ms == pytest.approx(200, rel=0.02)
+    assert StatsDaily.objects.get(day=DAY.date() + timedelta(days=1)).apk_downloads == 1
+    watermark = RollupWatermark.objects.get()
+    assert watermark.last_event_id == Event.objects.latest("id").id
+
+    Event.objects.create(name="pay_success", at=DAY, props={"tat_ms": 1000})
+    with django_assert_max_num_queries(12):
+        assert run_rollup() == 1
+    stats.refresh_from_db()
+    assert stats.pay_success == 4
+    assert stats.pay_tat_p50_ms == pytest.approx(200, rel=0.02)
+    assert stats.pay_tat_p95_ms == pytest.approx(300, rel=0.02)
+    sketch = DailyTatSketch.objects.get(day=DAY.date()).sketch
+    assert (sketch["count"], sketch["max"]) == (4, 1000)
+
+
+def test_rollup_waits_for_unsettled_events(settings):
+    settings.ANALYTICS_ROLLUP_SETTLE_SECONDS = 3600
+    event = Event.objects.create(name="pay_success", props={"tat_ms": 5})
+    out = StringIO()
+    call_command("analytics_rollup", stdout=out)
+    assert "Rolled up 0 events" in out.getvalue()
+    assert not StatsDaily.objects.exists()
+    assert rollup_stats() == 0
+
+    settings.ANALYTICS_ROLLUP_SETTLE_SECONDS = 0
+    assert rollup_stats() == 1
+    assert RollupWatermark.objects.get().last_event_id == event.id
@@ -0,0 +1,82 @@
+import gzip
+import zlib
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from analytics.models import Event
+from core.middleware import compression
+from core.middleware.compression import CompressionMiddleware, negotiate
+
+BODY = b'{"results": [' + b",".join(b'{"name": "visit.completed"}' for _ in range(200)) + b"]}"
+
+
+def _run(response, accept="gzip, deflate"):
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+def test_compresses_large_bodies_and_weakens_etag():
+    response = HttpResponse(BODY, content_type="application/json")
+    response["ETag"] = '"abc"'
+    response = _run(response)
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.content) == BODY
+    assert int(response["Content-Length"]) == len(response.content) < len(BODY)
+    assert response["ETag"] == 'W/"abc"'
+    assert "Accept-Encoding" in response["Vary"]
+
+
+@pytest.mark.parametrize(
+    "response, accept",
+    [
+        (HttpResponse(b"{}", content_type="application/json"), "gzip"),
+        (HttpResponse(BODY, content_type="image/png"), "gzip"),
+        (HttpResponse(BODY, content_type="application/json"), "identity"),
+        (HttpResponse(BODY, content_type="application/json"), "gzip;q=0"),
+    ],
+)
+def test_skips_tiny_compressed_or_unwanted(response, accept):
+    assert not _run(response, accept).has_header("Content-Encoding")
+
+
+def test_csrf_bearing_responses_are_never_compressed(settings):
+    page = HttpResponse(BODY, content_type="text/html; charset=utf-8")
+    assert not _run(page).has_header("Content-Encoding")
+
+    api = HttpResponse(BODY, content_type="application/json")
+    api.set_cookie(settings.CSRF_COOKIE_NAME, "token")
+    assert not _run(api).has_header("Content-Encoding")
+
+
+def test_sse_frames_flushed_individually():
+    frames = [f'data: {{"delta": "{i}"}}\n\n'.encode() for i in range(5)]
+    response = _run(StreamingHttpResponse(iter(frames), content_type="text/event-stream"))
+    assert response["Content-Encoding"] == "gzip"
+    decoder = zlib.decompressobj(31)
+    chunks = list(response.streaming_content)
+    # Each frame is decodable as soon as its chunk arrives.
+    assert [decoder.decompress(chunk) for chunk in chunks[: len(frames)]] == frames
+    decoder.decompress(b"".join(chunks[len(frames) :]))
+    assert decoder.eof
+
+
+def test_negotiation_prefers_brotli_only_when_available(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert negotiate("br, gzip") == "gzip"
+    assert negotiate("br") is None
+    monkeypatch.setattr(compression, "brotli", object())
+    assert negotiate("gzip, br") == "br"
+    assert negotiate("br;q=0.5, gzip;q=0.8") == "gzip"
+
+
+@pytest.mark.django_db
+def test_analytics_export_stream_compressed(client, django_user_model):
+    Event.objects.bulk_create(Event(name="visit.completed", props={"i": i}) for i in range(300))
+    staff = django_user_model.objects.create_user("gz", password="x", is_staff=True)
+    client.force_login(staff)
+    response = client.get("/api/v1/analytics/events/export/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    raw = gzip.decompress(b"".join(response.streaming_content))
+    assert raw.count(b"\n") == 300
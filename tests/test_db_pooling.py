@@ -0,0 +1,65 @@
+import types
+
+import pytest
+from django.db import connections
+
+from core import db
+from core.db import configure_database
+from perf.metrics import build_metrics
+
+PG = {"ENGINE": "django.db.backends.postgresql", "NAME": "helssa", "CONN_MAX_AGE": 600}
+
+
+def test_pool_replaces_persistent_connections():
+    config = configure_database(PG, pool=True, min_size=4, max_size=20, timeout=3)
+    assert config["CONN_MAX_AGE"] == 0
+    assert config["OPTIONS"]["pool"] == {"min_size": 4, "max_size": 20, "timeout": 3}
+    assert "OPTIONS" not in PG
+
+
+def test_pgbouncer_profile_disables_server_side_state():
+    config = configure_database(PG, pgbouncer=True)
+    assert config["CONN_MAX_AGE"] == 0
+    assert config["DISABLE_SERVER_SIDE_CURSORS"] is True
+    assert config["OPTIONS"] == {"prepare_threshold": None}
+
+
+def test_non_postgres_config_untouched():
+    sqlite = {"ENGINE": "django.db.backends.sqlite3", "NAME": "x.db", "CONN_MAX_AGE": 600}
+    assert configure_database(sqlite, pool=True, pgbouncer=True) is sqlite
+
+
+class _FakeConnection:
+    def __init__(self, in_atomic_block: bool) -> None:
+        self.connection = object()
+        self.in_atomic_block = in_atomic_block
+
+    def close(self) -> None:
+        self.connection = None
+
+
+def test_release_connections_skips_open_transactions(monkeypatch, settings):
+    idle, busy = _FakeConnection(False), _FakeConnection(True)
+    monkeypatch.setattr(connections, "all", lambda initialized_only=False: [idle, busy])
+
+    settings.DB_RELEASE_DURING_UPSTREAM = False
+    assert db.release_connections() == 0 and idle.connection is not None
+
+    settings.DB_RELEASE_DURING_UPSTREAM = True
+    assert db.release_connections() == 1
+    assert idle.connection is None and busy.connection is not None
+
+
+@pytest.mark.django_db
+def test_pool_stats_reads_opened_pools(monkeypatch):
+    fake = types.SimpleNamespace(get_stats=lambda: {"pool_size": 3, "pool_available": 1})
+    conn = connections["default"]
+    monkeypatch.setattr(type(conn), "_connection_pools", {"default": fake}, raising=False)
+    monkeypatch.setattr(connections, "all", lambda initialized_only=False: [conn])
+    assert db.pool_stats() == {"default": {"pool_size": 3, "pool_available": 1}}
+
+    body = build_metrics()
+    assert 'helssa_db_pool_size{alias="default"} 3' in body
+    assert 'helssa_db_pool_requests_errors_total{alias="default"} 0' in body
+    assert 'helssa_db_pool_requests_waiting{alias="default"} 0' in body
+    assert "# TYPE helssa_db_pool_requests_num_total counter" in body
@@ -0,0 +1,71 @@
+import math
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.test import APIClient
+
+from core import db
+from core.middleware.replica import PrimaryStickyMiddleware
+
+
+def test_without_replica_everything_reads_default():
+    assert db.read_alias() == DEFAULT_DB_ALIAS
+
+
+def test_lagging_or_unreachable_replica_falls_back(replica, settings):
+    assert db.read_alias() == db.REPLICA_ALIAS
+    replica["seconds"] = 30
+    # Still the cached measurement.
+    assert db.read_alias() == db.REPLICA_ALIAS
+    settings.DATABASE_REPLICA_LAG_CHECK_SECONDS = 0
+    assert db.read_alias() == DEFAULT_DB_ALIAS
+    replica["seconds"] = math.inf
+    assert db.read_alias() == DEFAULT_DB_ALIAS
+    assert replica["checks"] == 3
+
+
+@pytest.mark.django_db
+def test_writes_pin_user_to_primary(replica, django_user_model):
+    writer = django_user_model.objects.create_user(username="writer", password="pass")
+    other = django_user_model.objects.create_user(username="other", password="pass")
+    middleware = PrimaryStickyMiddleware(lambda request: HttpResponse(status=201))
+    factory = RequestFactory()
+
+    request = factory.get("/")
+    request.user = writer
+    middleware(request)
+    assert db.read_alias(writer) == db.REPLICA_ALIAS
+
+    request = factory.post("/")
+    request.user = writer
+    middleware(request)
+    assert db.read_alias(writer) == DEFAULT_DB_ALIAS
+    assert db.read_alias(other) == db.REPLICA_ALIAS
+
+
+def test_router_keeps_writes_and_migrations_on_default():
+    router = db.ReplicaRouter()
+    assert router.db_for_read(None) == DEFAULT_DB_ALIAS
+    assert router.db_for_write(None) == DEFAULT_DB_ALIAS
+    assert router.allow_migrate(db.REPLICA_ALIAS, "analytics") is False
+
+
+@pytest.mark.django_db
+def test_read_only_viewsets_bind_the_chosen_alias(monkeypatch, django_user_model):
+    chosen = []
+
+    def read_alias(user=None):
+        chosen.append(user.username)
+        return DEFAULT_DB_ALIAS
+
+    monkeypatch.setattr("apps.common.mixins.read_alias", read_alias)
+    staff = django_user_model.objects.create_user(
+        username="replica-staff", password="pass", is_staff=True
+    )
+    client = APIClient()
+    client.force_authenticate(staff)
+    for path in ("/api/v1/analytics/events/", "/api/v1/analytics/daily/"):
+        assert client.get(path).status_code == 200
+    assert chosen == ["replica-staff", "replica-staff"]
@@ -0,0 +1,43 @@
+import pytest
+from django.test import Client
+
+from apps.system import views as system_views
+
+
+def test_health_answered_before_session_and_auth_middleware():
+    response = Client().get("/health", HTTP_X_REQUEST_ID="probe-1")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    assert response["X-Request-ID"] == "probe-1"
+    assert int(response["X-Response-Time-ms"]) >= 0
+    assert response["X-Content-Type-Options"] == "nosniff"
+    assert response["X-Frame-Options"] == "DENY"
+    assert not hasattr(response.wsgi_request, "session")
+    assert not hasattr(response.wsgi_request, "user")
+
+
+def test_system_health_resolves_version_once(monkeypatch, settings):
+    calls = []
+
+    def describe(*args, **kwargs):
+        calls.append(args)
+        return "v9.9.9\n"
+
+    monkeypatch.delenv("HELSSA_VERSION", raising=False)
+    monkeypatch.setattr(system_views.subprocess, "check_output", describe)
+    settings.APP_VERSION = ""
+    system_views._version.cache_clear()
+    try:
+        client = Client()
+        bodies = [client.get("/api/v1/system/health").json() for _ in range(3)]
+    finally:
+        system_views._version.cache_clear()
+    assert {body["version"] for body in bodies} == {"v9.9.9"}
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db
+def test_other_methods_and_paths_use_full_stack():
+    client = Client()
+    assert hasattr(client.post("/health").wsgi_request, "session")
+    assert hasattr(client.get("/api/v1/system/ready").wsgi_request, "user")
@@ -0,0 +1,59 @@
+import importlib
+import io
+import json
+import sys
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer as StdlibRenderer
+
+import core.json
+
+PAYLOAD = {
+    "count": 2,
+    "price": Decimal("12.50"),
+    "at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=UTC),
+    "label": gettext_lazy("hello"),
+    "text": "سلام line",
+    "nested": [{"ok": True, "none": None}],
+}
+
+
+def test_renderer_matches_drf_renderer():
+    fast = core.json.JSONRenderer().render(PAYLOAD)
+    stdlib = StdlibRenderer().render(PAYLOAD)
+    assert json.loads(fast) == json.loads(stdlib)
+    assert b"\\u2028" in fast and "سلام".encode() in fast
+    assert core.json.JSONRenderer().render(None) == b""
+
+
+def test_parser_and_response():
+    parsed = core.json.JSONParser().parse(io.BytesIO('{"a": [1, "ب"]}'.encode()))
+    assert parsed == {"a": [1, "ب"]}
+    with pytest.raises(ParseError):
+        core.json.JSONParser().parse(io.BytesIO(b"{broken"))
+
+    response = core.json.JsonResponse({"at": PAYLOAD["at"]}, status=201)
+    assert response.status_code == 201 and response["Content-Type"] == "application/json"
+    assert json.loads(response.content) == {"at": "2026-01-02T03:04:05Z"}
+    with pytest.raises(TypeError):
+        core.json.JsonResponse([1, 2])
+    assert core.json.JsonResponse([1, 2], safe=False).content == b"[1,2]"
+
+
+def test_stdlib_fallback_produces_same_output(monkeypatch):
+    fast_sse = core.json.format_sse({"delta": "در", "n": 1})
+    fast_page = core.json.JSONRenderer().render(PAYLOAD)
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    try:
+        fallback = importlib.reload(core.json)
+        assert fallback.orjson is None
+        assert fallback.format_sse({"delta": "در", "n": 1}) == fast_sse
+        assert json.loads(fallback.JSONRenderer().render(PAYLOAD)) == json.loads(fast_page)
+        assert fallback.loads(b'{"a":1}') == {"a": 1}
+    finally:
+        monkeypatch.undo()
+        importlib.reload(core.json)
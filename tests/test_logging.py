@@ -0,0 +1,78 @@
+import io
+import json
+import logging
+import re
+
+from core import logging as core_logging
+from core.logging import JsonFormatter, QueueStreamHandler, _mask, request_id_ctx
+
+
+def _record(msg="hello %s", args=("world",), **extra):
+    logger = logging.getLogger("tests.logging")
+    return logger.makeRecord(
+        "tests.logging", logging.INFO, __file__, 1, msg, args, None, extra=extra or None
+    )
+
+
+def test_formatter_serializes_extras_and_millis():
+    token = request_id_ctx.set("rid-1")
+    try:
+        payload = json.loads(
+            JsonFormatter().format(
+                _record(user_id=7, extra={"gateway": "bitpay", "password": "s3cret"})
+            )
+        )
+    finally:
+        request_id_ctx.reset(token)
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z", payload["ts"])
+    assert payload["msg"] == "hello world"
+    assert payload["request_id"] == "rid-1"
+    assert payload["extra"] == {"user_id": 7, "gateway": "bitpay", "password": "***"}
+
+
+def test_mask_copies_only_when_needed():
+    clean = {"a": [1, {"b": 2}]}
+    assert _mask(clean) is clean
+    dirty = {"a": [{"Token": "x"}], "c": 1}
+    assert _mask(dirty) == {"a": [{"Token": "***"}], "c": 1}
+    assert dirty["a"][0]["Token"] == "x"
+
+
+def test_queue_handler_formats_off_thread_with_request_id():
+    stream = io.StringIO()
+    handler = QueueStreamHandler(stream=stream)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger("tests.logging.queue")
+    logger.addHandler(handler)
+    logger.propagate = False
+    token = request_id_ctx.set("rid-queued")
+    try:
+        logger.info("paid %s", "x", extra={"amount": 10})
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logger.exception("failed")
+    finally:
+        request_id_ctx.reset(token)
+        logger.removeHandler(handler)
+        logger.propagate = True
+        handler.close()
+    first, second = (json.loads(line) for line in stream.getvalue().splitlines())
+    assert first["msg"] == "paid x" and first["extra"] == {"amount": 10}
+    assert first["request_id"] == second["request_id"] == "rid-queued"
+    assert "RuntimeError: boom" in second["exc"]
+
+
+def test_fork_restarts_open_handlers():
+    handlers = [QueueStreamHandler(stream=io.StringIO()) for _ in range(2)]
+    closed = QueueStreamHandler(stream=io.StringIO())
+    closed.close()
+    before = [h.listener for h in handlers]
+    try:
+        core_logging._restart_listeners()  # what the child runs after os.fork()
+        assert all(h.listener is not old for h, old in zip(handlers, before, strict=True))
+        assert closed.listener._thread is None
+    finally:
+        for handler, old in zip(handlers, before, strict=True):
+            old.stop()
+            handler.close()
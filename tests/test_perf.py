@@ -1,16 +1,29 @@
 from __future__ import annotations
 
 import importlib
+import json
 import os
+import types
 from io import StringIO
 
 import pytest
+from celery import shared_task
+from django.core.cache import cache
 from django.core.management import call_command
 from django.db import connection
 from django.urls import clear_url_caches
 
 import config.urls
 from analytics.models import Event, StatsDaily
+from perf import celery_metrics, histogram, metrics
+from perf.metrics import build_metrics
+
+
+@shared_task(name="tests.flaky_metrics_task")
+def flaky(fail: bool) -> str:
+    if fail:
+        raise RuntimeError("boom")
+    return "ok"
 
 
 @pytest.fixture
@@ -66,3 +79,92 @@ def test_metrics_endpoint_enabled(client, reload_urls):
     assert "helssa_events_total" in body
     assert "helssa_statsdays_total" in body
     assert "helssa_ready_last_ok_timestamp" in body
+
+
+@pytest.mark.django_db
+def test_request_latency_histogram_rendered(client, reload_urls):
+    histogram.reset()
+    reload_urls(True)
+    client.get("/health")
+    client.get("/health")
+    client.get("/no-such-page")
+    body = client.get("/metrics").content.decode()
+    assert "# TYPE helssa_http_request_duration_seconds histogram" in body
+    labels = 'route="health",method="GET",status="200"'
+    assert f'helssa_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in body
+    assert f"helssa_http_request_duration_seconds_count{{{labels}}} 2" in body
+    assert 'route="unmatched",method="GET",status="404"' in body
+
+
+def test_histogram_merges_worker_files(tmp_path, settings):
+    histogram.reset()
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    histogram.observe("api/v1/x", "GET", 200, 0.003)
+    histogram.observe("api/v1/x", "GET", 200, 0.2)
+    assert json.loads((tmp_path / f"hist_{os.getpid()}.json").read_text())
+
+    other = [0.0] * (len(histogram.BUCKETS) + 2)
+    other[len(histogram.BUCKETS)] = 1  # one request slower than the last bucket
+    other[-1] = 12.5
+    (tmp_path / "hist_99999999.json").write_text(json.dumps([[["api/v1/x", "GET", "200"], other]]))
+    (tmp_path / "hist_1.json").write_text("{broken")
+
+    lines = histogram.render()
+    labels = 'route="api/v1/x",method="GET",status="200"'
+    assert f'helssa_http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1' in lines
+    assert f'helssa_http_request_duration_seconds_bucket{{{labels},le="10.0"}} 2' in lines
+    assert f'helssa_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+    assert f"helssa_http_request_duration_seconds_sum{{{labels}}} 12.703000" in lines
+    histogram.reset()
+
+
+@pytest.mark.django_db
+def test_metrics_counts_cached_within_staleness_bound(settings, django_assert_num_queries):
+    metrics._count_cache.clear()
+    settings.METRICS_COUNT_MAX_AGE_SECONDS = 300
+    Event.objects.create(name="x")
+    assert "helssa_events_total 1" in metrics.build_metrics()
+    Event.objects.create(name="y")
+    with django_assert_num_queries(0):
+        assert "helssa_events_total 1" in metrics.build_metrics()
+
+    settings.METRICS_COUNT_MAX_AGE_SECONDS = 0
+    assert "helssa_events_total 2" in metrics.build_metrics()
+    metrics._count_cache.clear()
+
+
+@pytest.mark.django_db
+def test_celery_task_metrics_merged_into_scrape(settings):
+    cache.clear()
+    flaky.delay(False)
+    assert flaky.apply(args=(True,), throw=False).failed()
+    celery_metrics.on_retry(sender=flaky)
+
+    body = build_metrics()
+    label = 'task="tests.flaky_metrics_task"'
+    assert f"helssa_celery_task_failures_total{{{label}}} 1" in body
+    assert f"helssa_celery_task_retries_total{{{label}}} 1" in body
+    assert f"helssa_celery_tasks_in_flight{{{label}}} 0" in body
+    assert f'helssa_celery_task_duration_seconds_bucket{{{label},le="+Inf"}} 2' in body
+    assert f"helssa_celery_task_duration_seconds_count{{{label}}} 2" in body
+    assert 'task="perf.tasks.collect_slowlog"' in body
+
+    settings.CACHE_SHARED = False
+    assert "helssa_celery_task" not in build_metrics()
+
+
+def test_celery_publish_header_feeds_queue_wait(monkeypatch):
+    cache.clear()
+    headers: dict = {}
+    celery_metrics.on_publish(sender="tests.wait", headers=headers)
+    published = headers[celery_metrics.PUBLISHED_HEADER]
+    monkeypatch.setattr(celery_metrics.time, "time", lambda: published + 2)
+    task = types.SimpleNamespace(
+        name="tests.wait",
+        request=types.SimpleNamespace(**{celery_metrics.PUBLISHED_HEADER: published}),
+    )
+    celery_metrics.on_prerun(task_id="t1", task=task)
+    assert cache.get("celery:metrics:tests.wait:wait:sum") == 2_000_000
+    assert cache.get("celery:metrics:tests.wait:in_flight") == 1
+    celery_metrics.on_postrun(task_id="t1", task=task)
+    assert cache.get("celery:metrics:tests.wait:in_flight") == 0
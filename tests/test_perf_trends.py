@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import types
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from perf.models import QuerySnapshot
+from perf.slowlog import fingerprint, normalize, stat_columns, take_snapshot
+
+pytestmark = pytest.mark.django_db
+
+ORDERS = "SELECT * FROM orders WHERE id IN ($1, $2, $3)"
+
+
+def _row(query: str, calls: int, total: float) -> dict:
+    return {"query": query, "calls": calls, "total_time": total, "rows": calls}
+
+
+def _snapshot(rows: list[dict], hours_ago: float) -> QuerySnapshot:
+    conn = types.SimpleNamespace(pg_version=160000)
+    snapshot = take_snapshot(conn, rows=rows)
+    QuerySnapshot.objects.filter(pk=snapshot.pk).update(
+        taken_at=timezone.now() - timedelta(hours=hours_ago),
+        window_seconds=3600 if snapshot.window_seconds is not None else None,
+    )
+    return snapshot
+
+
+def test_stat_columns_follow_server_version():
+    assert stat_columns(types.SimpleNamespace(pg_version=120011)) == ("total_time", "mean_time")
+    assert stat_columns(types.SimpleNamespace(pg_version=130002)) == (
+        "total_exec_time",
+        "mean_exec_time",
+    )
+
+
+def test_fingerprint_ignores_whitespace_and_in_list_length():
+    assert normalize("SELECT *\n  FROM orders WHERE id IN ($1)") == normalize(ORDERS)
+    assert fingerprint(ORDERS) == fingerprint("select * from orders where id in ($1,$2)")
+
+
+def test_snapshot_stores_deltas_and_handles_reset():
+    first = _snapshot([_row(ORDERS, 100, 500.0), _row("SELECT 1", 10, 1.0)], hours_ago=2)
+    second = take_snapshot(
+        types.SimpleNamespace(pg_version=160000),
+        rows=[_row(ORDERS, 160, 800.0), _row("SELECT 1", 4, 0.5)],
+    )
+    stats = {stat.query: stat for stat in second.stats.all()}
+    orders = stats[normalize(ORDERS)]
+    assert (orders.calls, orders.delta_calls, orders.delta_time_ms) == (160, 60, 300.0)
+    assert stats["select 1"].delta_calls == 4  # counters went backwards: treated as reset
+    assert second.window_seconds == pytest.approx(7200, abs=5)
+    assert first.window_seconds is None
+
+
+def test_perf_regressions_flags_mean_and_rate():
+    _snapshot([_row(ORDERS, 0, 0.0), _row("SELECT 2", 0, 0.0)], hours_ago=3)
+    _snapshot([_row(ORDERS, 100, 200.0), _row("SELECT 2", 100, 100.0)], hours_ago=2)
+    _snapshot([_row(ORDERS, 200, 700.0), _row("SELECT 2", 400, 400.0)], hours_ago=1)
+
+    out = StringIO()
+    call_command("perf_regressions", min_calls=10, stdout=out)
+    text = out.getvalue()
+    assert "2 regression(s)" in text
+    assert "[mean] mean 2.00ms -> 5.00ms, calls/h 100 -> 100" in text
+    assert "[calls] mean 1.00ms -> 1.00ms, calls/h 100 -> 300" in text
+
+    with pytest.raises(CommandError, match="regression"):
+        call_command("perf_regressions", min_calls=10, fail=True, stdout=StringIO())
+
+
+def test_perf_regressions_needs_two_snapshots():
+    with pytest.raises(CommandError, match="two snapshots"):
+        call_command("perf_regressions", stdout=StringIO())
@@ -0,0 +1,111 @@
+import os
+import signal
+import threading
+import time
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.common.auth import issue_token
+from perf import profiler
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def flame_dir(settings, tmp_path):
+    settings.PROFILER_OUTPUT_DIR = str(tmp_path)
+    settings.PROFILER_INTERVAL_MS = 1
+    return tmp_path
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(200))
+
+
+def test_sampler_collapses_target_thread_stacks(flame_dir):
+    worker = threading.Thread(target=_busy, args=(0.2,))
+    worker.start()
+    sampler = profiler.StackSampler(thread_id=worker.ident).start()
+    worker.join()
+    stacks = sampler.stop()
+    assert sampler.samples > 0
+    assert any(stack.endswith("test_profiler:_busy") for stack in stacks)
+
+    path = profiler.write_folded(stacks, "GET api/v1/x/")
+    assert path.parent == flame_dir and path.name.endswith("-GET_api_v1_x.folded")
+    line = path.read_text().splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
+
+
+def test_profile_header_is_staff_only(client, flame_dir):
+    client.get("/api/v1/no-such-page", HTTP_X_PROFILE="1")
+    assert not list(flame_dir.glob("*.folded"))
+
+    staff = get_user_model().objects.create_user("prof", password="x", is_staff=True)
+    client.force_login(staff)
+    response = client.get("/api/v1/no-such-page", HTTP_X_PROFILE="1")
+    assert (flame_dir / response["X-Profile-File"]).exists()
+
+
+def test_profile_header_honours_bearer_token_staff(client, flame_dir):
+    member = get_user_model().objects.create_user("member", password="x")
+    response = client.get(
+        "/api/v1/doctor/visits/",
+        HTTP_X_PROFILE="1",
+        HTTP_AUTHORIZATION=f"Bearer {issue_token(member)}",
+    )
+    assert not response.has_header("X-Profile-File")
+    assert not list(flame_dir.glob("*.folded"))
+
+    staff = get_user_model().objects.create_user("bearer", password="x", is_staff=True)
+    response = client.get(
+        "/api/v1/doctor/visits/",
+        HTTP_X_PROFILE="1",
+        HTTP_AUTHORIZATION=f"Bearer {issue_token(staff)}",
+    )
+    assert (flame_dir / response["X-Profile-File"]).exists()
+
+
+def test_perf_profile_command_samples_signalled_process(flame_dir):
+    previous = signal.getsignal(profiler.PROFILE_SIGNAL)
+    with pytest.raises(CommandError, match="no profiling handler"):
+        call_command("perf_profile", pid=os.getpid(), seconds=0.1)
+    try:
+        assert profiler.install_signal_handler()
+        out = StringIO()
+        call_command("perf_profile", pid=os.getpid(), seconds=0.2, label="self", stdout=out)
+    finally:
+        signal.signal(profiler.PROFILE_SIGNAL, previous)
+    written = out.getvalue().split("Wrote ", 1)[1].strip()
+    assert written.endswith("-self.folded")
+    assert "perf_profile:handle" in open(written).read()
+
+
+def test_ready_file_identifies_the_installing_process(flame_dir):
+    previous = signal.getsignal(profiler.PROFILE_SIGNAL)
+    try:
+        assert profiler.install_signal_handler()
+    finally:
+        signal.signal(profiler.PROFILE_SIGNAL, previous)
+    pid = os.getpid()
+    assert profiler.handler_installed(pid)
+    profiler._remove_ready_file(pid)
+    assert not profiler.ready_file(pid).exists()
+
+    # Left behind by an earlier process that had the same pid.
+    profiler.ready_file(pid).write_text("1")
+    with pytest.raises(CommandError, match="no profiling handler"):
+        call_command("perf_profile", pid=pid, seconds=0.1)
+    assert not profiler.ready_file(pid).exists()
+
+
+def test_preloading_gunicorn_master_skips_the_handler(flame_dir):
+    arbiter = {"__name__": "gunicorn.arbiter", "install": profiler.install_signal_handler}
+    assert eval("install()", arbiter) is False
+    assert not profiler.ready_file(os.getpid()).exists()
@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.middleware.query_profiler import QueryProfilerMiddleware, fingerprint
+from doctor_online.models import Visit
+
+pytestmark = pytest.mark.django_db
+
+LOGGER = "core.middleware.query_profiler"
+
+
+def _profiles(caplog):
+    return [r for r in caplog.records if r.name == LOGGER]
+
+
+def test_fingerprint_strips_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM t WHERE id = 42 AND name = 'o''k'") == (
+        "SELECT * FROM t WHERE id = ? AND name = ?"
+    )
+    assert fingerprint("SELECT 1 FROM t WHERE id IN (%s, %s, %s)") == (
+        "SELECT ? FROM t WHERE id IN (...)"
+    )
+
+
+def test_profiler_disabled_by_default(client, caplog):
+    caplog.set_level(logging.INFO, logger=LOGGER)
+    client.get("/health")
+    assert not _profiles(caplog)
+
+
+def test_visit_list_profiled_without_n_plus_one(client, caplog, settings):
+    settings.QUERY_PROFILER_SAMPLE_RATE = 1.0
+    staff = get_user_model().objects.create_user("ops", password="x", is_staff=True)
+    for idx in range(8):
+        Visit.objects.create(user=staff, note=f"visit {idx}")
+    client.force_login(staff)
+    caplog.set_level(logging.INFO, logger=LOGGER)
+
+    assert client.get("/api/v1/doctor/visits/").status_code == 200
+
+    (record,) = _profiles(caplog)
+    assert record.levelno == logging.INFO
+    payload = record.extra
+    assert payload["route"].startswith("api/v1/doctor/visits/")
+    assert 0 < payload["queries"] < 8
+    assert payload["duplicates"] == []
+
+
+def test_repeated_statements_flagged_as_n_plus_one(caplog, settings):
+    settings.QUERY_PROFILER_SAMPLE_RATE = 1.0
+    settings.QUERY_PROFILER_NPLUSONE_THRESHOLD = 3
+    visits = [Visit.objects.create(note=str(idx)) for idx in range(4)]
+
+    def view(request):
+        for visit in visits:
+            Visit.objects.filter(pk=visit.pk).exists()
+        return HttpResponse("ok")
+
+    caplog.set_level(logging.INFO, logger=LOGGER)
+    QueryProfilerMiddleware(view)(RequestFactory().get("/loop"))
+
+    (record,) = _profiles(caplog)
+    assert record.levelno == logging.WARNING
+    assert record.extra["queries"] == 4
+    assert record.extra["route"] == "/loop"
+    assert record.extra["duplicates"][0]["count"] == 4
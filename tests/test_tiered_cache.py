@@ -0,0 +1,67 @@
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from core import cache as tiered
+from core.cache import CompressedSerializer, TieredCache
+
+
+@pytest.fixture
+def tiered_cache():
+    backend = TieredCache(
+        "tiered-test",
+        {
+            "KEY_PREFIX": "t",
+            "OPTIONS": {
+                "REMOTE_BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCAL_NAMESPACES": ["chatbot"],
+                "LOCAL_TTL": 60,
+                "LOCAL_MAX_ENTRIES": 2,
+            },
+        },
+    )
+    yield backend
+    backend.clear()
+
+
+def test_local_tier_only_for_listed_namespaces(tiered_cache):
+    assert isinstance(tiered_cache.remote, LocMemCache)
+    tiered._stats.clear()
+    tiered_cache.set("chatbot:a", {"answer": 1})
+    tiered_cache.set("idem:a", "ok")
+    tiered_cache.remote.delete("chatbot:a")
+    tiered_cache.remote.set("idem:a", "changed")
+
+    assert tiered_cache.get("chatbot:a") == {"answer": 1}  # served by the LRU
+    assert tiered_cache.get("idem:a") == "changed"  # never cached locally
+    assert tiered_cache.get("idem:missing") is None
+    assert tiered.namespace_stats() == {
+        ("chatbot", "local_hit"): 1,
+        ("idem", "hit"): 1,
+        ("idem", "miss"): 1,
+    }
+
+    tiered_cache.delete("chatbot:a")
+    assert tiered_cache.get("chatbot:a") is None
+
+
+def test_local_tier_is_bounded_lru(tiered_cache):
+    tiered_cache.set_many({"chatbot:1": 1, "chatbot:2": 2})
+    tiered_cache.get("chatbot:1")
+    tiered_cache.set("chatbot:3", 3)  # evicts chatbot:2, the least recently used
+    tiered_cache.remote.clear()
+    assert tiered_cache.get_many(["chatbot:1", "chatbot:2", "chatbot:3"]) == {
+        "chatbot:1": 1,
+        "chatbot:3": 3,
+    }
+    assert tiered_cache.add("celery:x", 1) and tiered_cache.incr("celery:x", 2) == 3
+
+
+def test_compressed_serializer_round_trip(settings):
+    settings.CACHE_COMPRESS_MIN_BYTES = 64
+    serializer = CompressedSerializer()
+    big = {"answer": "x" * 5000}
+    packed = serializer.dumps(big)
+    assert packed[:1] == b"z" and len(packed) < 200
+    assert serializer.loads(packed) == big
+    assert serializer.loads(serializer.dumps({"a": 1})) == {"a": 1}
+    assert serializer.dumps(7) == 7 and serializer.loads(b"7") == 7